@@ -0,0 +1,147 @@
+"""
+change: audit_logs to monthly range partitions on created_at
+
+The existing table becomes the partition of every row up to the end of the
+current month (audit_logs_pYYYYMM), no row is copied: its new indexes are
+built concurrently and a validated CHECK lets the attach skip the scan. The
+next months and a default partition (rows of months without a partition)
+are created, app.core.retention creates the following ones ahead of time
+and drops the expired ones. Postgres only, other databases keep the table.
+
+Revision ID: a8d3f5b27c91
+Revises: f2a6c8e1b350
+Create Date: 2026-10-19 11:02:54.107362
+
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d3f5b27c91"
+down_revision: Union[str, None] = "f2a6c8e1b350"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created after the current one
+PARTITIONS_AHEAD = 3
+
+
+def add_months(month: date, months: int):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Month bounds in UTC
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    bound = f"'{add_months(this_month, 1)} 00:00:00+00'"
+    current = f"audit_logs_p{this_month:%Y%m}"
+
+    # The partitioned table's indexes, built without locking the table for writes
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS"
+            " audit_logs_id_created_at_key ON audit_logs (id, created_at)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_created_at"
+            " ON audit_logs USING brin (created_at)"
+        )
+        op.execute(
+            "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_bound_check"
+            f" CHECK (created_at < {bound}) NOT VALID"
+        )
+        op.execute("ALTER TABLE audit_logs VALIDATE CONSTRAINT audit_logs_bound_check")
+
+    # The table becomes the current month's partition
+    op.execute(
+        "ALTER TABLE audit_logs DROP CONSTRAINT audit_logs_pkey,"
+        f" ADD CONSTRAINT {current}_pkey PRIMARY KEY"
+        " USING INDEX audit_logs_id_created_at_key"
+    )
+    op.execute(f"ALTER TABLE audit_logs RENAME TO {current}")
+    op.execute(
+        "ALTER INDEX ix_audit_logs_user_id_created_at"
+        f" RENAME TO {current}_user_id_created_at_idx"
+    )
+    op.execute(
+        f"ALTER INDEX ix_audit_logs_created_at RENAME TO {current}_created_at_idx"
+    )
+
+    # The partition key is in the primary key of a partitioned table
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            resource varchar NOT NULL,
+            action varchar NOT NULL,
+            notes varchar,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_audit_logs_user_id_created_at"
+        " ON audit_logs (user_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX ix_audit_logs_created_at ON audit_logs USING brin (created_at)"
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+
+    # The indexes and the foreign key match, the attach only takes the locks
+    op.execute(
+        f"ALTER TABLE audit_logs ATTACH PARTITION {current}"
+        f" FOR VALUES FROM (MINVALUE) TO ({bound})"
+    )
+    op.execute(f"ALTER TABLE {current} DROP CONSTRAINT audit_logs_bound_check")
+
+    for ahead in range(1, PARTITIONS_AHEAD + 1):
+        month = add_months(this_month, ahead)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{month:%Y%m} PARTITION OF audit_logs"
+            f" FOR VALUES FROM ('{month} 00:00:00+00')"
+            f" TO ('{add_months(month, 1)} 00:00:00+00')"
+        )
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Copies the rows back into a plain table
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            resource varchar NOT NULL,
+            action varchar NOT NULL,
+            notes varchar,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO audit_logs (id, user_id, resource, action, notes, created_at)"
+        " SELECT id, user_id, resource, action, notes, created_at"
+        " FROM audit_logs_partitioned"
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("DROP TABLE audit_logs_partitioned")
+
+    op.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (id)")
+    op.execute(
+        "CREATE INDEX ix_audit_logs_user_id_created_at"
+        " ON audit_logs (user_id, created_at)"
+    )
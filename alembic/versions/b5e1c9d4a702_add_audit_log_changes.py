@@ -0,0 +1,92 @@
+"""
+add: audit_logs structured changes, shrink the logged base64 contents
+
+The logs written before embed the whole request in notes, base64 data urls
+(e.g a pfp) included. They are replaced by the sha256 of their content, in
+batches that commit on their own. The replaced contents can't be restored.
+
+Revision ID: b5e1c9d4a702
+Revises: a8d3f5b27c91
+Create Date: 2026-10-19 13:27:08.552419
+
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e1c9d4a702"
+down_revision: Union[str, None] = "a8d3f5b27c91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+DATA_URL = re.compile(r"data:[\w/+.-]*;base64,[A-Za-z0-9+/=]+")
+
+
+def content_hash(match: re.Match):
+    try:
+        content = base64.b64decode(match.group().split(",", 1)[1], validate=True)
+    except (binascii.Error, ValueError):
+        content = match.group().encode()
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "audit_logs",
+        sa.Column(
+            "changes",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "audit_logs", sa.Column("changes_zlib", sa.LargeBinary, nullable=True)
+    )
+
+    # Shrink the notes with base64 contents, keyset batches
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                sa.text(
+                    "SELECT id, created_at, notes FROM audit_logs"
+                    " WHERE id > :last_id AND notes LIKE :pattern"
+                    " ORDER BY id LIMIT :size"
+                ),
+                {"last_id": last_id, "pattern": "%;base64,%", "size": BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+
+            # created_at prunes the partitions
+            conn.execute(
+                sa.text(
+                    "UPDATE audit_logs SET notes = :notes"
+                    " WHERE id = :id AND created_at = :created_at"
+                ),
+                [
+                    {
+                        "id": row.id,
+                        "created_at": row.created_at,
+                        "notes": DATA_URL.sub(content_hash, row.notes),
+                    }
+                    for row in rows
+                ],
+            )
+            last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column("audit_logs", "changes_zlib")
+    op.drop_column("audit_logs", "changes")
@@ -0,0 +1,31 @@
+"""
+add: pois.version
+
+Revision ID: b7d4e2a91c3f
+Revises: f8fb5e7cf602
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d4e2a91c3f"
+down_revision: Union[str, None] = "f8fb5e7cf602"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pois",
+        sa.Column("version", sa.Integer, server_default=sa.text("1"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("pois", "version")
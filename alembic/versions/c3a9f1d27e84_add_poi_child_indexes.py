@@ -0,0 +1,89 @@
+"""
+add: poi child tables poi_id indexes
+
+Revision ID: c3a9f1d27e84
+Revises: b7d4e2a91c3f
+Create Date: 2026-10-18 14:02:37.511846
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9f1d27e84"
+down_revision: Union[str, None] = "b7d4e2a91c3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Child tables, queried by poi_id and is_deleted=False
+CHILD_TABLES = [
+    "id_documents",
+    "gsm_numbers",
+    "residential_addresses",
+    "known_associates",
+    "employment_histories",
+    "educational_backgrounds",
+    "poi_offenses",
+    "frequented_spots",
+    "fingerprints",
+]
+
+
+def upgrade() -> None:
+    # Build the indexes without locking the tables for writes
+    with op.get_context().autocommit_block():
+        for table in CHILD_TABLES:
+            op.create_index(
+                f"ix_{table}_poi_id_active",
+                table,
+                ["poi_id"],
+                postgresql_where=sa.text("NOT is_deleted"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        # Looked up by poi_id regardless of is_deleted
+        op.create_index(
+            "ix_veteran_statuses_poi_id",
+            "veteran_statuses",
+            ["poi_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # Offense statistics and offense deletes
+        op.create_index(
+            "ix_poi_offenses_offense_id",
+            "poi_offenses",
+            ["offense_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_poi_offenses_offense_id",
+            table_name="poi_offenses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_veteran_statuses_poi_id",
+            table_name="veteran_statuses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+        for table in CHILD_TABLES:
+            op.drop_index(
+                f"ix_{table}_poi_id_active",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,91 @@
+"""
+add: users.is_supervisor, audit_log_rollups, audit_logs (created_at, id) index
+
+The keyset index of the audit log list is created ON ONLY the partitioned
+audit_logs (invalid until every partition has its own), each partition's
+index is built concurrently and attached. The rollups are filled by the next
+app.core.retention run.
+
+Revision ID: c7d2e4a91f36
+Revises: b5e1c9d4a702
+Create Date: 2026-10-19 15:12:40.318927
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e4a91f36"
+down_revision: Union[str, None] = "b5e1c9d4a702"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_SQL = """
+SELECT c.relname
+FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass('audit_logs')
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "is_supervisor", sa.Boolean, server_default=sa.false(), nullable=False
+        ),
+    )
+
+    op.create_table(
+        "audit_log_rollups",
+        sa.Column("hour", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "user_id",
+            sa.Integer,
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("resource", sa.String, nullable=False),
+        sa.Column("verb", sa.String, nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint("hour", "user_id", "resource", "verb"),
+    )
+    op.create_index(
+        "ix_audit_log_rollups_user_id_hour", "audit_log_rollups", ["user_id", "hour"]
+    )
+
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        op.create_index(
+            "ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"]
+        )
+        return
+
+    # Build the partitions' indexes without locking them for writes
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_created_at_id"
+        " ON ONLY audit_logs (created_at, id)"
+    )
+    with op.get_context().autocommit_block():
+        for name in conn.scalars(sa.text(PARTITIONS_SQL)).all():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}_created_at_id_idx"
+                f" ON {name} (created_at, id)"
+            )
+            op.execute(
+                "ALTER INDEX ix_audit_logs_created_at_id"
+                f" ATTACH PARTITION {name}_created_at_id_idx"
+            )
+
+
+def downgrade() -> None:
+    # Drops the partitions' indexes too
+    op.drop_index("ix_audit_logs_created_at_id", table_name="audit_logs")
+
+    op.drop_index("ix_audit_log_rollups_user_id_hour", table_name="audit_log_rollups")
+    op.drop_table("audit_log_rollups")
+
+    op.drop_column("users", "is_supervisor")
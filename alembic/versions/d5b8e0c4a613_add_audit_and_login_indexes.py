@@ -0,0 +1,53 @@
+"""
+add: audit_logs and login_attempts lookup indexes
+
+Revision ID: d5b8e0c4a613
+Revises: c3a9f1d27e84
+Create Date: 2026-10-18 14:09:12.270443
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b8e0c4a613"
+down_revision: Union[str, None] = "c3a9f1d27e84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build the indexes without locking the tables for writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_audit_logs_user_id_created_at",
+            "audit_logs",
+            ["user_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_login_attempts_badge_num_attempted_at",
+            "login_attempts",
+            ["badge_num", "attempted_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_login_attempts_badge_num_attempted_at",
+            table_name="login_attempts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_audit_logs_user_id_created_at",
+            table_name="audit_logs",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,63 @@
+"""
+add: offenses name unique index, the conflict target of create_offense
+
+Duplicate names (check-then-insert races of the old create) are merged into
+their first offense first, the poi offenses re-pointed to it.
+
+Revision ID: d9a4b6e2c815
+Revises: c7d2e4a91f36
+Create Date: 2026-10-19 16:48:05.271934
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a4b6e2c815"
+down_revision: Union[str, None] = "c7d2e4a91f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DUPLICATE = (
+    "EXISTS (SELECT 1 FROM offenses kept"
+    " WHERE kept.name = offenses.name AND kept.id < offenses.id)"
+)
+
+
+def upgrade() -> None:
+    # Merge the duplicates
+    op.execute(
+        sa.text(
+            "UPDATE poi_offenses SET offense_id = ("
+            " SELECT min(kept.id) FROM offenses JOIN offenses kept"
+            " ON kept.name = offenses.name"
+            " WHERE offenses.id = poi_offenses.offense_id"
+            f") WHERE offense_id IN (SELECT id FROM offenses WHERE {DUPLICATE})"
+        )
+    )
+    op.execute(sa.text(f"DELETE FROM offenses WHERE {DUPLICATE}"))
+
+    # Build the index without locking the table for writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_offenses_name",
+            "offenses",
+            ["name"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_offenses_name",
+            table_name="offenses",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,36 @@
+"""
+create: cache_generations, the offense generation of the cached responses
+kept in the database so every worker sees its bumps
+
+Revision ID: e4b7c1d9a352
+Revises: d9a4b6e2c815
+Create Date: 2026-10-19 21:12:44.305118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b7c1d9a352"
+down_revision: Union[str, None] = "d9a4b6e2c815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "cache_generations",
+        sa.Column("namespace", sa.String, primary_key=True),
+        sa.Column("generation", sa.Integer, server_default="0", nullable=False),
+    )
+
+    # The row bumped by the offense writes
+    op.bulk_insert(table, [{"namespace": "offense", "generation": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("cache_generations")
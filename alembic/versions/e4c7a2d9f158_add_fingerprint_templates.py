@@ -0,0 +1,40 @@
+"""
+add: fingerprint templates and the minutiae triplet index
+
+Revision ID: e4c7a2d9f158
+Revises: d5b8e0c4a613
+Create Date: 2026-10-18 23:41:05.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4c7a2d9f158"
+down_revision: Union[str, None] = "d5b8e0c4a613"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("fingerprints", sa.Column("template", sa.LargeBinary, nullable=True))
+    op.create_table(
+        "fingerprint_keys",
+        sa.Column("key", sa.Integer, primary_key=True),
+        sa.Column(
+            "fingerprint_id",
+            sa.Integer,
+            sa.ForeignKey("fingerprints.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("finger", sa.SmallInteger, primary_key=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fingerprint_keys")
+    op.drop_column("fingerprints", "template")
@@ -0,0 +1,76 @@
+"""
+add: soft deleted rows and login_attempts retention indexes
+
+Revision ID: f2a6c8e1b350
+Revises: e4c7a2d9f158
+Create Date: 2026-10-19 09:41:26.318054
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a6c8e1b350"
+down_revision: Union[str, None] = "e4c7a2d9f158"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Soft deleted tables, purged by deleted_at (app.core.retention)
+SOFT_DELETE_TABLES = [
+    "pois",
+    "id_documents",
+    "gsm_numbers",
+    "residential_addresses",
+    "known_associates",
+    "employment_histories",
+    "veteran_statuses",
+    "educational_backgrounds",
+    "poi_offenses",
+    "frequented_spots",
+    "fingerprints",
+]
+
+
+def upgrade() -> None:
+    # Build the indexes without locking the tables for writes
+    with op.get_context().autocommit_block():
+        # Partial, they only hold the soft deleted rows
+        for table in SOFT_DELETE_TABLES:
+            op.create_index(
+                f"ix_{table}_deleted_at",
+                table,
+                ["deleted_at"],
+                postgresql_where=sa.text("is_deleted"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        op.create_index(
+            "ix_login_attempts_attempted_at",
+            "login_attempts",
+            ["attempted_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_login_attempts_attempted_at",
+            table_name="login_attempts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+        for table in reversed(SOFT_DELETE_TABLES):
+            op.drop_index(
+                f"ix_{table}_deleted_at",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Query, status
+
+from app.audit import selectors
+from app.audit.formatters import format_audit_activity, format_audit_log
+from app.audit.schemas import response
+from app.common.annotations import DatabaseSession
+from app.common.paginators import encode_cursor
+from app.core.tags import get_tags
+from app.user.annotated import CurrentSupervisor
+from app.user.services import create_log
+
+# Globals
+router = APIRouter()
+tags = get_tags()
+
+
+@router.get(
+    "",
+    summary="Get List of Audit Logs",
+    response_description="The filtered audit logs, newest first",
+    status_code=status.HTTP_200_OK,
+    response_model=response.AuditLogListResponse,
+    tags=[tags.AUDIT_LOG],
+)
+async def route_audit_log_list(
+    curr_user: CurrentSupervisor,
+    db: DatabaseSession,
+    user_id: int | None = Query(default=None, description="Filter by user"),
+    resource: str | None = Query(default=None, description="e.g pois"),
+    action: str | None = Query(default=None, description="Action prefix, e.g edit:12"),
+    start: datetime | None = Query(default=None, description="Created from"),
+    end: datetime | None = Query(default=None, description="Created until (excl.)"),
+    cursor: str | None = Query(default=None, description="meta.next_cursor"),
+    size: int = Query(default=50, ge=1, le=200),
+):
+    """
+    This endpoint returns the filtered audit logs, newest first
+
+    The next page is requested with the cursor of the current one
+    """
+    # Create log
+    await create_log(
+        user=curr_user,
+        resource="audit",
+        action="get-list",
+        notes=f"U: {user_id}, R: {resource}, A: {action}, S: {start}, E: {end}",
+        db=db,
+    )
+
+    # Get logs
+    rows = await selectors.get_audit_logs(
+        user_id=user_id,
+        resource=resource,
+        action=action,
+        start=start,
+        end=end,
+        cursor=cursor,
+        size=size,
+        db=db,
+    )
+    page = rows[:size]
+
+    # Check: next page
+    next_cursor = None
+    if len(rows) > size:
+        last = page[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {
+        "data": [await format_audit_log(log=log, badge_num=num) for log, num in page],
+        "meta": {
+            "size": size,
+            "count": len(page),
+            "next_cursor": next_cursor,
+            "has_next_page": next_cursor is not None,
+        },
+    }
+
+
+@router.get(
+    "/activity",
+    summary="Get Audit Activity",
+    response_description="The audit activity per period, user and resource",
+    status_code=status.HTTP_200_OK,
+    response_model=response.AuditActivityResponse,
+    tags=[tags.AUDIT_LOG],
+)
+async def route_audit_activity(
+    curr_user: CurrentSupervisor,
+    db: DatabaseSession,
+    user_id: int | None = Query(default=None, description="Filter by user"),
+    resource: str | None = Query(default=None, description="e.g pois"),
+    start: datetime | None = Query(default=None, description="Defaults to a week ago"),
+    end: datetime | None = Query(default=None, description="Defaults to now (excl.)"),
+    bucket: Literal["hour", "day"] = "day",
+):
+    """
+    This endpoint returns the audit activity per hour/day, user and resource
+
+    Counted from the hourly rollups, i.e up to the last rollup run
+    """
+    # Create log
+    await create_log(
+        user=curr_user,
+        resource="audit",
+        action="get-activity",
+        notes=f"U: {user_id}, R: {resource}, S: {start}, E: {end}, B: {bucket}",
+        db=db,
+    )
+
+    # Get activity
+    activity = await selectors.get_audit_activity(
+        user_id=user_id,
+        resource=resource,
+        start=start,
+        end=end,
+        bucket=bucket,
+        db=db,
+    )
+
+    return {"data": [await format_audit_activity(activity=row) for row in activity]}
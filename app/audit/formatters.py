@@ -0,0 +1,33 @@
+"""
+Formatters build the response schemas from the db objects, without
+validation (see app.poi.formatters)
+"""
+
+from app.audit.schemas import base
+from app.common.utils import unpack_changes
+from app.user import models as user_models
+
+
+async def format_audit_log(log: user_models.AuditLog, badge_num: str):
+    """
+    Format audit log obj to schema
+    """
+
+    return base.AuditLog.model_construct(
+        id=log.id,
+        user_id=log.user_id,
+        badge_num=badge_num,
+        resource=log.resource,
+        action=log.action,
+        notes=log.notes,
+        changes=unpack_changes(log.changes, log.changes_zlib),
+        created_at=log.created_at,
+    )
+
+
+async def format_audit_activity(activity: dict):
+    """
+    Format audit activity (see selectors.get_audit_activity) to schema
+    """
+
+    return base.AuditActivity.model_construct(**activity)
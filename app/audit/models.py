@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.core.database import DBBase
+
+
+class AuditLogRollup(DBBase):
+    """
+    Database model for the hourly audit log counts of a user, resource and verb
+
+    Rolled up from audit_logs by app.core.retention, the rollups outlive the
+    dropped audit_logs partitions
+    """
+
+    __tablename__ = "audit_log_rollups"
+    __table_args__ = (Index("ix_audit_log_rollups_user_id_hour", "user_id", "hour"),)
+
+    hour = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    resource = Column(String, primary_key=True)
+    # The action before ':', e.g get, edit, get-list
+    verb = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
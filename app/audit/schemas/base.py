@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class AuditLog(BaseModel):
+    """
+    Base schema for audit logs
+    """
+
+    id: int = Field(description="Unique identifier for the audit log")
+    user_id: int = Field(description="The user who performed the action")
+    badge_num: str = Field(description="Badge number of the user")
+    resource: str = Field(description="The resource, e.g pois")
+    action: str = Field(description="The action, e.g edit:12")
+    notes: str | None = Field(default=None, description="The notes")
+    changes: dict | None = Field(
+        default=None, description="The changed fields, field -> [old, new]"
+    )
+    created_at: datetime = Field(description="Creation timestamp")
+
+
+class AuditActivity(BaseModel):
+    """
+    Base schema for the audit activity of a user on a resource
+    """
+
+    period: datetime = Field(description="Start of the hour/day")
+    user_id: int = Field(description="The user who performed the actions")
+    badge_num: str = Field(description="Badge number of the user")
+    resource: str = Field(description="The resource, e.g pois")
+    count: int = Field(description="The number of actions")
+    actions: dict[str, int] = Field(
+        description="The number of actions per verb, e.g get, edit"
+    )
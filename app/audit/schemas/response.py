@@ -0,0 +1,24 @@
+from pydantic import Field
+
+from app.audit.schemas.base import AuditActivity, AuditLog
+from app.common.schemas import KeysetPaginatedResponseSchema, ResponseSchema
+
+
+class AuditLogListResponse(KeysetPaginatedResponseSchema):
+    """
+    Response schema for the audit log list
+    """
+
+    msg: str = Field(default="Audit logs retrieved successfully")
+    data: list[AuditLog] = Field(description="The audit logs, newest first")
+
+
+class AuditActivityResponse(ResponseSchema):
+    """
+    Response schema for the audit activity
+    """
+
+    msg: str = Field(default="Audit activity retrieved successfully")
+    data: list[AuditActivity] = Field(
+        description="The audit activity per period, user and resource"
+    )
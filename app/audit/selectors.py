@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import DateTime, func, select, tuple_, type_coerce
+from sqlalchemy.orm import Session
+
+from app.audit import models
+from app.common.exceptions import BadRequest
+from app.common.paginators import decode_cursor
+from app.user import models as user_models
+
+# Globals
+ACTIVITY_DEFAULT_DAYS = 7
+ACTIVITY_MAX_DAYS = 92
+
+
+async def get_audit_logs(
+    user_id: int | None,
+    resource: str | None,
+    action: str | None,
+    start: datetime | None,
+    end: datetime | None,
+    cursor: str | None,
+    size: int,
+    db: Session,
+):
+    """
+    Get a page of the filtered audit logs, newest first
+
+    Keyset pagination on (created_at, id), a page is read from the
+    (created_at, id) index however deep it is
+
+    Args:
+        user_id (int | None): Filter by user
+        resource (str | None): Filter by resource
+        action (str | None): Filter by action prefix, e.g get:12
+        start (datetime | None): Created from (inclusive)
+        end (datetime | None): Created until (exclusive)
+        cursor (str | None): The cursor of the page, see encode_cursor
+        size (int): The page size
+        db (Session): The database session
+
+    Raises:
+        BadRequest
+
+    Returns:
+        list[Row[tuple[user_models.AuditLog, str]]]: The logs and their user's
+            badge num, one more than the size when there's a next page
+    """
+    log = user_models.AuditLog
+
+    # init qs
+    qs = select(log, user_models.User.badge_num).join(
+        user_models.User, user_models.User.id == log.user_id
+    )
+
+    # Filters
+    if user_id is not None:
+        qs = qs.where(log.user_id == user_id)
+    if resource:
+        qs = qs.where(log.resource == resource)
+    if action:
+        qs = qs.where(log.action.startswith(action, autoescape=True))
+    if start:
+        qs = qs.where(log.created_at >= start)
+    if end:
+        qs = qs.where(log.created_at < end)
+
+    # Check: after the cursor
+    if cursor:
+        created_at, id = decode_cursor(cursor, size=2)
+        try:
+            created_at, id = datetime.fromisoformat(created_at), int(id)
+        except (TypeError, ValueError):
+            raise BadRequest("Invalid cursor", loc=["query", "cursor"])
+
+        qs = qs.where(tuple_(log.created_at, log.id) < tuple_(created_at, id))
+
+    qs = qs.order_by(log.created_at.desc(), log.id.desc()).limit(size + 1)
+
+    return db.execute(qs).all()
+
+
+async def get_audit_activity(
+    user_id: int | None,
+    resource: str | None,
+    start: datetime | None,
+    end: datetime | None,
+    bucket: Literal["hour", "day"],
+    db: Session,
+):
+    """
+    Get the audit activity per period, user and resource
+
+    Read from the hourly rollups, never from the audit logs
+
+    Args:
+        user_id (int | None): Filter by user
+        resource (str | None): Filter by resource
+        start (datetime | None): From (inclusive), defaults to a week before end
+        end (datetime | None): Until (exclusive), defaults to now
+        bucket (Literal["hour", "day"]): The period
+        db (Session): The database session
+
+    Raises:
+        BadRequest
+
+    Returns:
+        list[dict]: period, user_id, badge_num, resource, count and the
+            count per verb (actions)
+    """
+    rollup = models.AuditLogRollup
+
+    # Range, naive datetimes are local
+    end = (end or datetime.now()).astimezone()
+    start = (start or end - timedelta(days=ACTIVITY_DEFAULT_DAYS)).astimezone()
+    if not timedelta(0) < end - start <= timedelta(days=ACTIVITY_MAX_DAYS):
+        raise BadRequest(
+            f"The range must be positive and at most {ACTIVITY_MAX_DAYS} days",
+            loc=["query", "start"],
+        )
+
+    # Period
+    period = rollup.hour
+    if bucket == "day":
+        if db.get_bind().dialect.name == "postgresql":
+            period = func.date_trunc("day", rollup.hour)
+        else:
+            period = func.datetime(func.date(rollup.hour))
+    period = type_coerce(period, DateTime(timezone=True)).label("period")
+
+    # init qs
+    qs = (
+        select(
+            period,
+            rollup.user_id,
+            user_models.User.badge_num,
+            rollup.resource,
+            rollup.verb,
+            func.sum(rollup.count).label("count"),
+        )
+        .join(user_models.User, user_models.User.id == rollup.user_id)
+        .where(rollup.hour >= start, rollup.hour < end)
+        .group_by(
+            period,
+            rollup.user_id,
+            user_models.User.badge_num,
+            rollup.resource,
+            rollup.verb,
+        )
+        .order_by(period, rollup.user_id, rollup.resource)
+    )
+
+    # Filters
+    if user_id is not None:
+        qs = qs.where(rollup.user_id == user_id)
+    if resource:
+        qs = qs.where(rollup.resource == resource)
+
+    # Fold the verbs
+    activity: dict[tuple, dict] = {}
+    for row in db.execute(qs):
+        key = (row.period, row.user_id, row.resource)
+        if key not in activity:
+            activity[key] = {
+                "period": row.period,
+                "user_id": row.user_id,
+                "badge_num": row.badge_num,
+                "resource": row.resource,
+                "count": 0,
+                "actions": {},
+            }
+        activity[key]["count"] += row.count
+        activity[key]["actions"][row.verb] = row.count
+
+    return list(activity.values())
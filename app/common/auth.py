@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import jwt
 from fastapi import HTTPException, status
@@ -91,3 +92,11 @@ class TokenGenerator:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token"
             )
+
+
+@lru_cache
+def get_token_generator():
+    """This function returns the app's token generator, created on first use."""
+    return TokenGenerator(
+        secret_key=settings.SECRET_KEY, expire_in=settings.ACCESS_TOKEN_EXPIRE_MIN
+    )
@@ -0,0 +1,251 @@
+"""This module contains the response cache for the application."""
+
+import hashlib
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Type
+
+from fastapi import Request, status
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.settings import get_settings
+
+
+class CacheBackend:
+    """
+    Base class for shared cache backends (e.g redis)
+
+    The backend holds the serialized responses, shared by every worker. The
+    keys carry the versions kept in the database (see make_key), so a write
+    invalidates them for every worker.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Get a value from the backend
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int):
+        """
+        Store a value in the backend for ttl seconds
+        """
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process stand-in for a shared cache backend
+
+    NOTE: The values are only shared between the threads of one process
+    """
+
+    def __init__(self):
+        self._values: dict[str, tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+
+            # Check: expired
+            if item[0] < time.monotonic():
+                del self._values[key]
+                return None
+
+            return item[1]
+
+    def set(self, key: str, value: bytes, ttl: int):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU cache with a ttl on each entry
+    """
+
+    def __init__(self, *, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Get an item and mark it as recently used
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            # Check: expired
+            if item[0] < time.monotonic():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: bytes):
+        """
+        Store an item, evicting the least recently used item when full
+        """
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+class ResponseCache:
+    """
+    Two tier (in-process LRU -> shared backend) cache for serialized responses
+    """
+
+    def __init__(
+        self, *, local: LRUCache, shared: CacheBackend, ttl: int, enabled: bool = True
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def get(self, key: str):
+        """
+        Get a serialized response
+        """
+        if (body := self.local.get(key)) is not None:
+            return body
+
+        if (body := self.shared.get(key)) is not None:
+            self.local.set(key, body)
+
+        return body
+
+    def set(self, key: str, body: bytes):
+        """
+        Store a serialized response in both tiers
+        """
+        self.local.set(key, body)
+        self.shared.set(key, body, ttl=self.ttl)
+
+    async def respond(
+        self,
+        key: str,
+        response_model: Type[BaseModel],
+        builder: Callable[[], Awaitable[dict[str, Any] | bytes]],
+        request: Request | None = None,
+    ):
+        """
+        Return the cached response for key or build, serialize and cache it
+
+        When the request is passed, the response carries a weak ETag derived
+        from the key and a matching If-None-Match is answered with a 304
+        without building the response.
+
+        A builder may also return the already serialized body (e.g from the
+        database json fast path), which is sent and cached as is.
+
+        Args:
+            key (str): The cache key (see make_key)
+            response_model (Type[BaseModel]): The route's response model
+            builder (Callable[[], Awaitable[dict | bytes]]): Builds the response content on a miss
+            request (Request | None = None): The request, enables ETag validation
+
+        Returns:
+            Response
+        """
+        headers = {}
+        if request is not None:
+            etag = make_etag(key)
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+            # Check: client copy is still fresh
+            if etag_matches(etag, request.headers.get("if-none-match")):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
+
+        if self.enabled and (body := self.get(key)) is not None:
+            return Response(
+                content=body, media_type=ORJSONResponse.media_type, headers=headers
+            )
+
+        content = await builder()
+
+        # Check: pre-serialized body
+        if isinstance(content, bytes):
+            resp = Response(
+                content=content, media_type=ORJSONResponse.media_type, headers=headers
+            )
+        else:
+            # Build and serialize like FastAPI would with response_model
+            content = response_model.model_validate(content)
+            resp = ORJSONResponse(
+                content=content.model_dump(mode="json"), headers=headers
+            )
+
+        if self.enabled:
+            self.set(key, bytes(resp.body))
+
+        return resp
+
+
+def make_key(route: str, *, version: int | str, **params: Any):
+    """
+    Build a cache key from the route, the version and the request params
+
+    Sample:
+        poi-gsm-list:v3:poi_id=1
+    """
+    query = "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+    return f"{route}:v{version}:{query}"
+
+
+def make_etag(key: str):
+    """
+    Build a weak ETag from a cache key
+    """
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None):
+    """
+    Weak comparison of an ETag against an If-None-Match header
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+@lru_cache
+def get_response_cache():
+    """This function returns the response cache obj for the application."""
+    settings = get_settings()
+
+    # Load shared backend
+    module_name, class_name = settings.CACHE_BACKEND.rsplit(".", 1)
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+
+    return ResponseCache(
+        local=LRUCache(maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SEC),
+        shared=backend_class(),
+        ttl=settings.CACHE_TTL_SEC,
+        enabled=settings.CACHE_ENABLED,
+    )
@@ -1,5 +1,7 @@
 from typing import Any, Generic, Type, TypeVar
 
+from sqlalchemy import func, inspect, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 T = TypeVar("T")
@@ -8,12 +10,22 @@ T = TypeVar("T")
 class CRUDBase(Generic[T]):
     """
     CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+
+    The methods run in the caller's transaction (see get_session), they
+    flush but never commit.
     """
 
     def __init__(self, model: Type[T], db: Session):
         self.model = model
         self.db = db
-        self.qs = db.query(model)
+
+    @property
+    def qs(self):
+        return self.db.query(self.model)
+
+    @property
+    def pk(self):
+        return inspect(self.model).primary_key[0]
 
     async def create(self, *, data: dict[str, Any]):
         """
@@ -21,8 +33,7 @@ class CRUDBase(Generic[T]):
         """
         db_obj = self.model(**data)
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self.db.flush()
 
         return db_obj
 
@@ -41,3 +52,110 @@ class CRUDBase(Generic[T]):
         if return_qs:
             return self.qs
         return self.qs.all()
+
+    async def get_rows(self, *, columns: list[str], **kwargs):
+        """
+        Retrieve the columns of the matching objects, as rows
+
+        NOTE: The rows skip the ORM (no identity map, no change tracking),
+        for read only paths e.g the list endpoints' formatters
+
+        Returns:
+            list[Row]: The rows, their attributes named after the columns
+        """
+        stmt = select(*[getattr(self.model, column) for column in columns])
+
+        return list(self.db.execute(stmt.filter_by(**kwargs)))
+
+    async def get_many(self, *, ids: list[Any]):
+        """
+        Retrieve the objects of the ids, in one query
+
+        Returns:
+            list[T]: The objects found, in no particular order
+        """
+        if not ids:
+            return []
+
+        return list(self.db.scalars(select(self.model).where(self.pk.in_(ids))))
+
+    async def bulk_create(self, *, data: list[dict[str, Any]]):
+        """
+        Create objects, in one INSERT ... RETURNING
+
+        Returns:
+            list[T]: The created objects, in the order of the data
+        """
+        if not data:
+            return []
+
+        return list(self.db.scalars(insert(self.model).returning(self.model), data))
+
+    async def bulk_update(self, *, data: list[dict[str, Any]]):
+        """
+        Update objects by primary key, every dict holds the primary key and
+        the columns to set
+        """
+        if data:
+            self.db.execute(update(self.model), data)
+
+    async def upsert(
+        self,
+        *,
+        data: list[dict[str, Any]],
+        index_elements: list[str],
+        update_columns: list[str] | None = None,
+    ):
+        """
+        Create objects, INSERT ... ON CONFLICT
+
+        Args:
+            data (list[dict[str, Any]]): The objects' data
+            index_elements (list[str]): The columns of the unique index
+            update_columns (list[str] | None): The columns set on conflict, None skips
+                the conflicting rows
+
+        Returns:
+            list[T]: The created and updated objects, not the skipped ones
+        """
+        if not data:
+            return []
+
+        # ON CONFLICT is dialect specific
+        if self.db.get_bind().dialect.name == "postgresql":
+            stmt = postgresql.insert(self.model).values(data)
+        else:
+            stmt = sqlite.insert(self.model).values(data)
+
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+        return list(
+            self.db.scalars(
+                stmt.returning(self.model),
+                execution_options={"populate_existing": True},
+            )
+        )
+
+    async def exists(self, **kwargs):
+        """
+        Check if a matching object exists
+        """
+
+        return bool(
+            self.db.scalar(select(select(self.model).filter_by(**kwargs).exists()))
+        )
+
+    async def count(self, **kwargs):
+        """
+        Count the matching objects
+        """
+
+        return self.db.scalar(
+            select(func.count()).select_from(self.model).filter_by(**kwargs)
+        )
@@ -1,13 +1,26 @@
 from typing import Literal
+
+from fastapi import Request
+
 from app.common.types import PaginationParamsType
 from app.core.database import SessionLocal
 
 
-def get_session():
-    """This function creates a db session"""
+def get_session(request: Request):
+    """This function creates a db session, read only (replica) for GET requests
+
+    The request is one unit of work: the services only flush, the session
+    commits once after the route returned (its audit logs included) and rolls
+    back when it raised.
+    """
     session = SessionLocal()
+    session.info["read_only"] = request.method in ("GET", "HEAD")
     try:
         yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
     finally:
         session.close()
 
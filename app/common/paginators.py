@@ -1,8 +1,16 @@
 """This module contains the pagination logic for the application."""
 
+import base64
+import binascii
 import math
+from typing import Type
+
+import orjson
+from pydantic import BaseModel
 from sqlalchemy.orm import Query
 
+from app.common.exceptions import BadRequest
+
 
 def get_pagination_metadata(*, tno_items: int, count: int, page: int, size: int):
     """This function is used to the pagination metadata of a response.
@@ -50,3 +58,65 @@ def paginate(*, qs: Query, page: int, size: int):
         Query: The paginated qs
     """
     return qs.limit(size).offset(size * (page - 1)).all()
+
+
+def build_paginated_json(
+    *, response_model: Type[BaseModel], data: bytes, meta: dict, msg: str | None = None
+):
+    """This function splices a pre-serialized data array into the paginated envelope
+
+    Args:
+        response_model (Type[BaseModel]): The route's response model, used for the default msg
+        data (bytes): The serialized json array of items
+        meta (dict): The pagination metadata (see get_pagination_metadata)
+        msg (str | None = None): The response message, defaults to the model's msg
+
+    Returns:
+        bytes: The serialized response body
+    """
+    fields = response_model.model_fields
+    envelope = {
+        "status": fields["status"].default,
+        "msg": msg or fields["msg"].default,
+        "meta": meta,
+    }
+
+    # Splice data in before the closing brace
+    return orjson.dumps(envelope)[:-1] + b',"data":' + data + b"}"
+
+
+def encode_cursor(*values):
+    """This function encodes the keyset of the last item returned as a page cursor
+
+    Args:
+        *values: The keyset values, e.g (created_at, id)
+
+    Returns:
+        str: The opaque, url safe cursor
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int):
+    """This function decodes a page cursor (see encode_cursor)
+
+    Args:
+        cursor (str): The cursor
+        size (int): The number of keyset values
+
+    Raises:
+        BadRequest
+
+    Returns:
+        list: The keyset values, json types (e.g datetimes are iso strings)
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        raise BadRequest("Invalid cursor", loc=["query", "cursor"])
+
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequest("Invalid cursor", loc=["query", "cursor"])
+
+    return values
@@ -29,3 +29,20 @@ class PaginatedResponseSchema(ResponseSchema):
     """
 
     meta: PaginationSchema = Field(description="The pagination metadata")
+
+
+class KeysetPaginationSchema(BaseModel):
+    """The keyset (cursor) pagination schema for the application."""
+
+    size: int = Field(description="Max number of items to return per page")
+    count: int = Field(description="The number of items returned")
+    next_cursor: str | None = Field(description="The cursor of the next page")
+    has_next_page: bool = Field(description="Indicates if there is a next page")
+
+
+class KeysetPaginatedResponseSchema(ResponseSchema):
+    """
+    Generic schema for keyset paginated responses
+    """
+
+    meta: KeysetPaginationSchema = Field(description="The pagination metadata")
@@ -1,5 +1,13 @@
+import base64
+import binascii
 import calendar
 import difflib
+import hashlib
+import zlib
+from datetime import date, time
+from enum import Enum
+
+import orjson
 
 
 async def get_last_day_of_month(year: int, month: int):
@@ -17,6 +25,79 @@ async def dict_to_string(d: dict):
     return ", ".join([f"{key}={value}" for key, value in d.items()])
 
 
+def audit_value(value):
+    """
+    Get a value as stored in the audit changes
+
+    Binary contents (bytes and base64 data urls, e.g a pfp) are replaced by
+    their sha256, dates and times by their iso format
+    """
+    if isinstance(value, str) and value.startswith("data:") and ";base64," in value:
+        try:
+            value = base64.b64decode(value.split(",", 1)[1], validate=True)
+        except (binascii.Error, ValueError):
+            value = value.encode()
+    if isinstance(value, bytes):
+        return f"sha256:{hashlib.sha256(value).hexdigest()}"
+
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: audit_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [audit_value(item) for item in value]
+    return value
+
+
+def audit_change(old, new):
+    """
+    Get the audit change of a field: [old, new]
+    """
+    return [audit_value(old), audit_value(new)]
+
+
+def created_changes(data: dict):
+    """
+    Get the audit changes of a created object: field -> [None, value]
+    """
+    return {
+        field: audit_change(None, value)
+        for field, value in data.items()
+        if value is not None
+    }
+
+
+def pack_changes(changes: dict | None, compress_min_bytes: int):
+    """
+    Pack audit changes for storage
+
+    Args:
+        changes (dict | None): The changes, field -> [old, new]
+        compress_min_bytes (int): The JSON size from which they're compressed
+
+    Returns:
+        tuple[dict | None, bytes | None]: The changes or their zlib compressed JSON
+    """
+    if not changes:
+        return None, None
+
+    encoded = orjson.dumps(changes)
+    if len(encoded) < compress_min_bytes:
+        return changes, None
+    return None, zlib.compress(encoded)
+
+
+def unpack_changes(changes: dict | None, compressed: bytes | None):
+    """
+    Get the audit changes of a log, see pack_changes
+    """
+    if compressed is not None:
+        return orjson.loads(zlib.decompress(compressed))
+    return changes
+
+
 async def find_all_matches(query: str, options: list[str], cutoff: float = 0.5):
     """
     Get all close matches from the options list based on the cutoff similarity
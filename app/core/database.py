@@ -1,17 +1,288 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable
+
+from sqlalchemy import (
+    Engine,
+    Select,
+    UpdateBase,
+    create_engine,
+    event,
+    make_url,
+    text,
+)
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 from sqlalchemy.orm import declarative_base
 
-from app.core.settings import get_settings
+from app.core.metrics import (
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from app.core.querywatch import watch_engine
+from app.core.settings import Settings, get_settings, get_worker_count
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Append only tables, writing them doesn't pin the session to the primary
+STICKY_IGNORED_TABLES = {"audit_logs", "login_attempts"}
+
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def get_pool_options(settings: Settings):
+    """
+    Get the pool options of an engine
+
+    The connection budget (DB_MAX_CONNECTIONS) is shared by all the worker
+    processes (see get_worker_count), each worker's pool gets its share with
+    a quarter of it as overflow unless DB_POOL_SIZE/DB_MAX_OVERFLOW are set.
+
+    Args:
+        settings (Settings): The app settings
+
+    Returns:
+        dict: The create_engine kwargs
+    """
+    # Null pool, PgBouncer does the pooling (transaction mode)
+    if settings.DB_POOL_MODE == "null":
+        return {"poolclass": InstrumentedNullPool}
+
+    # Share of the connection budget
+    per_worker = max(settings.DB_MAX_CONNECTIONS // get_worker_count(settings), 1)
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if max_overflow is None:
+        max_overflow = per_worker // 4
+    pool_size = settings.DB_POOL_SIZE
+    if pool_size is None:
+        pool_size = max(per_worker - max_overflow, 1)
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": pool_size,  # The size of the connection pool
+        "max_overflow": max_overflow,  # The connections opened beyond the pool size
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SEC,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SEC,
+    }
+
+
+def create_db_engine(url: str, name: str, settings: Settings):
+    """
+    Create an engine with the configured pool
+
+    Args:
+        url (str): The database url
+        name (str): The pool name, used in the logs and metrics
+        settings (Settings): The app settings
+
+    Returns:
+        Engine
+    """
+    connect_args = {}
+
+    # No server side prepared statements, they break PgBouncer's transaction
+    # mode. psycopg2 never prepares, psycopg 3 does after 5 executions
+    if settings.DB_POOL_MODE == "null" and make_url(url).drivername.endswith(
+        "+psycopg"
+    ):
+        connect_args["prepare_threshold"] = None
+
+    engine = create_engine(
+        url=url,
+        pool_logging_name=name,
+        connect_args=connect_args,
+        **get_pool_options(settings),
+    )
+
+    # Request metrics and the slow query log/N+1 detector
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+    if settings.QUERY_WATCH_MODE != "off":
+        watch_engine(engine)
+
+    return engine
+
+
+class ReplicaSet:
+    """
+    Round robin over the replicas whose replication lag is within max_lag
+    """
+
+    def __init__(self, engines: list[Engine], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lags: dict[Engine, tuple[float, float]] = {}  # engine -> (lag, checked_at)
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def get_lag(self, engine: Engine):
+        """
+        Get a replica's replication lag in seconds, inf when it is unreachable
+        """
+        if engine.dialect.name != "postgresql":
+            return 0.0
+
+        try:
+            with engine.connect() as conn:
+                return float(conn.execute(text(REPLICA_LAG_SQL)).scalar_one())
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Replica %s is unreachable", engine.pool.logging_name)
+            return float("inf")
+
+    def is_healthy(self, engine: Engine):
+        """
+        Check the (cached) lag of a replica
+        """
+        now = time.monotonic()
+        with self.lock:
+            lag, checked_at = self.lags.get(engine, (0.0, float("-inf")))
+            stale = now - checked_at >= self.check_interval
+            if stale:
+                # Other threads use the previous value while this one checks
+                self.lags[engine] = (lag, now)
+
+        if stale:
+            lag = self.get_lag(engine)
+            with self.lock:
+                self.lags[engine] = (lag, now)
+
+        return lag <= self.max_lag
+
+    def choose(self):
+        """
+        Get the next healthy replica
 
-engine = create_engine(
-    url=settings.POSTGRES_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=100,  # The size of the connection pool
-    max_overflow=50,  # The maximum number of connections that can be opened beyond the pool size. Set to -1 for no limit.
+        Returns:
+            Engine | None: The replica, None when none is healthy
+        """
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self.counter) % len(self.engines)]
+            if self.is_healthy(engine):
+                return engine
+
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Session sending the reads of read only sessions to a replica
+
+    A read only session (i.e of a GET request) picks one replica for its
+    lifetime. Once it writes a table other than the append only logs, the
+    following reads go to the primary, the session reads its own writes.
+    Sessions that are not read only always use the primary.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if not self.info.get("read_only") or self.replicas is None:
+            return primary
+
+        # Writes
+        if self._flushing or isinstance(clause, UpdateBase):
+            if mapper is not None:
+                tables = {table.name for table in mapper.tables}
+            elif isinstance(clause, UpdateBase):
+                tables = {getattr(clause.table, "name", "")}
+            else:
+                tables = set()
+
+            if tables - STICKY_IGNORED_TABLES:
+                self.info["sticky"] = True
+            return primary
+
+        # Reads, locking and raw sql reads stay on the primary
+        if (
+            not isinstance(clause, Select)
+            or clause._for_update_arg is not None  # pylint: disable=protected-access
+            or self.info.get("sticky")
+        ):
+            return primary
+
+        if "replica" not in self.info:
+            self.info["replica"] = self.replicas.choose()
+
+        return self.info["replica"] or primary
+
+
+@lru_cache
+def get_engine():
+    """
+    Get the primary engine, created on first use
+    """
+    return create_db_engine(settings.POSTGRES_DATABASE_URL, "primary", settings)
+
+
+@lru_cache
+def get_replicas():
+    """
+    Get the replica set, created on first use
+    """
+    return ReplicaSet(
+        engines=[
+            create_db_engine(url, f"replica-{i}", settings)
+            for i, url in enumerate(settings.DB_REPLICA_URLS)
+        ],
+        max_lag=settings.DB_REPLICA_MAX_LAG_SEC,
+        check_interval=settings.DB_REPLICA_LAG_CHECK_SEC,
+    )
+
+
+class AppSession(RoutingSession):
+    """
+    Routing session on the app's engines, i.e importing the models or the
+    session factory doesn't create an engine
+    """
+
+    def __init__(self, **kwargs):
+        replicas = get_replicas()
+
+        kwargs["bind"] = kwargs.get("bind") or get_engine()
+        kwargs.setdefault("replicas", replicas if replicas.engines else None)
+        super().__init__(**kwargs)
+
+
+# The request commits once, after the response is built (see get_session),
+# nothing reads the objects after it, expiring them would only force reloads
+SessionLocal = sessionmaker(
+    class_=AppSession, autocommit=False, autoflush=False, expire_on_commit=False
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def on_commit(session: Session, callback: Callable[[], Any]):
+    """
+    Run the callback once the session commits, e.g invalidate the cache of
+    the changed rows. A rollback drops it.
+    """
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def run_on_commit(session: Session):
+    for callback in session.info.pop("on_commit", []):
+        callback()
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def drop_on_commit(session: Session, previous_transaction: SessionTransaction):
+    if not previous_transaction.nested:
+        session.info.pop("on_commit", None)
+
 
 DBBase = declarative_base()
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
@@ -8,15 +10,20 @@ from app.core.settings import get_settings
 
 # Globals
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
-async def base_exception_handler(_: Request, exc: Exception):
+async def base_exception_handler(request: Request, exc: Exception):
     """
     Exception handler for 'NotFound' exception
     """
     # Send email to staff
-    if settings.DEBUG:
-        print(exc)
+    logger.error(
+        "Unhandled exception on %s %s",
+        request.method,
+        request.url.path,
+        exc_info=exc,
+    )
     # sendgrid.send_email()
     return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -50,13 +57,21 @@ async def request_validation_exception_handler(_: Request, exc: RequestValidatio
     )
 
 
-async def internal_server_error_exception_handler(_: Request, exc: InternalServerError):
+async def internal_server_error_exception_handler(
+    request: Request, exc: InternalServerError
+):
     """
     Exception handler for 'InternalServerError' exception
     """
     # Send email to staff
     # sendgrid.send_email()
-    print(exc)
+    logger.error(
+        "Internal server error on %s %s: %s (loc: %s)",
+        request.method,
+        request.url.path,
+        exc.msg,
+        exc.loc,
+    )
     return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=jsonable_encoder(
@@ -0,0 +1,390 @@
+"""This module contains the request instrumentation for the application."""
+
+import bisect
+import contextvars
+import threading
+import time
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestStats:
+    """
+    The db stats of the current request
+    """
+
+    __slots__ = ("db_time", "pool_wait", "queries", "rows")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+# Stats of the request being handled, shared with the threadpool
+current_request_stats: contextvars.ContextVar[RequestStats | None] = (
+    contextvars.ContextVar("current_request_stats", default=None)
+)
+
+
+class Counter:
+    """
+    Prometheus counter with labels
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, value: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for labels, value in self.values.items():
+            base = format_labels(self.labels, labels)
+            lines.append(f"{self.name}{{{base}}} {value}")
+
+        return lines
+
+
+class Gauge(Counter):
+    """
+    Prometheus gauge with labels
+    """
+
+    kind = "gauge"
+
+    def set(self, labels: tuple, value: float):
+        self.values[labels] = value
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        buckets: list[float],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple, value: float):
+        # counts per bucket (+Inf last), [sum]
+        if (item := self.values.get(labels)) is None:
+            item = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        item[0][bisect.bisect_left(self.buckets, value)] += 1
+        item[1][0] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total) in self.values.items():
+            base = format_labels(self.labels, labels)
+
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+
+            lines.append(f"{self.name}_sum{{{base}}} {total[0]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The per process request metrics
+
+    NOTE: Every worker process has its own registry, scrape each worker or
+    aggregate them in the scraper.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter(
+            "http_requests_total",
+            "The number of handled requests",
+            ("method", "route", "status"),
+        )
+        self.duration = Histogram(
+            "http_request_duration_seconds",
+            "The wall time of the requests",
+            ("method", "route"),
+            [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+        )
+        self.db_duration = Histogram(
+            "http_request_db_duration_seconds",
+            "The time spent in db queries per request",
+            ("method", "route"),
+            [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+        )
+        self.db_queries = Histogram(
+            "http_request_db_queries",
+            "The number of db queries per request",
+            ("method", "route"),
+            [1, 2, 5, 10, 20, 50, 100, 200],
+        )
+        self.db_rows = Counter(
+            "http_request_db_rows_total",
+            "The number of rows fetched from the db",
+            ("method", "route"),
+        )
+        self.response_size = Counter(
+            "http_response_size_bytes_total",
+            "The size of the response bodies sent",
+            ("method", "route"),
+        )
+        self.pool_wait = Histogram(
+            "db_pool_checkout_wait_seconds",
+            "The time spent waiting for a connection from the pool",
+            ("pool",),
+            [0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30],
+        )
+        self.pool_timeouts = Counter(
+            "db_pool_checkout_timeouts_total",
+            "The number of checkouts that timed out waiting for a connection",
+            ("pool",),
+        )
+        self.pool_connections = Gauge(
+            "db_pool_connections",
+            "The connections of the pool by state",
+            ("pool", "state"),
+        )
+
+    def record(
+        self,
+        *,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        stats: RequestStats,
+        size: int,
+    ):
+        """
+        Record a finished request
+        """
+        labels = (method, route)
+        with self.lock:
+            self.requests.inc((method, route, str(status)))
+            self.duration.observe(labels, duration)
+            self.db_duration.observe(labels, stats.db_time)
+            self.db_queries.observe(labels, stats.queries)
+            self.db_rows.inc(labels, stats.rows)
+            self.response_size.inc(labels, size)
+
+    def record_checkout(self, *, pool: str, wait: float, timed_out: bool):
+        """
+        Record a pool checkout
+        """
+        with self.lock:
+            if timed_out:
+                self.pool_timeouts.inc((pool,))
+            else:
+                self.pool_wait.observe((pool,), wait)
+
+    def record_pool_status(self, pool: Pool):
+        """
+        Record the connections of a queue pool, other pools hold none
+        """
+        if not isinstance(pool, QueuePool):
+            return
+
+        name = pool.logging_name or "default"
+        with self.lock:
+            self.pool_connections.set((name, "size"), pool.size())
+            self.pool_connections.set((name, "checked_out"), pool.checkedout())
+            self.pool_connections.set((name, "idle"), pool.checkedin())
+            self.pool_connections.set((name, "overflow"), max(pool.overflow(), 0))
+
+    def render(self):
+        """
+        Render the metrics in the prometheus text format
+        """
+        with self.lock:
+            lines = []
+            for metric in [
+                self.requests,
+                self.duration,
+                self.db_duration,
+                self.db_queries,
+                self.db_rows,
+                self.response_size,
+                self.pool_wait,
+                self.pool_timeouts,
+                self.pool_connections,
+            ]:
+                lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def format_labels(names: tuple[str, ...], values: tuple):
+    """
+    Format label names and values as prometheus labels
+    """
+    return ",".join(
+        f'{name}="{escape_label(value)}"' for name, value in zip(names, values)
+    )
+
+
+def escape_label(value):
+    """
+    Escape a prometheus label value
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Start the timer of a query
+    """
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Add a query's time and rows to the current request's stats
+    """
+    stats = current_request_stats.get()
+    if stats is None or context is None:
+        return
+
+    stats.db_time += time.perf_counter() - context._query_start
+    stats.queries += 1
+    stats.rows += max(cursor.rowcount, 0)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Record the queries of the engine in the current request's stats
+    """
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class InstrumentedPoolMixin:
+    """
+    Records the time every checkout waits for a connection, i.e the pool
+    contention that is otherwise invisible in the request latency
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()  # type: ignore
+        except PoolTimeoutError:
+            registry.record_checkout(
+                pool=self.logging_name or "default",  # type: ignore
+                wait=time.perf_counter() - start,
+                timed_out=True,
+            )
+            raise
+
+        wait = time.perf_counter() - start
+        registry.record_checkout(
+            pool=self.logging_name or "default",  # type: ignore
+            wait=wait,
+            timed_out=False,
+        )
+        if (stats := current_request_stats.get()) is not None:
+            stats.pool_wait += wait
+
+        return conn
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """
+    Queue pool recording its checkout wait times
+    """
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    """
+    Null pool recording its connect times (e.g behind PgBouncer)
+    """
+
+
+class InstrumentationMiddleware:
+    """
+    Records the wall time, db time, query count, rows fetched and response
+    size of every request per route, and sends them in a Server-Timing header
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status, size
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+                # The handler is done when the response starts
+                total = (time.perf_counter() - start) * 1e3
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_time * 1e3:.1f};desc="{stats.queries} queries",'
+                    f" pool;dur={stats.pool_wait * 1e3:.1f},"
+                    f" app;dur={total:.1f}",
+                )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+
+            # Label by route template, not path, to bound the cardinality
+            route = scope.get("route")
+            registry.record(
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status=status,
+                duration=time.perf_counter() - start,
+                stats=stats,
+                size=size,
+            )
@@ -0,0 +1,198 @@
+"""This module contains the slow query log and N+1 detector for the application."""
+
+import contextvars
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Globals
+logger = logging.getLogger(__name__)
+
+# Bound params, numbers and strings collapse to '?', IN lists to '(?)'
+PARAM_RE = re.compile(r"%\(\w+\)s|:\w+|\?|\$\d+|\b\d+\b|'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+class NPlusOneQueryDetected(Exception):
+    """
+    Raised in 'raise' mode when a statement shape repeats within a request
+    """
+
+
+class QueryWatch:
+    """
+    The statement fingerprints of the current request (or watched block)
+    """
+
+    __slots__ = ("name", "mode", "scope", "counts", "flagged")
+
+    def __init__(self, name: str, mode: str, scope: Scope | None = None):
+        self.name = name
+        self.mode = mode
+        self.scope = scope
+        self.counts: dict[str, int] = {}
+        self.flagged: set[str] = set()
+
+    @property
+    def label(self):
+        # Label requests by route template once routed
+        if self.scope is not None and (route := self.scope.get("route")) is not None:
+            return f"{self.scope['method']} {route.path}"
+
+        return self.name
+
+
+class QueryWatchConfig:
+    """
+    The detector settings, set by configure_query_watch
+    """
+
+    mode = "off"
+    sample_rate = 1.0
+    slow_query_ms = 200.0
+    n_plus_one_threshold = 5
+
+
+config = QueryWatchConfig()
+current_query_watch: contextvars.ContextVar[QueryWatch | None] = (
+    contextvars.ContextVar("current_query_watch", default=None)
+)
+
+
+def fingerprint(statement: str):
+    """
+    Reduce a statement to its shape
+
+    Sample:
+        SELECT * FROM pois WHERE id IN (%(id_1)s, %(id_2)s) LIMIT 1
+        -> SELECT * FROM pois WHERE id IN (?) LIMIT ?
+    """
+    shape = PARAM_RE.sub("?", statement)
+    shape = IN_LIST_RE.sub("(?)", shape)
+    return WHITESPACE_RE.sub(" ", shape).strip()
+
+
+def parameter_shape(parameters):
+    """
+    Get the types of the bound params, never their values
+    """
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+
+    return type(parameters).__name__
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Start the timer of a query
+    """
+    if context is not None and current_query_watch.get() is not None:
+        context._watch_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Log slow queries and flag repeated statement shapes
+    """
+    watch = current_query_watch.get()
+    if watch is None or context is None:
+        return
+
+    # Check: slow query
+    duration_ms = (time.perf_counter() - context._watch_start) * 1e3
+    if duration_ms > config.slow_query_ms:
+        logger.warning(
+            "Slow query (%.1fms) on %s: %s params=%s",
+            duration_ms,
+            watch.label,
+            " ".join(statement.split()),
+            parameter_shape(parameters),
+        )
+
+    # Check: N+1
+    shape = fingerprint(statement)
+    count = watch.counts[shape] = watch.counts.get(shape, 0) + 1
+    if count >= config.n_plus_one_threshold and shape not in watch.flagged:
+        watch.flagged.add(shape)
+
+        msg = f"N+1 query on {watch.label}: {count}x {shape}"
+        if watch.mode == "raise":
+            raise NPlusOneQueryDetected(msg)
+        logger.warning(msg)
+
+
+@contextmanager
+def watch_queries(name: str, mode: str | None = None):
+    """
+    Watch the queries of a block outside a request (e.g in tests or scripts)
+
+    Args:
+        name (str): The label used in the logs
+        mode (str | None = None): 'log' or 'raise', defaults to the configured mode
+    """
+    token = current_query_watch.set(QueryWatch(name=name, mode=mode or config.mode))
+    try:
+        yield
+    finally:
+        current_query_watch.reset(token)
+
+
+class QueryWatchMiddleware:
+    """
+    Watches the queries of a sample of the requests
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Sample the requests, production watches a fraction of the traffic
+        if scope["type"] != "http" or random.random() >= config.sample_rate:
+            return await self.app(scope, receive, send)
+
+        watch = QueryWatch(
+            name=f"{scope['method']} {scope['path']}", mode=config.mode, scope=scope
+        )
+        token = current_query_watch.set(watch)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_watch.reset(token)
+
+
+def configure_query_watch(
+    *,
+    mode: str,
+    sample_rate: float = 1.0,
+    slow_query_ms: float = 200,
+    n_plus_one_threshold: int = 5,
+):
+    """
+    Configure the detector
+
+    Args:
+        mode (str): 'off', 'log' or 'raise'
+        sample_rate (float = 1.0): The share of the requests to watch
+        slow_query_ms (float = 200): Log queries slower than this
+        n_plus_one_threshold (int = 5): Flag statement shapes repeated this often
+    """
+    config.mode = mode
+    config.sample_rate = sample_rate
+    config.slow_query_ms = slow_query_ms
+    config.n_plus_one_threshold = n_plus_one_threshold
+
+
+def watch_engine(engine: Engine):
+    """
+    Listen to the engine's queries
+    """
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
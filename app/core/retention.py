@@ -0,0 +1,541 @@
+"""
+Retention purge of soft deleted rows, old login attempts and audit logs
+
+Hard deletes, in small transactions with a pause between them:
+
+    - the pois soft deleted more than RETENTION_DELETED_DAYS ago, with all
+      their child rows, RETENTION_POI_BATCH_SIZE pois per transaction
+    - the child rows deleted on their own (the poi isn't deleted) more than
+      RETENTION_DELETED_DAYS ago
+    - the login attempts older than RETENTION_LOGIN_ATTEMPT_DAYS
+
+and keeps the monthly partitions of audit_logs (postgres): the partitions of
+the next AUDIT_LOG_PARTITIONS_AHEAD months are created, rows that went to the
+default partition meanwhile are moved into them, and with
+RETENTION_AUDIT_LOG_MONTHS set the partitions of older months are dropped
+whole instead of deleting their rows. Before any of it the hourly audit log
+rollups (audit_log_rollups, counts per user, resource and verb) are refreshed
+from the last rolled up hour on, so they keep the counts of dropped months.
+
+Rows are picked with `DELETE ... WHERE ctid IN (SELECT ctid ... LIMIT n FOR
+UPDATE SKIP LOCKED)` on postgres, so a batch never waits on the rows a
+request holds and only locks RETENTION_BATCH_SIZE rows for a moment. A batch
+still waiting for a lock after RETENTION_LOCK_TIMEOUT_MS is rolled back and
+the table is left to the next run. The rows of a deleted poi go with the poi,
+in its transaction, so a concurrent restore never gets a poi back without
+its rows.
+
+With RETENTION_ARCHIVE_DIR set, the deleted rows are first appended to
+gzipped JSON lines files there (<table>-<run start>.jsonl.gz), before their
+batch commits. A batch that then fails to commit is archived anyway.
+
+Usage:
+    python -m app.core.retention                  # purge once, e.g from cron
+    python -m app.core.retention --dry-run        # count the rows to purge
+    python -m app.core.retention --interval 3600  # keep running as a worker
+"""
+
+import argparse
+import base64
+import gzip
+import logging
+import re
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+from sqlalchemy import (
+    Connection,
+    Delete,
+    and_,
+    delete,
+    exists,
+    func,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+
+from app.audit import models as audit_models
+from app.core.database import get_engine
+from app.core.settings import Settings, get_settings
+from app.poi import models
+from app.user import models as user_models
+
+# Globals
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+POIS = models.POI.__table__
+LOGIN_ATTEMPTS = user_models.LoginAttempt.__table__
+AUDIT_LOGS = user_models.AuditLog.__table__
+ROLLUPS = audit_models.AuditLogRollup.__table__
+ROLLUP_CHUNK_HOURS = 24  # Hours rolled up per transaction
+
+# audit_logs_pYYYYMM holds the rows of the month (the first one also the rows
+# from before the partitioning), months are in UTC
+PARTITION_NAME = re.compile(r"audit_logs_p(\d{4})(\d{2})")
+PARTITIONS_SQL = """
+SELECT c.relname
+FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass('audit_logs')
+"""
+
+# Soft deleted child tables of the pois, fingerprint_keys cascade from
+# fingerprints (the keys of deleted prints are already gone)
+CHILD_TABLES = [
+    models.IDDocument.__table__,
+    models.GSMNumber.__table__,
+    models.ResidentialAddress.__table__,
+    models.KnownAssociate.__table__,
+    models.EmploymentHistory.__table__,
+    models.VeteranStatus.__table__,
+    models.EducationalBackground.__table__,
+    models.POIOffense.__table__,
+    models.FrequentedSpot.__table__,
+    models.Fingerprint.__table__,
+]
+
+
+def add_months(month: date, months: int):
+    """
+    Get the first day of the month, months after the month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bound(month: date):
+    return f"'{month} 00:00:00+00'"
+
+
+def encode(value):
+    """
+    Encode the values orjson doesn't serialize
+    """
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    raise TypeError
+
+
+class Archive:
+    """
+    Appends purged rows to a gzipped JSON lines file per table
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    def write(self, table: str, rows):
+        if not rows:
+            return
+
+        # Every batch is a gzip member of its own, the file stays readable
+        path = self.directory / f"{table}-{self.stamp}.jsonl.gz"
+        with gzip.open(path, "ab") as file:
+            for row in rows:
+                file.write(orjson.dumps(dict(row), default=encode) + b"\n")
+
+
+class RetentionPurge:
+    """
+    One purge run, see the module docstring
+    """
+
+    def __init__(self, settings: Settings, stop: threading.Event):
+        self.settings = settings
+        self.stop = stop
+        self.engine = get_engine()
+        self.archive = None
+        if settings.RETENTION_ARCHIVE_DIR:
+            self.archive = Archive(settings.RETENTION_ARCHIVE_DIR)
+        self.purged: dict[str, int] = {}
+        self.skipped: list[str] = []
+
+        now = datetime.now()
+        self.this_month = datetime.now(timezone.utc).date().replace(day=1)
+        self.deleted_cutoff = now - timedelta(days=settings.RETENTION_DELETED_DAYS)
+        self.login_cutoff = now - timedelta(days=settings.RETENTION_LOGIN_ATTEMPT_DAYS)
+
+    def deleted_pois(self):
+        return and_(POIS.c.is_deleted, POIS.c.deleted_at < self.deleted_cutoff)
+
+    def deleted_rows(self, table):
+        # The rows of deleted pois go with their poi
+        return and_(
+            table.c.is_deleted,
+            table.c.deleted_at < self.deleted_cutoff,
+            ~exists().where(POIS.c.id == table.c.poi_id, POIS.c.is_deleted),
+        )
+
+    def old_login_attempts(self):
+        return LOGIN_ATTEMPTS.c.attempted_at < self.login_cutoff
+
+    @contextmanager
+    def transaction(self):
+        """
+        A batch transaction, it gives up on locks held too long
+        """
+        with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(
+                    text("SELECT set_config('lock_timeout', :timeout, true)"),
+                    {"timeout": f"{self.settings.RETENTION_LOCK_TIMEOUT_MS}ms"},
+                )
+            yield conn
+
+    def delete(self, conn: Connection, table, stmt: Delete):
+        """
+        Run the delete, archiving the rows
+
+        Returns:
+            int: The number of rows deleted
+        """
+        if self.archive is None:
+            deleted = conn.execute(stmt).rowcount
+        else:
+            rows = conn.execute(stmt.returning(*table.c)).mappings().all()
+            self.archive.write(table.name, rows)
+            deleted = len(rows)
+
+        return deleted
+
+    def count(self, table, deleted: int):
+        """
+        Add the rows of a committed batch to the run's totals
+        """
+        self.purged[table.name] = self.purged.get(table.name, 0) + deleted
+
+    def pause(self):
+        """
+        Wait between batches, returns True when the run is stopped
+        """
+        return self.stop.wait(self.settings.RETENTION_BATCH_PAUSE_MS / 1000)
+
+    def purge_pois(self):
+        """
+        Delete the deleted pois, with their rows, in batches
+        """
+        while not self.stop.is_set():
+            try:
+                with self.transaction() as conn:
+                    poi_ids = conn.scalars(
+                        select(POIS.c.id)
+                        .where(self.deleted_pois())
+                        .limit(self.settings.RETENTION_POI_BATCH_SIZE)
+                        .with_for_update(skip_locked=True)
+                    ).all()
+                    if not poi_ids:
+                        return
+
+                    # Children first, the cascade has nothing left to delete
+                    deleted = {}
+                    for table in [*CHILD_TABLES, POIS]:
+                        column = POIS.c.id if table is POIS else table.c.poi_id
+                        stmt = delete(table).where(column.in_(poi_ids))
+                        deleted[table] = self.delete(conn, table, stmt)
+            except OperationalError as exc:
+                logger.warning("pois: batch left to the next run (%s)", exc.orig)
+                self.skipped.append(POIS.name)
+                return
+
+            for table, rows in deleted.items():
+                self.count(table, rows)
+            logger.info("pois: %d purged", self.purged[POIS.name])
+            if len(poi_ids) < self.settings.RETENTION_POI_BATCH_SIZE or self.pause():
+                return
+
+    def purge_rows(self, table, where):
+        """
+        Delete the matching rows of the table in batches
+        """
+        size = self.settings.RETENTION_BATCH_SIZE
+        while not self.stop.is_set():
+            try:
+                with self.transaction() as conn:
+                    # The physical row address, no second index lookup
+                    if conn.dialect.name == "postgresql":
+                        ctid = literal_column("ctid")
+                        batch = ctid.in_(
+                            select(ctid)
+                            .select_from(table)
+                            .where(where)
+                            .limit(size)
+                            .with_for_update(skip_locked=True)
+                        )
+                    else:
+                        batch = table.c.id.in_(
+                            select(table.c.id).where(where).limit(size)
+                        )
+
+                    deleted = self.delete(conn, table, delete(table).where(batch))
+            except OperationalError as exc:
+                logger.warning(
+                    "%s: batch left to the next run (%s)", table.name, exc.orig
+                )
+                self.skipped.append(table.name)
+                return
+
+            self.count(table, deleted)
+            if deleted:
+                logger.info("%s: %d purged", table.name, self.purged[table.name])
+            if deleted < size or self.pause():
+                return
+
+    def roll_up_audit_logs(self):
+        """
+        Refresh the hourly audit log rollups, from the last rolled up hour on
+        """
+        with self.engine.connect() as conn:
+            dialect = conn.dialect.name
+
+            # The last hour is counted again, it was partial (late commits too)
+            start = conn.scalar(select(func.max(ROLLUPS.c.hour)))
+            if start is not None:
+                start -= timedelta(hours=1)
+            else:
+                start = conn.scalar(select(func.min(AUDIT_LOGS.c.created_at)))
+                if start is None:
+                    return
+                start = start.replace(minute=0, second=0, microsecond=0)
+
+        # e.g get:12 -> get
+        created_at, action = AUDIT_LOGS.c.created_at, AUDIT_LOGS.c.action
+        if dialect == "postgresql":
+            insert = postgresql.insert
+            hour = func.date_trunc("hour", created_at)
+            verb = func.split_part(action, ":", 1)
+        else:
+            insert = sqlite.insert
+            hour = func.strftime("%Y-%m-%d %H:00:00.000000", created_at)
+            verb = func.substr(action, 1, func.instr(action + ":", ":") - 1)
+
+        first, now = start, datetime.now(start.tzinfo)
+        while start <= now and not self.stop.is_set():
+            end = start + timedelta(hours=ROLLUP_CHUNK_HOURS)
+            counts = (
+                select(
+                    hour,
+                    AUDIT_LOGS.c.user_id,
+                    AUDIT_LOGS.c.resource,
+                    verb,
+                    func.count(),
+                )
+                .where(created_at >= start, created_at < end)
+                .group_by(hour, AUDIT_LOGS.c.user_id, AUDIT_LOGS.c.resource, verb)
+            )
+            stmt = insert(ROLLUPS).from_select(
+                ["hour", "user_id", "resource", "verb", "count"], counts
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["hour", "user_id", "resource", "verb"],
+                set_={"count": stmt.excluded["count"]},
+            )
+            try:
+                with self.transaction() as conn:
+                    conn.execute(stmt)
+            except OperationalError as exc:
+                logger.warning("%s: left to the next run (%s)", ROLLUPS.name, exc.orig)
+                self.skipped.append(ROLLUPS.name)
+                return
+
+            start = end
+
+        logger.info("%s: rolled up from %s", ROLLUPS.name, first)
+
+    def audit_log_partitions(self):
+        """
+        Get the monthly partitions of audit_logs
+
+        Returns:
+            dict[date, str]: month -> partition, empty when it isn't partitioned
+        """
+        with self.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return {}
+            names = conn.scalars(text(PARTITIONS_SQL)).all()
+
+        partitions = {}
+        for name in names:
+            if match := PARTITION_NAME.fullmatch(name):
+                partitions[date(int(match[1]), int(match[2]), 1)] = name
+        return dict(sorted(partitions.items()))
+
+    def expired_audit_log_partitions(self, partitions: dict[date, str]):
+        keep = self.settings.RETENTION_AUDIT_LOG_MONTHS
+        if keep is None:
+            return []
+
+        cutoff = add_months(self.this_month, -keep)
+        return [name for month, name in partitions.items() if month < cutoff]
+
+    def create_audit_log_partitions(self):
+        """
+        Create the partitions of the months ahead
+        """
+        partitions = self.audit_log_partitions()
+        if not partitions:
+            return
+
+        # From the last partition on, no month is left to the default partition
+        month = add_months(max(partitions), 1)
+        last = add_months(self.this_month, self.settings.AUDIT_LOG_PARTITIONS_AHEAD)
+        while month <= last and not self.stop.is_set():
+            name = f"audit_logs_p{month:%Y%m}"
+            start, end = month_bound(month), month_bound(add_months(month, 1))
+            try:
+                with self.transaction() as conn:
+                    conn.execute(
+                        text(
+                            f"CREATE TABLE {name}"
+                            " (LIKE audit_logs INCLUDING DEFAULTS)"
+                        )
+                    )
+                    # Rows of the month written while it had no partition
+                    moved = conn.execute(
+                        text(
+                            "WITH moved AS (DELETE FROM audit_logs_default"
+                            f" WHERE created_at >= {start} AND created_at < {end}"
+                            f" RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+                        )
+                    ).rowcount
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE audit_logs ATTACH PARTITION {name}"
+                            f" FOR VALUES FROM ({start}) TO ({end})"
+                        )
+                    )
+            except OperationalError as exc:
+                logger.warning("%s: left to the next run (%s)", name, exc.orig)
+                self.skipped.append(name)
+                return
+
+            logger.info("%s: created, %d rows moved from the default", name, moved)
+            month = add_months(month, 1)
+
+    def drop_audit_log_partitions(self):
+        """
+        Drop the partitions of the months past RETENTION_AUDIT_LOG_MONTHS
+        """
+        for name in self.expired_audit_log_partitions(self.audit_log_partitions()):
+            if self.stop.is_set():
+                return
+
+            # Archived before the detach, that locks audit_logs
+            if self.archive is not None:
+                with self.engine.connect() as conn:
+                    result = conn.execution_options(
+                        yield_per=self.settings.RETENTION_BATCH_SIZE
+                    ).execute(text(f"SELECT * FROM {name}"))
+                    for rows in result.mappings().partitions():
+                        self.archive.write(AUDIT_LOGS.name, rows)
+
+            try:
+                with self.transaction() as conn:
+                    conn.execute(
+                        text(f"ALTER TABLE audit_logs DETACH PARTITION {name}")
+                    )
+                    conn.execute(text(f"DROP TABLE {name}"))
+            except OperationalError as exc:
+                logger.warning("%s: left to the next run (%s)", name, exc.orig)
+                self.skipped.append(name)
+                return
+
+            logger.info("%s: dropped", name)
+
+    def pending(self):
+        """
+        Count the rows a run would purge
+
+        Returns:
+            dict[str, int]: table name -> rows
+        """
+        with self.engine.connect() as conn:
+            counts = {
+                POIS.name: conn.scalar(
+                    select(func.count()).select_from(POIS).where(self.deleted_pois())
+                )
+            }
+            poi_ids = select(POIS.c.id).where(self.deleted_pois())
+            for table in CHILD_TABLES:
+                counts[table.name] = conn.scalar(
+                    select(func.count())
+                    .select_from(table)
+                    .where(table.c.poi_id.in_(poi_ids) | self.deleted_rows(table))
+                )
+            counts[LOGIN_ATTEMPTS.name] = conn.scalar(
+                select(func.count())
+                .select_from(LOGIN_ATTEMPTS)
+                .where(self.old_login_attempts())
+            )
+
+            # Rows of the partitions to drop
+            expired = self.expired_audit_log_partitions(self.audit_log_partitions())
+            counts[AUDIT_LOGS.name] = sum(
+                conn.scalar(text(f"SELECT count(*) FROM {name}")) for name in expired
+            )
+
+        return counts
+
+    def run(self):
+        """
+        Purge every table
+
+        Returns:
+            dict[str, int]: table name -> rows purged
+        """
+        start = time.perf_counter()
+        self.roll_up_audit_logs()
+        self.create_audit_log_partitions()
+        self.purge_pois()
+        for table in CHILD_TABLES:
+            self.purge_rows(table, self.deleted_rows(table))
+        self.purge_rows(LOGIN_ATTEMPTS, self.old_login_attempts())
+        self.drop_audit_log_partitions()
+
+        logger.info(
+            "purged %d rows in %.1fs%s%s",
+            sum(self.purged.values()),
+            time.perf_counter() - start,
+            f", skipped {', '.join(self.skipped)}" if self.skipped else "",
+            ", stopped" if self.stop.is_set() else "",
+        )
+        return self.purged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--interval", type=float, default=None, help="Purge every N seconds"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    # Stop between batches on SIGTERM/ctrl+c
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    if args.dry_run:
+        for name, count in RetentionPurge(settings, stop).pending().items():
+            print(f"{name:<24} {count:>10}")
+        return 0
+
+    while True:
+        RetentionPurge(settings, stop).run()
+        if args.interval is None or stop.wait(args.interval):
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Production server entry point
+
+Runs uvicorn with one worker process per CPU core (WEB_CONCURRENCY), uvloop
+and httptools, the keep-alive/backlog tuning and worker recycling of the
+Server Settings. On SIGTERM uvicorn stops accepting connections, lets the
+in-flight requests finish for up to SERVER_GRACEFUL_TIMEOUT_SEC and then
+runs the lifespan shutdown of every worker.
+
+Usage:
+    python -m app.core.server
+"""
+
+import importlib.util
+
+import uvicorn
+
+from app.core.settings import get_settings, get_worker_count
+
+
+def get_server_options():
+    """
+    Get the uvicorn options of the production server
+
+    Returns:
+        dict: The uvicorn.run kwargs
+    """
+    settings = get_settings()
+
+    return {
+        "host": settings.HOST,
+        "port": settings.PORT,
+        "workers": get_worker_count(settings),
+        # uvloop isn't available on windows
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEP_ALIVE_SEC,
+        "limit_max_requests": settings.SERVER_MAX_REQUESTS,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT_SEC,
+        # Behind the platform's proxy
+        "proxy_headers": True,
+        "forwarded_allow_ips": "*",
+        "access_log": settings.SERVER_ACCESS_LOG,
+    }
+
+
+def main():
+    uvicorn.run("app.main:app", **get_server_options())
+
+
+if __name__ == "__main__":
+    main()
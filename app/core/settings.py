@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -21,6 +22,75 @@ class Settings(BaseSettings):
 
     # DB Settings
     POSTGRES_DATABASE_URL: str = os.environ.get("POSTGRES_DATABASE_URL")  # type: ignore
+    DB_JSON_LISTS: bool = False  # Serialize list endpoints in postgres
+
+    # Server Settings (python -m app.core.server)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # The number of worker processes, 0 is one per core
+    SERVER_BACKLOG: int = 2048  # Pending connections the socket queues
+    SERVER_KEEP_ALIVE_SEC: int = 65  # Above the load balancer's idle timeout
+    SERVER_MAX_REQUESTS: int | None = 10_000  # Recycle workers after N requests
+    SERVER_GRACEFUL_TIMEOUT_SEC: int = 30  # Drain time of in-flight requests
+    SERVER_ACCESS_LOG: bool = False
+
+    # DB Pool Settings
+    DB_MAX_CONNECTIONS: int = 90  # Budget of all workers, below max_connections
+    DB_POOL_MODE: Literal["queue", "null"] = "queue"  # 'null' behind PgBouncer
+    DB_POOL_SIZE: int | None = None  # Derived from the budget when unset
+    DB_MAX_OVERFLOW: int | None = None  # Derived from the budget when unset
+    DB_POOL_TIMEOUT_SEC: float = 30
+    DB_POOL_RECYCLE_SEC: int = 1800
+
+    # DB Replica Settings
+    DB_REPLICA_URLS: list[str] = []  # JSON list, GET requests read from them
+    DB_REPLICA_MAX_LAG_SEC: float = 5  # Lagging replicas are skipped
+    DB_REPLICA_LAG_CHECK_SEC: float = 2
+
+    # Metrics Settings
+    METRICS_ENABLED: bool = False  # Server-Timing header and /metrics
+
+    # Query Watch Settings (slow query log and N+1 detector)
+    QUERY_WATCH_MODE: Literal["off", "log", "raise"] = "off"  # 'raise' in tests
+    QUERY_WATCH_SAMPLE_RATE: float = 1.0  # e.g 0.01 in production
+    SLOW_QUERY_MS: float = 200
+    N_PLUS_ONE_THRESHOLD: int = 5  # Same statement shape per request
+
+    # Fingerprint Settings
+    FINGERPRINT_MATCH_WORKERS: int = 2  # Scoring processes per server worker
+    FINGERPRINT_MAX_CANDIDATES: int = 100  # Prints scored per search
+    FINGERPRINT_MATCH_THRESHOLD: float = 0.2  # Lowest score reported as a match
+
+    # Retention Settings (python -m app.core.retention)
+    RETENTION_DELETED_DAYS: int = 90  # Soft deleted pois and child rows
+    RETENTION_LOGIN_ATTEMPT_DAYS: int = 180
+    RETENTION_BATCH_SIZE: int = 1000  # Rows deleted per transaction
+    RETENTION_POI_BATCH_SIZE: int = 50  # Pois, with all their rows, per transaction
+    RETENTION_BATCH_PAUSE_MS: int = 100  # Between batches, lets replicas keep up
+    RETENTION_LOCK_TIMEOUT_MS: int = 2000  # Longer waits leave the batch to next run
+    RETENTION_ARCHIVE_DIR: str | None = None  # Archive the rows before deleting them
+    RETENTION_AUDIT_LOG_MONTHS: int | None = None  # Months kept, None keeps all
+    AUDIT_LOG_PARTITIONS_AHEAD: int = 3  # Monthly partitions created ahead of time
+
+    # Audit Settings
+    AUDIT_COMPRESS_MIN_BYTES: int = 2048  # Larger changes are stored zlib compressed
+
+    # Cache Settings
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "app.common.cache.LocalCacheBackend"
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_TTL_SEC: int = 300
+
+
+def get_worker_count(settings: Settings):
+    """This function returns the number of worker processes of the server."""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+
+    # CPUs this process may run on (e.g limited by the container)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
 
 @lru_cache
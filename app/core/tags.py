@@ -11,6 +11,7 @@ class RouteTags(BaseModel):
     # POI Modules
     POI: str = "POI APIs"
     POI_BASE_INFORMATION: str = "POI Base Information Endpoints"
+    POI_DOSSIER: str = "POI Dossier Endpoints"
     POI_OTHER_PROFILE: str = "POI Other Profile Endpoints"
     POI_ID_DOCUMENT: str = "POI ID Document Endpoints"
     POI_GSM_NUMBER: str = "POI GSM Number Endpoints"
@@ -21,6 +22,10 @@ class RouteTags(BaseModel):
     POI_EDUCATIONAL_BACKGROUND: str = "POI Educational Background Endpoints"
     POI_CONVICTION: str = "POI Offense (Conviction) Endpoints"
     POI_FREQUENTED_SPOT: str = "POI Frequented Spot Endpoints"
+    POI_FINGERPRINT: str = "POI Fingerprint Endpoints"
+
+    # Audit Modules
+    AUDIT_LOG: str = "Audit Log Endpoints"
 
 
 @lru_cache
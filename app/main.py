@@ -6,19 +6,24 @@ from fastapi import Depends, FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import FileResponse, ORJSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 
+from app.audit.apis import router as audit_router
 from app.common.dependencies import get_session
 from app.common.exceptions import CustomHTTPException, InternalServerError, NotFound
+from app.core.database import get_engine, get_replicas
 from app.core.handlers import (
     base_exception_handler,
     custom_http_exception_handler,
     internal_server_error_exception_handler,
     request_validation_exception_handler,
 )
+from app.core.metrics import InstrumentationMiddleware, registry
+from app.core.querywatch import QueryWatchMiddleware, configure_query_watch
 from app.core.settings import get_settings
 from app.poi.apis import router as poi_router
+from app.poi.fingerprint import shutdown_match_pool
 from app.user.apis import router as user_router
 
 # Globals
@@ -36,10 +41,22 @@ async def lifespan(_: FastAPI):
     limiter = to_thread.current_default_thread_limiter()
     limiter.total_tokens = 1000
 
+    # Create the engines here rather than at import, the first request doesn't
+    # pay for the dialect setup
+    get_engine()
+    get_replicas()
+
     # Shutdown Code
     yield
     print("Shutting Down Server...")
 
+    # Close the pooled connections, the in-flight requests are drained by now
+    for engine in [get_engine(), *get_replicas().engines]:
+        engine.dispose()
+
+    # Stop the fingerprint matcher's processes
+    shutdown_match_pool()
+
 
 app = FastAPI(
     title="Behemoth FastAPI",
@@ -63,12 +80,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 app.add_middleware(
     GZipMiddleware,
     minimum_size=5000,  # Minimum size of the response before it is compressed in bytes
 )
 
+# Slow query log and N+1 detector
+if settings.QUERY_WATCH_MODE != "off":
+    configure_query_watch(
+        mode=settings.QUERY_WATCH_MODE,
+        sample_rate=settings.QUERY_WATCH_SAMPLE_RATE,
+        slow_query_ms=settings.SLOW_QUERY_MS,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    )
+    app.add_middleware(QueryWatchMiddleware)
+
+# Instrumentation (outermost, i.e measures the compressed response)
+if settings.METRICS_ENABLED:
+    app.add_middleware(InstrumentationMiddleware)
+
 
 # Exception Handlers
 app.add_exception_handler(Exception, base_exception_handler)
@@ -84,6 +116,20 @@ async def health(_: Session = Depends(get_session)):
     return {"status": "Ok!"}
 
 
+# Metrics
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics"""
+        for engine in [get_engine(), *get_replicas().engines]:
+            registry.record_pool_status(engine.pool)
+
+        return PlainTextResponse(
+            content=registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
+
 # Media download
 @app.get("/media/{path:path}")
 async def media_download(
@@ -103,3 +149,4 @@ async def media_download(
 # Routers
 app.include_router(user_router, prefix="/user", tags=["User APIs"])
 app.include_router(poi_router, prefix="/poi", tags=["POI APIs"])
+app.include_router(audit_router, prefix="/audit", tags=["Audit APIs"])
@@ -1,21 +1,38 @@
-from datetime import datetime
 from typing import cast
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
+from fastapi.responses import ORJSONResponse, Response
 
 from app.common.annotations import DatabaseSession, PaginationParams
-from app.common.paginators import get_pagination_metadata
+from app.common.cache import get_response_cache, make_key
+from app.common.exceptions import BadRequest
+from app.common.paginators import build_paginated_json, get_pagination_metadata
 from app.core.settings import get_settings
 from app.core.tags import get_tags
 from app.poi import models, selectors, services
+from app.poi.fingerprint import FINGERS, extract_minutiae
+from app.poi.exceptions import (
+    EducationalBackgroundNotFound,
+    EmploymentHistoryNotFound,
+    FrequentedSpotNotFound,
+    GSMNumberNotFound,
+    IDDocumentNotFound,
+    KnownAssociateNotFound,
+    POINotFound,
+    POIOffenseNotFound,
+    ResidentialAddressNotFound,
+)
 from app.poi.formatters import (
     format_educational_background,
     format_employment_history,
+    format_fingerprint,
+    format_fingerprint_match,
     format_frequented_spot,
     format_gsm,
     format_id_document,
     format_known_associate,
     format_poi_base,
+    format_poi_dossier,
     format_poi_offense,
     format_poi_summary,
     format_residential_address,
@@ -30,6 +47,7 @@ from app.user.services import create_log
 router = APIRouter()
 tags = get_tags()
 settings = get_settings()
+cache = get_response_cache()
 
 # Include routers
 router.include_router(poi_offense_router, prefix="/offense", tags=["Offense Endpoints"])
@@ -84,6 +102,26 @@ async def route_poi_list(
         db=db,
     )
 
+    # Check: database json fast path
+    if settings.DB_JSON_LISTS:
+        data, count, tnoi = await selectors.get_paginated_poi_list_json(
+            gsm=gsm, is_pinned=is_pinned, pagination=pagination, db=db
+        )
+
+        return Response(
+            content=build_paginated_json(
+                response_model=response.PaginatedPOISummaryListResponse,
+                data=data,
+                meta=get_pagination_metadata(
+                    tno_items=tnoi,
+                    count=count,
+                    page=pagination.page,
+                    size=pagination.size,
+                ),
+            ),
+            media_type=ORJSONResponse.media_type,
+        )
+
     # get pois
     pois, tnoi = await selectors.get_paginated_poi_list(
         gsm=gsm, is_pinned=is_pinned, pagination=pagination, db=db
@@ -125,7 +163,9 @@ async def route_poi_pin_toggle(
         stat = "POI Succcessfully Pinned"
 
     poi.is_pinned = not poi.is_pinned  # type: ignore
-    db.commit()
+
+    # Bump poi version
+    await services.bump_poi_version(poi_id=poi.id, db=db)
 
     # Create logs
     await create_log(
@@ -189,21 +229,50 @@ async def route_poi_delete(poi_id: int, curr_user: CurrentUser, db: DatabaseSess
     # Get poi
     poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
 
-    # Delete doc
-    poi.is_deleted = True  # type: ignore
-    poi.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    # Delete poi and its child rows
+    await services.delete_pois(user=curr_user, poi_ids=[poi.id], db=db)
+
+    return {}
 
-    # NOTE: Mark other items like id-doc, etc as deleted
 
-    # Create logs
-    await create_log(
-        user=curr_user,
-        resource="poi",
-        action=f"delete:{poi.id}",
-        db=db,
+@router.post(
+    "/bulk-delete",
+    summary="Bulk Delete POIs",
+    response_description="The IDs of the deleted pois",
+    status_code=status.HTTP_200_OK,
+    response_model=response.POIBulkDeleteResponse,
+)
+async def route_poi_bulk_delete(
+    delete_in: edit.POIBulkDelete, curr_user: CurrentUser, db: DatabaseSession
+):
+    """
+    This endpoint deletes pois and their child rows, in one transaction
+    """
+
+    # Delete pois
+    deleted_ids = await services.delete_pois(
+        user=curr_user, poi_ids=delete_in.poi_ids, db=db
     )
 
+    return {"data": deleted_ids}
+
+
+@router.post(
+    "/{poi_id}/restore",
+    summary="Restore POI",
+    response_description="POI Restored Successfully",
+    status_code=status.HTTP_200_OK,
+    response_model=response.POIRestoreResponse,
+)
+async def route_poi_restore(poi_id: int, curr_user: CurrentUser, db: DatabaseSession):
+    """
+    This endpoint restores a deleted poi and the child rows deleted with it
+    """
+
+    # Restore poi
+    if not await services.restore_pois(user=curr_user, poi_ids=[poi_id], db=db):
+        raise POINotFound()
+
     return {}
 
 
@@ -215,23 +284,101 @@ async def route_poi_delete(poi_id: int, curr_user: CurrentUser, db: DatabaseSess
     response_model=response.POIBaseInformationResponse,
     tags=[tags.POI_BASE_INFORMATION],
 )
-async def route_poi_base_info(poi_id: int, curr_user: CurrentUser, db: DatabaseSession):
+async def route_poi_base_info(
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
+):
     """
     This endpoint returns the poi's base information
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="poi",
-        action=f"get:{poi.id}-base",
+        action=f"get:{poi_id}-base",
         db=db,
     )
 
-    return {"data": await format_poi_base(poi=poi)}
+    async def build_response():
+        poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+
+        return {"data": await format_poi_base(poi=poi)}
+
+    return await cache.respond(
+        key=make_key("poi-base", version=version, poi_id=poi_id),
+        response_model=response.POIBaseInformationResponse,
+        builder=build_response,
+        request=request,
+    )
+
+
+@router.get(
+    "/{poi_id}/dossier",
+    summary="Get POI Dossier",
+    response_description="The poi's dossier",
+    status_code=status.HTTP_200_OK,
+    response_model=response.POIDossierResponse,
+    tags=[tags.POI_DOSSIER],
+)
+async def route_poi_dossier(
+    poi_id: int,
+    request: Request,
+    curr_user: CurrentUser,
+    db: DatabaseSession,
+    sections: str | None = None,
+):
+    """
+    This endpoint returns every section of the poi's profile in one response
+
+    Use 'sections' (comma separated, e.g base,gsm,conviction) to only return
+    some sections, all sections are returned by default
+    """
+
+    # Get requested sections
+    if sections:
+        requested = sorted({section.strip() for section in sections.split(",")})
+        for section in requested:
+            if section not in selectors.DOSSIER_SECTIONS:
+                raise BadRequest(
+                    f"Invalid dossier section: {section}", loc=["query", "sections"]
+                )
+    else:
+        requested = sorted(selectors.DOSSIER_SECTIONS)
+
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
+
+    # Get offense generation (the offense names in the response)
+    generation = await selectors.get_cache_generation(namespace="offense", db=db)
+
+    # Create logs
+    await create_log(
+        user=curr_user,
+        resource="poi",
+        action=f"get:{poi_id}-dossier",
+        notes=",".join(requested),
+        db=db,
+    )
+
+    async def build_response():
+        poi = await selectors.get_poi_dossier(id=poi_id, sections=requested, db=db)
+
+        return {"data": await format_poi_dossier(poi=poi, sections=requested)}
+
+    return await cache.respond(
+        key=make_key(
+            "poi-dossier",
+            version=f"{version}.{generation}",
+            poi_id=poi_id,
+            sections=",".join(requested),
+        ),
+        response_model=response.POIDossierResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 ######################################################################
@@ -273,29 +420,37 @@ async def route_poi_id_doc_create(
     tags=[tags.POI_ID_DOCUMENT],
 )
 async def route_poi_id_doc_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the list of the poi's id documents
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="id-doc",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_id_document(doc=doc)
-            for doc in await selectors.get_id_documents(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_id_document(doc=doc)
+                for doc in await selectors.get_id_documents(poi_id=poi_id, db=db)
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-id-doc-list", version=version, poi_id=poi_id),
+        response_model=response.IDDocumentListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -316,10 +471,10 @@ async def route_poi_id_doc_edit(
     This endpoint is used to edit ID Documents
     """
 
-    # Get document
-    doc = await selectors.get_id_doc_by_id(id=doc_id, db=db)
-
-    edited_doc = await services.edit_id_doc(user=curr_user, doc=doc, data=doc_in, db=db)
+    # Edit document
+    edited_doc = await services.edit_id_doc(
+        user=curr_user, doc_id=doc_id, data=doc_in, db=db
+    )
 
     return {"data": await format_id_document(doc=edited_doc)}
 
@@ -339,13 +494,10 @@ async def route_poi_id_doc_delete(
     This endpoint deletes an ID Document
     """
 
-    # Get ID Document
-    doc = cast(models.IDDocument, await selectors.get_id_doc_by_id(id=doc_id, db=db))
-
-    # Delete doc
-    doc.is_deleted = True  # type: ignore
-    doc.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    # Delete doc, bumping the poi's version
+    doc = await services.delete_poi_row(model=models.IDDocument, id=doc_id, db=db)
+    if not doc:
+        raise IDDocumentNotFound()
 
     # Create logs
     await create_log(
@@ -396,28 +548,38 @@ async def route_poi_gsm_create(
     response_model=response.GSMNumberListResponse,
     tags=[tags.POI_GSM_NUMBER],
 )
-async def route_poi_gsm_list(poi_id: int, curr_user: CurrentUser, db: DatabaseSession):
+async def route_poi_gsm_list(
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
+):
     """
     This endpoint returns the list of the poi's gsm numbers
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="gsm-numbers",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_gsm(gsm=gsm)
-            for gsm in await selectors.get_gsm_numbers(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_gsm(gsm=gsm)
+                for gsm in await selectors.get_gsm_numbers(poi_id=poi_id, db=db)
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-gsm-list", version=version, poi_id=poi_id),
+        response_model=response.GSMNumberListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -438,11 +600,10 @@ async def route_poi_gsm_edit(
     This endpoint edits a poi's gsm number
     """
 
-    # Get gsm
-    gsm = await selectors.get_gsm_by_id(id=gsm_id, db=db)
-
     # Edit gsm
-    edited_gsm = await services.edit_gsm(user=curr_user, gsm=gsm, data=data_in, db=db)
+    edited_gsm = await services.edit_gsm(
+        user=curr_user, gsm_id=gsm_id, data=data_in, db=db
+    )
 
     return {"data": await format_gsm(gsm=edited_gsm)}
 
@@ -462,13 +623,10 @@ async def route_poi_gsm_delete(
     This endpoint deletes a gsm number
     """
 
-    # Get gsm
-    gsm = cast(models.GSMNumber, await selectors.get_gsm_by_id(id=gsm_id, db=db))
-
-    # Delete gsm
-    gsm.is_deleted = True  # type: ignore
-    gsm.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    # Delete gsm, bumping the poi's version
+    gsm = await services.delete_poi_row(model=models.GSMNumber, id=gsm_id, db=db)
+    if not gsm:
+        raise GSMNumberNotFound()
 
     # Create logs
     await create_log(
@@ -522,29 +680,39 @@ async def route_poi_address_create(
     tags=[tags.POI_RESIDENTIAL_ADDRESS],
 )
 async def route_poi_address_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the list of the poi's addresses
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="residential-address",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_residential_address(address=address)
-            for address in await selectors.get_residential_addresses(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_residential_address(address=address)
+                for address in await selectors.get_residential_addresses(
+                    poi_id=poi_id, db=db
+                )
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-address-list", version=version, poi_id=poi_id),
+        response_model=response.ResidentialAddressListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -565,12 +733,9 @@ async def route_poi_address_edit(
     This endpoint is used to edit the poi's residential address
     """
 
-    # Get address
-    address = await selectors.get_residential_address_by_id(id=address_id, db=db)
-
     # edit address
     new_address = await services.edit_residential_address(
-        user=curr_user, address=address, data=address_in, db=db
+        user=curr_user, address_id=address_id, data=address_in, db=db
     )
 
     return {"data": await format_residential_address(address=new_address)}
@@ -591,16 +756,12 @@ async def route_poi_address_delete(
     This endpoint deletes a residential address
     """
 
-    # Get address
-    address = cast(
-        models.ResidentialAddress,
-        await selectors.get_residential_address_by_id(id=address_id, db=db),
+    # Delete address, bumping the poi's version
+    address = await services.delete_poi_row(
+        model=models.ResidentialAddress, id=address_id, db=db
     )
-
-    # Delete address
-    address.is_deleted = True  # type: ignore
-    address.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    if not address:
+        raise ResidentialAddressNotFound()
 
     # Create logs
     await create_log(
@@ -654,29 +815,39 @@ async def route_poi_associate_create(
     tags=[tags.POI_KNOWN_ASSOCIATE],
 )
 async def route_poi_associate_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the list of the poi's known associates
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="known-associate",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_known_associate(associate=associate)
-            for associate in await selectors.get_known_associates(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_known_associate(associate=associate)
+                for associate in await selectors.get_known_associates(
+                    poi_id=poi_id, db=db
+                )
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-associate-list", version=version, poi_id=poi_id),
+        response_model=response.KnownAssociateListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -697,15 +868,9 @@ async def route_poi_associate_edit(
     This endpoint edits the known associate
     """
 
-    # Get associate
-    associate = cast(
-        models.KnownAssociate,
-        await selectors.get_known_associate_by_id(id=associate_id, db=db),
-    )
-
     # Edit associate
     new_associate = await services.edit_known_associate(
-        user=curr_user, associate=associate, data=associate_in, db=db
+        user=curr_user, associate_id=associate_id, data=associate_in, db=db
     )
 
     return {"data": await format_known_associate(associate=new_associate)}
@@ -726,16 +891,12 @@ async def route_poi_assicate_delete(
     This endpoint is used to delete known associates
     """
 
-    # Get associate
-    associate = cast(
-        models.KnownAssociate,
-        await selectors.get_known_associate_by_id(id=associate_id, db=db),
+    # Delete address, bumping the poi's version
+    associate = await services.delete_poi_row(
+        model=models.KnownAssociate, id=associate_id, db=db
     )
-
-    # Delete address
-    associate.is_deleted = True  # type: ignore
-    associate.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    if not associate:
+        raise KnownAssociateNotFound()
 
     # Create logs
     await create_log(
@@ -789,29 +950,39 @@ async def route_poi_employment_create(
     tags=[tags.POI_EMPLOYMENT_HISTORY],
 )
 async def route_poi_employment_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the list of the poi's employment history
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="employment-history",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_employment_history(history=history)
-            for history in await selectors.get_employment_history(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_employment_history(history=history)
+                for history in await selectors.get_employment_history(
+                    poi_id=poi_id, db=db
+                )
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-employment-list", version=version, poi_id=poi_id),
+        response_model=response.EmploymentHistoryListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -832,15 +1003,9 @@ async def route_poi_employment_edit(
     This endpoint edits an employment history
     """
 
-    # Get employment history
-    history = cast(
-        models.EmploymentHistory,
-        await selectors.get_employment_history_by_id(id=history_id, db=db),
-    )
-
     # Edit history
     new_history = await services.edit_employment_history(
-        user=curr_user, history=history, data=history_in, db=db
+        user=curr_user, history_id=history_id, data=history_in, db=db
     )
 
     return {"data": await format_employment_history(history=new_history)}
@@ -861,16 +1026,12 @@ async def route_poi_employment_delete(
     This endpoint deletes an employment history
     """
 
-    # Get employment history
-    history = cast(
-        models.EmploymentHistory,
-        await selectors.get_employment_history_by_id(id=history_id, db=db),
+    # Delete employment history, bumping the poi's version
+    history = await services.delete_poi_row(
+        model=models.EmploymentHistory, id=history_id, db=db
     )
-
-    # Delete employment history
-    history.is_deleted = True  # type: ignore
-    history.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    if not history:
+        raise EmploymentHistoryNotFound()
 
     # Create logs
     await create_log(
@@ -895,28 +1056,38 @@ async def route_poi_employment_delete(
     tags=[tags.POI_VETERAN_STATUS],
 )
 async def route_poi_veteran_status_get(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint the poi's veteran status
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="veteran-status",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": await format_veteran_status(
-            status=await selectors.get_veteran_status_by_poi(poi=poi, db=db)
-        )
-    }
+    async def build_response():
+        poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+
+        return {
+            "data": await format_veteran_status(
+                status=await selectors.get_veteran_status_by_poi(poi=poi, db=db)
+            )
+        }
+
+    return await cache.respond(
+        key=make_key("poi-vetstatus", version=version, poi_id=poi_id),
+        response_model=response.VeteranStatusResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -937,17 +1108,9 @@ async def route_poi_veteran_status_edit(
     This endpoint edits a poi's veteran status
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
-
-    # Get veteran status
-    vet_status = cast(
-        models.VeteranStatus, await selectors.get_veteran_status_by_poi(poi=poi, db=db)
-    )
-
     # Edit veteran status
     new_vet_status = await services.edit_veteran_status(
-        user=curr_user, status=vet_status, data=status_in, db=db
+        user=curr_user, poi_id=poi_id, data=status_in, db=db
     )
 
     return {"data": await format_veteran_status(status=new_vet_status)}
@@ -994,29 +1157,39 @@ async def route_poi_education_create(
     tags=[tags.POI_EDUCATIONAL_BACKGROUND],
 )
 async def route_poi_education_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the poi's educational background
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="educational-background",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_educational_background(education=education)
-            for education in await selectors.get_educational_background(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_educational_background(education=education)
+                for education in await selectors.get_educational_background(
+                    poi_id=poi_id, db=db
+                )
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-education-list", version=version, poi_id=poi_id),
+        response_model=response.EducationalBackgroundListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -1037,15 +1210,9 @@ async def route_poi_education_edit(
     This endpoint edits the poi's education background
     """
 
-    # Get educational background
-    education = cast(
-        models.EducationalBackground,
-        await selectors.get_educational_background_by_id(id=education_id, db=db),
-    )
-
     # Edit educational background
     new_education = await services.edit_educational_background(
-        user=curr_user, education=education, data=education_in, db=db
+        user=curr_user, education_id=education_id, data=education_in, db=db
     )
 
     return {"data": await format_educational_background(education=new_education)}
@@ -1066,16 +1233,12 @@ async def route_poi_education_delete(
     This endpoint deletes an educational background
     """
 
-    # Get educational background
-    education = cast(
-        models.EducationalBackground,
-        await selectors.get_educational_background_by_id(id=education_id, db=db),
+    # Delete educational background, bumping the poi's version
+    education = await services.delete_poi_row(
+        model=models.EducationalBackground, id=education_id, db=db
     )
-
-    # Delete educational background
-    education.is_deleted = True  # type: ignore
-    education.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    if not education:
+        raise EducationalBackgroundNotFound()
 
     # Create logs
     await create_log(
@@ -1135,29 +1298,44 @@ async def route_poi_conviction_create(
     tags=[tags.POI_CONVICTION],
 )
 async def route_poi_conviction_list(
-    poi_id: int, curr_user: CurrentUser, db: DatabaseSession
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
 ):
     """
     This endpoint returns the list of the poi's offenses
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
+
+    # Get offense generation (the offense names in the response)
+    generation = await selectors.get_cache_generation(namespace="offense", db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="poi-offense",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_poi_offense(conv=conv)
-            for conv in await selectors.get_poi_offenses(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_poi_offense(conv=conv)
+                for conv in await selectors.get_poi_offenses(poi_id=poi_id, db=db)
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key(
+            "poi-conviction-list",
+            version=f"{version}.{generation}",
+            poi_id=poi_id,
+        ),
+        response_model=response.POIOffenseListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -1178,18 +1356,15 @@ async def route_poi_conviction_edit(
     This endpoint edits the poi offense
     """
 
-    # Get poi offense
-    poi_offense = cast(
-        models.POIOffense,
-        await selectors.get_poi_offense_by_id(id=poi_offense_id, db=db),
-    )
-
     # Edit poi offense
     new_poi_offense = await services.edit_poi_offense(
-        user=curr_user, poi_offense=poi_offense, data=offense_in, db=db
+        user=curr_user, poi_offense_id=poi_offense_id, data=offense_in, db=db
     )
 
-    return {"data": await format_poi_offense(conv=new_poi_offense)}
+    # Get offense
+    offense = await selectors.get_offense_by_id(id=new_poi_offense.offense_id, db=db)
+
+    return {"data": await format_poi_offense(conv=new_poi_offense, offense=offense)}
 
 
 @router.delete(
@@ -1207,16 +1382,12 @@ async def route_poi_conviction_delete(
     This endpoint deletes a poi offense
     """
 
-    # Get poi offense
-    poi_offense = cast(
-        models.POIOffense,
-        await selectors.get_poi_offense_by_id(id=poi_offense_id, db=db),
+    # Delete poi offense, bumping the poi's version
+    poi_offense = await services.delete_poi_row(
+        model=models.POIOffense, id=poi_offense_id, db=db
     )
-
-    # Delete poi offense
-    poi_offense.is_deleted = True  # type: ignore
-    poi_offense.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    if not poi_offense:
+        raise POIOffenseNotFound()
 
     # Create logs
     await create_log(
@@ -1269,28 +1440,38 @@ async def route_poi_spot_create(
     response_model=response.FrequentedSpotListResponse,
     tags=[tags.POI_FREQUENTED_SPOT],
 )
-async def route_poi_spot_list(poi_id: int, curr_user: CurrentUser, db: DatabaseSession):
+async def route_poi_spot_list(
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
+):
     """
     This endpoint returns the poi's frequented spots
     """
 
-    # Get poi
-    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
 
     # Create logs
     await create_log(
         user=curr_user,
         resource="frequented-spot",
-        action=f"get-list:{poi.id}",
+        action=f"get-list:{poi_id}",
         db=db,
     )
 
-    return {
-        "data": [
-            await format_frequented_spot(spot=spot)
-            for spot in await selectors.get_frequented_spots(poi=poi, db=db)
-        ]
-    }
+    async def build_response():
+        return {
+            "data": [
+                await format_frequented_spot(spot=spot)
+                for spot in await selectors.get_frequented_spots(poi_id=poi_id, db=db)
+            ]
+        }
+
+    return await cache.respond(
+        key=make_key("poi-spot-list", version=version, poi_id=poi_id),
+        response_model=response.FrequentedSpotListResponse,
+        builder=build_response,
+        request=request,
+    )
 
 
 @router.put(
@@ -1311,15 +1492,9 @@ async def route_poi_spot_edit(
     This endpoint edits a frequented spot
     """
 
-    # Get frequented spot
-    spot = cast(
-        models.FrequentedSpot,
-        await selectors.get_frequented_spot_by_id(id=spot_id, db=db),
-    )
-
     # Edit frequented spot
     new_spot = await services.edit_frequented_spot(
-        user=curr_user, spot=spot, data=spot_in, db=db
+        user=curr_user, spot_id=spot_id, data=spot_in, db=db
     )
 
     return {"data": await format_frequented_spot(spot=new_spot)}
@@ -1340,16 +1515,10 @@ async def route_poi_spot_delete(
     This endpoint deletes a frequented spot
     """
 
-    # Get frequented spot
-    spot = cast(
-        models.FrequentedSpot,
-        await selectors.get_frequented_spot_by_id(id=spot_id, db=db),
-    )
-
-    # Delete frequented spot
-    spot.is_deleted = True  # type: ignore
-    spot.deleted_at = datetime.now()  # type: ignore
-    db.commit()
+    # Delete frequented spot, bumping the poi's version
+    spot = await services.delete_poi_row(model=models.FrequentedSpot, id=spot_id, db=db)
+    if not spot:
+        raise FrequentedSpotNotFound()
 
     # Create logs
     await create_log(
@@ -1360,3 +1529,117 @@ async def route_poi_spot_delete(
     )
 
     return {}
+
+
+###################################################################
+# FINGERPRINTS
+###################################################################
+@router.post(
+    "/fingerprint/search",
+    summary="Search Fingerprints",
+    response_description="The pois whose fingerprint matches the print",
+    status_code=status.HTTP_200_OK,
+    response_model=response.FingerprintMatchListResponse,
+    tags=[tags.POI_FINGERPRINT],
+)
+async def route_poi_fingerprint_search(
+    search_in: create.FingerprintSearch, curr_user: CurrentUser, db: DatabaseSession
+):
+    """
+    This endpoint searches the enrolled fingerprints for a print (1:N)
+    """
+
+    # Extract the minutiae
+    try:
+        probe = extract_minutiae(search_in.data)
+    except ValueError as e:
+        raise BadRequest(str(e), loc=["body", "data"])
+
+    # Search
+    matches = await selectors.search_fingerprints(
+        probe=probe,
+        finger=FINGERS[search_in.finger] if search_in.finger else None,
+        db=db,
+    )
+
+    # Create logs
+    await create_log(
+        user=curr_user,
+        resource="fingerprint",
+        action="search",
+        notes=", ".join(f"poi {match['poi_id']}" for match in matches) or None,
+        db=db,
+    )
+
+    return {"data": [await format_fingerprint_match(match) for match in matches]}
+
+
+@router.post(
+    "/{poi_id}/fingerprint",
+    summary="Create POI Fingerprint",
+    response_description="The details of the enrolled fingerprint",
+    status_code=status.HTTP_201_CREATED,
+    response_model=response.FingerprintResponse,
+    tags=[tags.POI_FINGERPRINT],
+)
+async def route_poi_fingerprint_create(
+    poi_id: int,
+    fingerprint_in: create.CreateFingerprint,
+    curr_user: CurrentUser,
+    db: DatabaseSession,
+):
+    """
+    This endpoint enrolls the poi's fingerprint, replacing the current one
+    """
+
+    # Get poi
+    poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+
+    # Create fingerprint
+    fingerprint = await services.create_fingerprint(
+        user=curr_user, poi=poi, data=fingerprint_in, db=db
+    )
+
+    return {"data": await format_fingerprint(fingerprint=fingerprint)}
+
+
+@router.get(
+    "/{poi_id}/fingerprint",
+    summary="Get POI Fingerprint",
+    response_description="The details of the poi's fingerprint",
+    status_code=status.HTTP_200_OK,
+    response_model=response.FingerprintResponse,
+    tags=[tags.POI_FINGERPRINT],
+)
+async def route_poi_fingerprint(
+    poi_id: int, request: Request, curr_user: CurrentUser, db: DatabaseSession
+):
+    """
+    This endpoint returns the poi's fingerprint
+    """
+
+    # Get poi version
+    version = await selectors.get_poi_version(id=poi_id, db=db)
+
+    # Create logs
+    await create_log(
+        user=curr_user,
+        resource="fingerprint",
+        action=f"get-by-poi:{poi_id}",
+        db=db,
+    )
+
+    async def build_response():
+        poi = cast(models.POI, await selectors.get_poi_by_id(id=poi_id, db=db))
+        fingerprint = cast(
+            models.Fingerprint, await selectors.get_fingerprint_by_poi(poi=poi, db=db)
+        )
+
+        return {"data": await format_fingerprint(fingerprint=fingerprint)}
+
+    return await cache.respond(
+        key=make_key("poi-fingerprint", version=version, poi_id=poi_id),
+        response_model=response.FingerprintResponse,
+        builder=build_response,
+        request=request,
+    )
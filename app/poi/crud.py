@@ -101,3 +101,12 @@ class FrequentedSpotCRUD(CRUDBase[models.FrequentedSpot]):
 
     def __init__(self, db: Session):
         super().__init__(models.FrequentedSpot, db)
+
+
+class FingerprintCRUD(CRUDBase[models.Fingerprint]):
+    """
+    CRUD Class for fingerprints
+    """
+
+    def __init__(self, db: Session):
+        super().__init__(models.Fingerprint, db)
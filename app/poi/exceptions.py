@@ -89,3 +89,12 @@ class FrequentedSpotNotFound(NotFound):
 
     def __init__(self, *, loc: list | None = None):
         super().__init__("Frequented Spot Not Found", loc=loc)
+
+
+class FingerprintNotFound(NotFound):
+    """
+    Exception for 404 Fingerprint Not Found
+    """
+
+    def __init__(self, *, loc: list | None = None):
+        super().__init__("Fingerprint Not Found", loc=loc)
@@ -0,0 +1,565 @@
+"""
+Fingerprint templates and 1:N matching
+
+Prints arrive as ISO/IEC 19794-2:2005 finger minutiae records, the format
+fingerprint scanners and their SDKs export, base64 encoded. Enrollment keeps
+the minutiae only, packed into a compact template (5 bytes per minutia, the
+coordinates normalized to 500 dpi), and indexes every print by its minutiae
+triplets: a minutia and two of its nearest neighbours form a triangle whose
+side lengths and relative minutia directions don't change with the position
+or rotation of the finger on the scanner. A 1:N search looks up the triplet
+keys of the probe, keeps the prints sharing the most keys as candidates and
+scores only those, in a process pool, with an alignment based matcher.
+"""
+
+import asyncio
+import base64
+import binascii
+import math
+import multiprocessing
+import struct
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations, product
+from typing import NamedTuple
+
+from app.core.settings import get_settings
+
+# ISO/IEC 19794-2:2005 record layout
+ISO_MAGIC = b"FMR\x00"
+ISO_VERSION = b" 20\x00"
+ISO_HEADER = struct.Struct(">4s4sIHHHHHBB")
+ISO_VIEW = struct.Struct(">BBBB")
+ISO_MINUTIA = struct.Struct(">HHBB")
+
+# ISO finger positions of the enrolled fingers
+FINGERS = {"right_thumb": 1, "right_pointer": 2, "left_thumb": 6, "left_pointer": 7}
+
+# Compact template layout: version, views, then per view the finger, the
+# minutiae count and the minutiae (kind:2 x:15 y:15, angle)
+TEMPLATE_VERSION = 1
+TEMPLATE_HEADER = struct.Struct(">BB")
+TEMPLATE_VIEW = struct.Struct(">BB")
+TEMPLATE_MINUTIA = struct.Struct(">IB")
+
+TARGET_PPCM = 197  # 500 dpi, in pixels per cm like the iso record
+MIN_MINUTIAE = 12
+MAX_MINUTIAE = 255
+
+# Triplet index
+TRIPLET_NEIGHBOURS = 3
+TRIPLET_MAX_SIDE = 160  # px, longer triangles distort with skin elasticity
+SIDE_BIN = 10  # px
+SIDE_BINS = TRIPLET_MAX_SIDE // SIDE_BIN + 1
+ANGLE_BINS = 12  # 30 degrees
+PROBE_MARGIN = 0.25  # of a bin
+PROBE_SPREAD = 3
+
+# Matcher
+ROTATION_BINS = 24  # 15 degrees
+TRANSLATION_BIN = 24  # px
+ALIGNMENTS_TRIED = 5
+REFINE_TOLERANCES = [(40, math.radians(30)), (25, math.radians(30))]  # px, rad
+MATCH_TOLERANCE = (15, math.radians(20))
+MIN_PAIRS = 6  # 6 paired of 40 minutiae scores 0.02
+GRID_CELL = 40  # px, at least the largest tolerance
+
+# Candidates scored inline, below this the pool's overhead isn't worth it
+POOL_MIN_CANDIDATES = 32
+
+TURN = 2 * math.pi
+ANGLE_UNIT = TURN / 256  # iso angles are in 1.40625 degree units
+ROTATION_SCALE = ROTATION_BINS / TURN
+ROTATIONS = [
+    (math.cos(TURN * i / ROTATION_BINS), math.sin(TURN * i / ROTATION_BINS))
+    for i in range(ROTATION_BINS)
+]
+
+
+class Minutia(NamedTuple):
+    """
+    A ridge ending or bifurcation, the angle in iso units (256 per turn)
+    """
+
+    x: int
+    y: int
+    angle: int
+    kind: int  # 1 ending, 2 bifurcation, 0 other
+
+
+def parse_iso_record(data: bytes):
+    """
+    Parse an ISO/IEC 19794-2:2005 finger minutiae record
+
+    Args:
+        data (bytes): The record
+
+    Raises:
+        ValueError: Malformed record
+
+    Returns:
+        list[tuple[int, list[Minutia]]]: The finger position and the
+        minutiae (normalized to 500 dpi) of every finger view
+    """
+    if len(data) < ISO_HEADER.size:
+        raise ValueError("Truncated fingerprint record")
+
+    magic, version, length, _, _, _, x_res, y_res, count, _ = ISO_HEADER.unpack_from(
+        data
+    )
+    if magic != ISO_MAGIC or version != ISO_VERSION:
+        raise ValueError("Not an ISO/IEC 19794-2:2005 minutiae record")
+    if length != len(data) or not x_res or not y_res:
+        raise ValueError("Malformed fingerprint record")
+
+    views = []
+    offset = ISO_HEADER.size
+    for _ in range(count):
+        if offset + ISO_VIEW.size > len(data):
+            raise ValueError("Truncated fingerprint record")
+        finger, _, _, minutiae_count = ISO_VIEW.unpack_from(data, offset)
+        offset += ISO_VIEW.size
+
+        minutiae = []
+        for _ in range(minutiae_count):
+            if offset + ISO_MINUTIA.size > len(data):
+                raise ValueError("Truncated fingerprint record")
+            kind_x, y, angle, _ = ISO_MINUTIA.unpack_from(data, offset)
+            offset += ISO_MINUTIA.size
+            minutiae.append(
+                Minutia(
+                    x=round((kind_x & 0x3FFF) * TARGET_PPCM / x_res),
+                    y=round((y & 0x3FFF) * TARGET_PPCM / y_res),
+                    angle=angle,
+                    kind=kind_x >> 14,
+                )
+            )
+
+        # Skip the extended data block
+        if offset + 2 > len(data):
+            raise ValueError("Truncated fingerprint record")
+        offset += 2 + struct.unpack_from(">H", data, offset)[0]
+
+        views.append((finger, minutiae))
+
+    return views
+
+
+def encode_iso_record(
+    minutiae: list[Minutia],
+    finger: int,
+    width: int = 400,
+    height: int = 500,
+    resolution: int = TARGET_PPCM,
+):
+    """
+    Encode the minutiae of a finger as an ISO/IEC 19794-2:2005 record
+    """
+    view = ISO_VIEW.pack(finger, 0, 100, len(minutiae)) + b"".join(
+        ISO_MINUTIA.pack(m.kind << 14 | m.x, m.y, m.angle, 100) for m in minutiae
+    )
+    length = ISO_HEADER.size + len(view) + 2
+    header = ISO_HEADER.pack(
+        ISO_MAGIC, ISO_VERSION, length, 0, width, height, resolution, resolution, 1, 0
+    )
+
+    return header + view + b"\x00\x00"
+
+
+def extract_minutiae(data: str):
+    """
+    Extract the minutiae of the first finger view of a base64 encoded record
+
+    Raises:
+        ValueError: Malformed record or too few minutiae
+
+    Returns:
+        list[Minutia]
+    """
+    try:
+        # Accept data urls, like the pfp uploads
+        record = base64.b64decode(data.split(",", 1)[-1], validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Fingerprint data is not base64 encoded")
+
+    views = parse_iso_record(record)
+    if not views:
+        raise ValueError("Fingerprint record has no finger view")
+
+    minutiae = views[0][1]
+    if len(minutiae) < MIN_MINUTIAE:
+        raise ValueError(f"Fingerprint has less than {MIN_MINUTIAE} minutiae")
+
+    # Keep the template in a byte, dropping minutiae far from the core last
+    if len(minutiae) > MAX_MINUTIAE:
+        cx = sum(m.x for m in minutiae) / len(minutiae)
+        cy = sum(m.y for m in minutiae) / len(minutiae)
+        minutiae = sorted(minutiae, key=lambda m: (m.x - cx) ** 2 + (m.y - cy) ** 2)
+        minutiae = minutiae[:MAX_MINUTIAE]
+
+    return minutiae
+
+
+def pack_template(views: list[tuple[int, list[Minutia]]]):
+    """
+    Pack the minutiae of the finger views into a compact template
+    """
+    parts = [TEMPLATE_HEADER.pack(TEMPLATE_VERSION, len(views))]
+    for finger, minutiae in views:
+        parts.append(TEMPLATE_VIEW.pack(finger, len(minutiae)))
+        parts.extend(
+            TEMPLATE_MINUTIA.pack(m.kind << 30 | m.x << 15 | m.y, m.angle)
+            for m in minutiae
+        )
+
+    return b"".join(parts)
+
+
+def unpack_template(template: bytes):
+    """
+    Unpack a compact template
+
+    Returns:
+        dict[int, list[Minutia]]: finger -> minutiae
+    """
+    version, count = TEMPLATE_HEADER.unpack_from(template)
+    if version != TEMPLATE_VERSION:
+        raise ValueError(f"Unknown fingerprint template version {version}")
+
+    views = {}
+    offset = TEMPLATE_HEADER.size
+    for _ in range(count):
+        finger, minutiae_count = TEMPLATE_VIEW.unpack_from(template, offset)
+        offset += TEMPLATE_VIEW.size
+        end = offset + minutiae_count * TEMPLATE_MINUTIA.size
+
+        minutiae = []
+        for packed, angle in TEMPLATE_MINUTIA.iter_unpack(template[offset:end]):
+            minutiae.append(
+                Minutia(
+                    x=packed >> 15 & 0x7FFF,
+                    y=packed & 0x7FFF,
+                    angle=angle,
+                    kind=packed >> 30,
+                )
+            )
+        offset = end
+
+        views[finger] = minutiae
+
+    return views
+
+
+def triplet_features(minutiae: list[Minutia], neighbours: int):
+    """
+    Get the features of the minutiae triplets of a print, in bins
+
+    Every minutia forms triangles with pairs of its nearest neighbours. The
+    vertices are ordered by the length of the opposite side, and the features
+    are the side lengths plus the direction of each minutia relative to the
+    side to the next vertex, so they don't depend on the position or the
+    rotation of the print.
+
+    Returns:
+        list[list[float]]: The 3 side and 3 angle features of every triangle
+    """
+    points = [(m.x, m.y, m.angle * ANGLE_UNIT) for m in minutiae]
+
+    triangles = set()
+    for i, (x, y, _) in enumerate(points):
+        nearest = sorted(
+            (j for j in range(len(points)) if j != i),
+            key=lambda j: (points[j][0] - x) ** 2 + (points[j][1] - y) ** 2,
+        )
+        for j, k in combinations(nearest[:neighbours], 2):
+            triangles.add(tuple(sorted((i, j, k))))
+
+    features = []
+    for triangle in triangles:
+        vertices = [points[i] for i in triangle]
+
+        # Order the vertices by the length of the opposite side
+        sides = []
+        for n in range(3):
+            (x1, y1, _), (x2, y2, _) = vertices[n - 2], vertices[n - 1]
+            sides.append((math.hypot(x2 - x1, y2 - y1), n))
+        sides.sort()
+        if sides[2][0] > TRIPLET_MAX_SIDE:
+            continue
+        vertices = [vertices[n] for _, n in sides]
+
+        feature = [length / SIDE_BIN for length, _ in sides]
+        for n in range(3):
+            x1, y1, angle = vertices[n]
+            x2, y2, _ = vertices[(n + 1) % 3]
+            relative = (angle - math.atan2(y2 - y1, x2 - x1)) % TURN
+            feature.append(relative / TURN * ANGLE_BINS)
+        features.append(feature)
+
+    return features
+
+
+def triplet_key(bins: list[int]):
+    """
+    Get the index key of the binned features of a triplet
+    """
+    key = 0
+    for value in bins[:3]:
+        key = key * SIDE_BINS + value
+    for value in bins[3:]:
+        key = key * ANGLE_BINS + value % ANGLE_BINS
+
+    return key
+
+
+def triplet_keys(minutiae: list[Minutia], probe: bool = False):
+    """
+    Get the index keys of the minutiae triplets of a print
+
+    Enrolled prints are indexed by the bins of their triplets. A probe also
+    uses the triangles of one more neighbour and, for up to PROBE_SPREAD
+    features within PROBE_MARGIN of a bin edge, the neighbouring bin too, so
+    a triplet whose features moved across an edge, or whose nearest
+    neighbours changed, still finds its print.
+
+    Returns:
+        set[int]
+    """
+    if not probe:
+        return {
+            triplet_key([int(value) for value in feature])
+            for feature in triplet_features(minutiae, TRIPLET_NEIGHBOURS)
+        }
+
+    keys = set()
+    for feature in triplet_features(minutiae, TRIPLET_NEIGHBOURS + 1):
+        bins = [int(value) for value in feature]
+
+        # The features closest to an edge, and the side of the edge
+        edges = []
+        for n, value in enumerate(feature):
+            fraction = value - bins[n]
+            if fraction < PROBE_MARGIN:
+                edges.append((fraction, n, -1))
+            elif fraction > 1 - PROBE_MARGIN:
+                edges.append((1 - fraction, n, 1))
+
+        for moves in product((False, True), repeat=min(len(edges), PROBE_SPREAD)):
+            variant = list(bins)
+            for move, (_, n, step) in zip(moves, sorted(edges)):
+                if move:
+                    variant[n] += step
+            if min(variant[:3]) >= 0:
+                keys.add(triplet_key(variant))
+
+    return keys
+
+
+def pair_minutiae(
+    probe: list, gallery: list, grid: dict, alignment: tuple, tolerance: tuple
+):
+    """
+    Pair the aligned probe minutiae with the gallery minutiae, closest first
+
+    Args:
+        probe (list): The probe points
+        gallery (list): The gallery points
+        grid (dict): The gallery point indexes by GRID_CELL cell
+        alignment (tuple): The rotation, dx and dy of the probe
+        tolerance (tuple): The max distance and angle difference of a pair
+
+    Returns:
+        list[tuple[int, int]]: The probe and gallery index of every pair
+    """
+    rotation, dx, dy = alignment
+    distance, angle = tolerance
+    cos, sin = math.cos(rotation), math.sin(rotation)
+
+    candidates = []
+    for i, (px, py, pa) in enumerate(probe):
+        ax, ay = px * cos - py * sin + dx, px * sin + py * cos + dy
+        cell_x, cell_y = int(ax // GRID_CELL), int(ay // GRID_CELL)
+        for nx in (cell_x - 1, cell_x, cell_x + 1):
+            for ny in (cell_y - 1, cell_y, cell_y + 1):
+                for j in grid.get((nx, ny), ()):
+                    gx, gy, ga = gallery[j]
+                    squared = (ax - gx) ** 2 + (ay - gy) ** 2
+                    if squared > distance**2:
+                        continue
+                    if abs((pa + rotation - ga + math.pi) % TURN - math.pi) <= angle:
+                        candidates.append((squared, i, j))
+
+    used_probe, used_gallery, pairs = set(), set(), []
+    for _, i, j in sorted(candidates):
+        if i not in used_probe and j not in used_gallery:
+            used_probe.add(i)
+            used_gallery.add(j)
+            pairs.append((i, j))
+
+    return pairs
+
+
+def fit_alignment(probe: list, gallery: list, pairs: list[tuple[int, int]]):
+    """
+    Get the rotation and translation that best align the paired minutiae
+
+    Returns:
+        tuple[float, float, float]: The rotation, dx and dy
+    """
+    count = len(pairs)
+    pcx = sum(probe[i][0] for i, _ in pairs) / count
+    pcy = sum(probe[i][1] for i, _ in pairs) / count
+    gcx = sum(gallery[j][0] for _, j in pairs) / count
+    gcy = sum(gallery[j][1] for _, j in pairs) / count
+
+    dot = cross = 0.0
+    for i, j in pairs:
+        px, py = probe[i][0] - pcx, probe[i][1] - pcy
+        gx, gy = gallery[j][0] - gcx, gallery[j][1] - gcy
+        dot += px * gx + py * gy
+        cross += px * gy - py * gx
+
+    rotation = math.atan2(cross, dot)
+    cos, sin = math.cos(rotation), math.sin(rotation)
+
+    return rotation, gcx - (pcx * cos - pcy * sin), gcy - (pcx * sin + pcy * cos)
+
+
+def match_score(probe: list[Minutia], gallery: list[Minutia]):
+    """
+    Score how well two prints match, from 0 to 1
+
+    Every pair of probe and gallery minutiae votes for the rotation and the
+    translation that would align them. The best voted alignments are refined
+    from the minutiae they pair, with a shrinking tolerance, and the aligned
+    minutiae within MATCH_TOLERANCE are paired. The score is
+    paired^2 / (probe minutiae * gallery minutiae).
+
+    Returns:
+        float
+    """
+    if not probe or not gallery:
+        return 0.0
+
+    # Rotate the probe around its centre, a rotation error moves the
+    # minutiae the least
+    cx = sum(m.x for m in probe) / len(probe)
+    cy = sum(m.y for m in probe) / len(probe)
+    probe_points = [(m.x - cx, m.y - cy, m.angle * ANGLE_UNIT) for m in probe]
+    gallery_points = [(m.x, m.y, m.angle * ANGLE_UNIT) for m in gallery]
+
+    grid: dict[tuple[int, int], list[int]] = {}
+    for j, (gx, gy, _) in enumerate(gallery_points):
+        grid.setdefault((int(gx // GRID_CELL), int(gy // GRID_CELL)), []).append(j)
+
+    # Vote, with the probe points rotated by every rotation bin beforehand
+    votes: Counter = Counter()
+    for px, py, pa in probe_points:
+        rotated = [(px * cos - py * sin, px * sin + py * cos) for cos, sin in ROTATIONS]
+        for gx, gy, ga in gallery_points:
+            rotation = round((ga - pa) % TURN * ROTATION_SCALE) % ROTATION_BINS
+            rx, ry = rotated[rotation]
+            votes[
+                (
+                    rotation,
+                    int((gx - rx) // TRANSLATION_BIN),
+                    int((gy - ry) // TRANSLATION_BIN),
+                )
+            ] += 1
+
+    best = 0
+    for (rotation, x_bin, y_bin), _ in votes.most_common(ALIGNMENTS_TRIED):
+        alignment = (
+            rotation / ROTATION_SCALE,
+            (x_bin + 0.5) * TRANSLATION_BIN,
+            (y_bin + 0.5) * TRANSLATION_BIN,
+        )
+
+        # Refine, giving up on alignments that pair too few minutiae to score
+        for tolerance in REFINE_TOLERANCES:
+            pairs = pair_minutiae(
+                probe_points, gallery_points, grid, alignment, tolerance
+            )
+            if len(pairs) < MIN_PAIRS:
+                break
+            alignment = fit_alignment(probe_points, gallery_points, pairs)
+        else:
+            pairs = pair_minutiae(
+                probe_points, gallery_points, grid, alignment, MATCH_TOLERANCE
+            )
+            best = max(best, len(pairs))
+
+    return best**2 / (len(probe) * len(gallery))
+
+
+def score_candidates(
+    probe: list[Minutia], candidates: list[tuple[int, int, bytes]]
+) -> list[tuple[int, int, float]]:
+    """
+    Score the probe against the candidate prints
+
+    Args:
+        probe (list[Minutia]): The probe minutiae
+        candidates (list[tuple[int, int, bytes]]): The fingerprint id, the
+            finger and the template of every candidate
+
+    Returns:
+        list[tuple[int, int, float]]: The fingerprint id, finger and score
+    """
+    scores = []
+    for fingerprint_id, finger, template in candidates:
+        gallery = unpack_template(template).get(finger, [])
+        scores.append((fingerprint_id, finger, match_score(probe, gallery)))
+
+    return scores
+
+
+@lru_cache
+def get_match_pool():
+    """
+    Get the process pool of the matcher, created on the first search
+    """
+    # Spawn, the workers shouldn't inherit the server's sockets and threads
+    return ProcessPoolExecutor(
+        max_workers=get_settings().FINGERPRINT_MATCH_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_match_pool():
+    """
+    Stop the process pool of the matcher, if it was started
+    """
+    if get_match_pool.cache_info().currsize:
+        get_match_pool().shutdown(cancel_futures=True)
+        get_match_pool.cache_clear()
+
+
+async def score_in_pool(
+    probe: list[Minutia], candidates: list[tuple[int, int, bytes]]
+):
+    """
+    Score the candidates across the process pool, without blocking the loop
+
+    Returns:
+        list[tuple[int, int, float]]: The fingerprint id, finger and score
+    """
+    workers = get_settings().FINGERPRINT_MATCH_WORKERS
+    if workers <= 1 or len(candidates) < POOL_MIN_CANDIDATES:
+        return score_candidates(probe, candidates)
+
+    # One chunk per process
+    loop = asyncio.get_running_loop()
+    size = math.ceil(len(candidates) / workers)
+    bounds = [(start, start + size) for start in range(0, len(candidates), size)]
+    chunks = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                get_match_pool(), score_candidates, probe, candidates[start:stop]
+            )
+            for start, stop in bounds
+        ]
+    )
+
+    return [score for chunk in chunks for score in chunk]
@@ -1,223 +1,347 @@
+"""
+Formatters build the response schemas from the db objects
+
+NOTE: The schemas are built with model_construct, i.e without validation.
+The values come from the database so the formatters are trusted to pass the
+schema's types (e.g dates not datetimes) and FastAPI then only checks the
+instances on the response_model pass instead of re-validating every field.
+
+The list endpoints pass rows (see app.poi.rows and the selectors' columns)
+instead of models, the formatters only read the attributes they share.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import Row
+
 from app.core.settings import get_settings
-from app.poi import models
+from app.poi import models, rows
+from app.poi.fingerprint import FINGERS
+from app.poi.schemas import base
 
 # Globals
 settings = get_settings()
+FINGER_NAMES = {position: name for name, position in FINGERS.items()}
+
+
+def format_pfp_url(path: str | None):
+    """
+    Format a pfp path to a complete url
+    """
+    if not path:
+        return path
+
+    if not path.startswith("/"):
+        path = "/" + path
+
+    return settings.PUBLIC_URL + path
+
+
+def format_date(value: date | datetime | None):
+    """
+    Format a date/datetime column to a date
+    """
+    if isinstance(value, datetime):
+        return value.date()
+
+    return value
 
 
 async def format_offense(offense: models.Offense):
     """
-    Format offense obj to dict
+    Format offense obj to schema
     """
 
-    return {
-        "id": offense.id,
-        "name": offense.name,
-        "description": offense.description,
-        "created_at": offense.created_at,
-    }
+    return base.Offense.model_construct(
+        id=offense.id,
+        name=offense.name,
+        description=offense.description,
+        created_at=offense.created_at,
+    )
 
 
-async def format_offense_summary(offense: models.Offense):
+async def format_offense_summary(offense: models.Offense | rows.OffenseSummaryRow):
     """
-    Format offense obj to offense summary dict
+    Format offense obj to offense summary schema
     """
 
-    return {
-        "id": offense.id,
-        "name": offense.name,
-    }
+    return base.OffenseSummary.model_construct(
+        id=offense.id,
+        name=offense.name,
+    )
 
 
 async def format_poi_base(poi: models.POI):
     """
-    Format poi obj to poi base dict
-    """
-
-    return {
-        "id": poi.id,
-        "pfp": poi.pfp_url,
-        "full_name": poi.full_name,
-        "alias": poi.alias,
-        "dob": poi.dob,
-        "state_of_origin": poi.state_of_origin,
-        "lga_of_origin": poi.lga_of_origin,
-        "district_of_origin": poi.district_of_origin,
-        "pob": poi.pob,
-        "nationality": poi.nationality,
-        "religion": poi.religion,
-        "political_affiliation": poi.political_affiliation,
-        "tribal_union": poi.tribal_union,
-        "last_seen_date": poi.last_seen_date,
-        "last_seen_time": poi.last_seen_time,
-        "is_pinned": poi.is_pinned,
-        "notes": poi.notes,
-        "id_documents": [
+    Format poi obj to poi base schema
+    """
+
+    return base.POIBaseInformation.model_construct(
+        id=poi.id,
+        pfp=format_pfp_url(poi.pfp_url),
+        full_name=poi.full_name,
+        alias=poi.alias,
+        dob=format_date(poi.dob),
+        state_of_origin=poi.state_of_origin,
+        lga_of_origin=poi.lga_of_origin,
+        district_of_origin=poi.district_of_origin,
+        pob=poi.pob,
+        nationality=poi.nationality,
+        religion=poi.religion,
+        political_affiliation=poi.political_affiliation,
+        tribal_union=poi.tribal_union,
+        last_seen_date=poi.last_seen_date,
+        last_seen_time=poi.last_seen_time,
+        notes=poi.notes,
+        id_documents=[
             await format_id_document(doc=doc)
             for doc in poi.id_documents
             if not bool(doc.is_deleted)
         ],
-        "created_at": poi.created_at,
-    }
+        created_at=poi.created_at,
+    )
 
 
-async def format_poi_summary(poi: models.POI):
+async def format_poi_summary(poi: models.POI | rows.POISummaryRow):
     """
-    Format poi obj to poi summary
+    Format poi obj to poi summary schema
     """
 
-    return {
-        "id": poi.id,
-        "full_name": poi.full_name,
-        "convictions": [await format_poi_offense(conv=conv) for conv in poi.offenses],
-        "is_pinned": poi.is_pinned,
-        "created_at": poi.created_at,
-    }
+    return base.POISummary.model_construct(
+        id=poi.id,
+        full_name=poi.full_name,
+        convictions=[await format_poi_offense(conv=conv) for conv in poi.offenses],
+        is_pinned=poi.is_pinned,
+        created_at=poi.created_at,
+    )
 
 
-async def format_poi_offense(conv: models.POIOffense):
+async def format_poi_dossier(poi: models.POI, sections: list[str]):
     """
-    Format poi offense to dict
+    Format poi obj to poi dossier schema
+
+    NOTE: The poi's child collections are expected to be filtered for deleted
+    rows by the selector (see selectors.get_poi_dossier)
     """
-    return {
-        "id": conv.id,
-        "offense": await format_offense_summary(offense=conv.offense),
-        "case_id": conv.case_id,
-        "date_convicted": conv.date_convicted,
-        "notes": conv.notes,
-    }
+    dossier = {}
+
+    if "base" in sections:
+        dossier["base"] = await format_poi_base(poi=poi)
+    if "id-doc" in sections:
+        dossier["id_documents"] = [
+            await format_id_document(doc=doc) for doc in poi.id_documents
+        ]
+    if "gsm" in sections:
+        dossier["gsm_numbers"] = [await format_gsm(gsm=gsm) for gsm in poi.gsm_numbers]
+    if "address" in sections:
+        dossier["residential_addresses"] = [
+            await format_residential_address(address=address)
+            for address in poi.residential_addresses
+        ]
+    if "associate" in sections:
+        dossier["known_associates"] = [
+            await format_known_associate(associate=associate)
+            for associate in poi.known_associates
+        ]
+    if "employment" in sections:
+        dossier["employment_history"] = [
+            await format_employment_history(history=history)
+            for history in poi.employment_history
+        ]
+    if "vetstatus" in sections and poi.veteran_status:
+        dossier["veteran_status"] = await format_veteran_status(
+            status=poi.veteran_status
+        )
+    if "education" in sections:
+        dossier["educational_background"] = [
+            await format_educational_background(education=education)
+            for education in poi.educational_background
+        ]
+    if "conviction" in sections:
+        dossier["convictions"] = [
+            await format_poi_offense(conv=conv) for conv in poi.offenses
+        ]
+    if "spot" in sections:
+        dossier["frequented_spots"] = [
+            await format_frequented_spot(spot=spot) for spot in poi.frequented_spots
+        ]
+
+    return base.POIDossier.model_construct(**dossier)
+
+
+async def format_poi_offense(
+    conv: models.POIOffense | rows.POIOffenseRow,
+    offense: models.Offense | None = None,
+):
+    """
+    Format poi offense to schema, the offense defaults to conv.offense
+    """
+    return base.POIOffense.model_construct(
+        id=conv.id,
+        offense=await format_offense_summary(offense=offense or conv.offense),
+        case_id=conv.case_id,
+        date_convicted=conv.date_convicted,
+        notes=conv.notes,
+    )
 
 
 async def format_poi_other_profile(poi: models.POI):
     """
-    Format poi to poi other profile obj
+    Format poi to poi other profile schema
     """
-    return {
-        "gsm_numbers": [await format_gsm(gsm=gsm) for gsm in poi.gsm_numbers],
-        "residential_addresses": [
+    return base.POIOtherInformation.model_construct(
+        gsm_numbers=[await format_gsm(gsm=gsm) for gsm in poi.gsm_numbers],
+        residential_addresses=[
             await format_residential_address(address=address)
             for address in poi.residential_addresses
         ],
-        "known_associates": [
+        known_associates=[
             await format_known_associate(associate=associate)
             for associate in poi.known_associates
         ],
-    }
+    )
 
 
-async def format_id_document(doc: models.IDDocument):
+async def format_id_document(doc: models.IDDocument | Row):
     """
-    Format ID Doc object to dict
+    Format ID Doc object to schema
     """
 
-    return {
-        "id": doc.id,
-        "type": doc.type,
-        "id_number": doc.id_number,
-    }
+    return base.IDDocument.model_construct(
+        id=doc.id,
+        type=doc.type,
+        id_number=doc.id_number,
+    )
 
 
-async def format_gsm(gsm: models.GSMNumber):
+async def format_gsm(gsm: models.GSMNumber | Row):
     """
-    Format gsm obj to dict
+    Format gsm obj to schema
     """
-    return {
-        "id": gsm.id,
-        "service_provider": gsm.service_provider,
-        "number": gsm.number,
-        "last_call_date": gsm.last_call_date,
-        "last_call_time": gsm.last_call_time,
-    }
+    return base.GSMNumber.model_construct(
+        id=gsm.id,
+        service_provider=gsm.service_provider,
+        number=gsm.number,
+        last_call_date=gsm.last_call_date,
+        last_call_time=gsm.last_call_time,
+    )
 
 
-async def format_residential_address(address: models.ResidentialAddress):
+async def format_residential_address(address: models.ResidentialAddress | Row):
     """
-    Format residential address obj to dict
+    Format residential address obj to schema
     """
-    return {
-        "id": address.id,
-        "country": address.country,
-        "state": address.state,
-        "city": address.city,
-        "address": address.address,
-    }
+    return base.ResidentialAddress.model_construct(
+        id=address.id,
+        country=address.country,
+        state=address.state,
+        city=address.city,
+        address=address.address,
+    )
 
 
-async def format_known_associate(associate: models.KnownAssociate):
+async def format_known_associate(associate: models.KnownAssociate | Row):
+    """
+    Format known associate obj to schema
+    """
+    return base.KnownAssociate.model_construct(
+        id=associate.id,
+        full_name=associate.full_name,
+        known_gsm_numbers=associate.known_gsm_numbers,
+        relationship=associate.relationship,
+        occupation=associate.occupation,
+        residential_address=associate.residential_address,
+        last_seen_date=associate.last_seen_date,
+        last_seen_time=associate.last_seen_time,
+    )
+
+
+async def format_employment_history(history: models.EmploymentHistory | Row):
     """
-    Format known associate obj to dict
+    Format employment history obj to schema
     """
-    return {
-        "id": associate.id,
-        "full_name": associate.full_name,
-        "known_gsm_numbers": associate.known_gsm_numbers,
-        "relationship": associate.relationship,
-        "occupation": associate.occupation,
-        "residential_address": associate.residential_address,
-        "last_seen_date": associate.last_seen_date,
-        "last_seen_time": associate.last_seen_time,
-    }
+    return base.EmploymentHistory.model_construct(
+        id=history.id,
+        company=history.company,
+        employment_type=history.employment_type,
+        from_date=history.from_date,
+        to_date=history.to_date,
+        current_job=history.current_job,
+        description=history.description,
+    )
 
 
-async def format_employment_history(history: models.EmploymentHistory):
+async def format_veteran_status(status: models.VeteranStatus):
+    """
+    Format veteran status obj to schema
+    """
+    return base.VeteranStatus.model_construct(
+        id=status.id,
+        is_veteran=status.is_veteran,
+        section=status.section,
+        location=status.location,
+        id_card=status.id_card,
+        id_card_issuer=status.id_card_issuer,
+        from_date=status.from_date,
+        to_date=status.to_date,
+        notes=status.notes,
+    )
+
+
+async def format_educational_background(
+    education: models.EducationalBackground | Row,
+):
+    """
+    Format educational background obj to schema
+    """
+    return base.EducationalBackground.model_construct(
+        id=education.id,
+        type=education.type,
+        institute_name=education.institute_name,
+        country=education.country,
+        state=education.state,
+        from_date=education.from_date,
+        to_date=education.to_date,
+        current_institute=education.current_institute,
+    )
+
+
+async def format_frequented_spot(spot: models.FrequentedSpot | Row):
     """
-    Format employment history obj to dict
+    Format frequented spot obj to schema
     """
-    return {
-        "id": history.id,
-        "company": history.company,
-        "employment_type": history.employment_type,
-        "from_date": history.from_date,
-        "to_date": history.to_date,
-        "current_job": history.current_job,
-        "description": history.description,
-    }
+    return base.FrequentedSpot.model_construct(
+        id=spot.id,
+        country=spot.country,
+        state=spot.state,
+        lga=spot.lga,
+        address=spot.address,
+        from_date=spot.from_date,
+        to_date=spot.to_date,
+        notes=spot.notes,
+    )
+
+
+async def format_fingerprint(fingerprint: models.Fingerprint):
+    """
+    Format fingerprint obj to schema
+    """
+    return base.Fingerprint.model_construct(
+        id=fingerprint.id,
+        left_thumb=fingerprint.left_thumb,
+        right_thumb=fingerprint.right_thumb,
+        left_pointer=fingerprint.left_pointer,
+        right_pointer=fingerprint.right_pointer,
+    )
 
 
-async def format_veteran_status(status: models.VeteranStatus):
+async def format_fingerprint_match(match: dict):
+    """
+    Format fingerprint search match to schema
     """
-    Format veteran status obj to dict
-    """
-    return {
-        "id": status.id,
-        "is_veteran": status.is_veteran,
-        "section": status.section,
-        "location": status.location,
-        "id_card": status.id_card,
-        "id_card_issuer": status.id_card_issuer,
-        "from_date": status.from_date,
-        "to_date": status.to_date,
-        "notes": status.notes,
-    }
-
-
-async def format_educational_background(education: models.EducationalBackground):
-    """
-    Format educational background obj to dict
-    """
-    return {
-        "id": education.id,
-        "type": education.type,
-        "institute_name": education.institute_name,
-        "country": education.country,
-        "state": education.state,
-        "from_date": education.from_date,
-        "to_date": education.to_date,
-        "current_institute": education.current_institute,
-    }
-
-
-async def format_frequented_spot(spot: models.FrequentedSpot):
-    """
-    Format frequented spot obj to dict
-    """
-    return {
-        "id": spot.id,
-        "country": spot.country,
-        "state": spot.state,
-        "lga": spot.lga,
-        "address": spot.address,
-        "from_date": spot.from_date,
-        "to_date": spot.to_date,
-        "notes": spot.notes,
-    }
+    return base.FingerprintMatch.model_construct(
+        poi_id=match["poi_id"],
+        full_name=match["full_name"],
+        finger=FINGER_NAMES[match["finger"]],
+        score=round(match["score"], 4),
+    )
@@ -6,20 +6,18 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
+    SmallInteger,
     String,
     Text,
     Time,
+    text,
 )
 from sqlalchemy.orm import Mapped, relationship
 
-from app.common.encryption import EncryptionManager
 from app.core.database import DBBase
-from app.core.settings import get_settings
-
-# Globals
-settings = get_settings()
-encryption_manager = EncryptionManager(key=settings.ENCRYPTION_KEY)
 
 
 class Offense(DBBase):
@@ -28,6 +26,7 @@ class Offense(DBBase):
     """
 
     __tablename__ = "offenses"
+    __table_args__ = (Index("ix_offenses_name", "name", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -35,12 +34,28 @@ class Offense(DBBase):
     created_at = Column(DateTime(timezone=True), default=datetime.now(), nullable=False)
 
 
+class CacheGeneration(DBBase):
+    """
+    Database model for the cache generations of the rows shared by the pois
+    (e.g the offenses), bumped with the rows so every worker sees the bump
+    """
+
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String, primary_key=True)
+    generation = Column(Integer, default=0, nullable=False)
+
+
 class POI(DBBase):
     """
     Database model for persons of interest
     """
 
     __tablename__ = "pois"
+    __table_args__ = (
+        # Soft deleted pois, see app.core.retention
+        Index("ix_pois_deleted_at", "deleted_at", postgresql_where=text("is_deleted")),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     pfp_url = Column(String, nullable=True)
@@ -63,6 +78,7 @@ class POI(DBBase):
         default=False,
         nullable=False,
     )
+    version = Column(Integer, default=1, nullable=False)
 
     is_deleted = Column(Boolean, default=False, nullable=False)
     edited_at = Column(DateTime(timezone=True), onupdate=datetime.now(), nullable=True)
@@ -106,6 +122,18 @@ class IDDocument(DBBase):
     """
 
     __tablename__ = "id_documents"
+    __table_args__ = (
+        Index(
+            "ix_id_documents_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_id_documents_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -128,6 +156,18 @@ class GSMNumber(DBBase):
     """
 
     __tablename__ = "gsm_numbers"
+    __table_args__ = (
+        Index(
+            "ix_gsm_numbers_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_gsm_numbers_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -152,6 +192,18 @@ class ResidentialAddress(DBBase):
     """
 
     __tablename__ = "residential_addresses"
+    __table_args__ = (
+        Index(
+            "ix_residential_addresses_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_residential_addresses_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -176,6 +228,18 @@ class KnownAssociate(DBBase):
     """
 
     __tablename__ = "known_associates"
+    __table_args__ = (
+        Index(
+            "ix_known_associates_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_known_associates_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -203,6 +267,18 @@ class EmploymentHistory(DBBase):
     """
 
     __tablename__ = "employment_histories"
+    __table_args__ = (
+        Index(
+            "ix_employment_histories_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_employment_histories_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -229,6 +305,14 @@ class VeteranStatus(DBBase):
     """
 
     __tablename__ = "veteran_statuses"
+    __table_args__ = (
+        Index("ix_veteran_statuses_poi_id", "poi_id"),
+        Index(
+            "ix_veteran_statuses_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     poi_id = Column(
@@ -259,6 +343,18 @@ class EducationalBackground(DBBase):
     """
 
     __tablename__ = "educational_backgrounds"
+    __table_args__ = (
+        Index(
+            "ix_educational_backgrounds_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_educational_backgrounds_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -286,6 +382,19 @@ class POIOffense(DBBase):
     """
 
     __tablename__ = "poi_offenses"
+    __table_args__ = (
+        Index(
+            "ix_poi_offenses_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_poi_offenses_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+        Index("ix_poi_offenses_offense_id", "offense_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -314,6 +423,18 @@ class FrequentedSpot(DBBase):
     """
 
     __tablename__ = "frequented_spots"
+    __table_args__ = (
+        Index(
+            "ix_frequented_spots_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_frequented_spots_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
@@ -341,13 +462,28 @@ class Fingerprint(DBBase):
     """
 
     __tablename__ = "fingerprints"
+    __table_args__ = (
+        Index(
+            "ix_fingerprints_poi_id_active",
+            "poi_id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_fingerprints_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     poi_id = Column(Integer, ForeignKey("pois.id", ondelete="CASCADE"), nullable=False)
+    # The submitted minutiae records, kept to rebuild the templates and index
     left_thumb = Column(String, nullable=False)
     right_thumb = Column(String, nullable=False)
     left_pointer = Column(String, nullable=False)
     right_pointer = Column(String, nullable=False)
+    # Minutiae of the four fingers, see app.poi.fingerprint.pack_template
+    template = Column(LargeBinary, nullable=True)
 
     is_deleted = Column(Boolean, default=False, nullable=False)
     edited_at = Column(DateTime(timezone=True), onupdate=datetime.now(), nullable=True)
@@ -357,3 +493,20 @@ class Fingerprint(DBBase):
         nullable=False,
     )
     deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class FingerprintKey(DBBase):
+    """
+    Database model for the minutiae triplet index of the active fingerprints
+    """
+
+    __tablename__ = "fingerprint_keys"
+
+    # The key leads the primary key, searches look keys up
+    key = Column(Integer, primary_key=True)
+    fingerprint_id = Column(
+        Integer,
+        ForeignKey("fingerprints.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    finger = Column(SmallInteger, primary_key=True)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, status
 
 from app.common.annotations import DatabaseSession, PaginationParams
-from app.common.paginators import get_pagination_metadata
+from app.common.cache import get_response_cache, make_key
+from app.common.paginators import build_paginated_json, get_pagination_metadata
+from app.core.settings import get_settings
 from app.poi import selectors, services
 from app.poi.formatters import format_offense
 from app.poi.schemas import create, edit, response
@@ -9,6 +11,8 @@ from app.user import services as user_services
 from app.user.annotated import CurrentUser
 
 router = APIRouter()
+settings = get_settings()
+cache = get_response_cache()
 
 
 @router.post(
@@ -52,21 +56,48 @@ async def route_poi_offense_list(
         db=db,
     )
 
-    # get offenses
-    offenses, tnoi = await selectors.get_paginated_offense_list(
-        pagination=pagination, db=db
+    # Get offense generation
+    generation = await selectors.get_cache_generation(namespace="offense", db=db)
+
+    async def build_response():
+        # Check: database json fast path
+        if settings.DB_JSON_LISTS:
+            data, count, tnoi = await selectors.get_paginated_offense_list_json(
+                pagination=pagination, db=db
+            )
+
+            return build_paginated_json(
+                response_model=response.PaginatedOffenseListResponse,
+                data=data,
+                meta=get_pagination_metadata(
+                    tno_items=tnoi,
+                    count=count,
+                    page=pagination.page,
+                    size=pagination.size,
+                ),
+            )
+
+        # get offenses
+        offenses, tnoi = await selectors.get_paginated_offense_list(
+            pagination=pagination, db=db
+        )
+
+        return {
+            "data": [await format_offense(offense=offense) for offense in offenses],
+            "meta": get_pagination_metadata(
+                tno_items=tnoi,
+                count=len(offenses),
+                page=pagination.page,
+                size=pagination.size,
+            ),
+        }
+
+    return await cache.respond(
+        key=make_key("offense-list", version=generation, **pagination._asdict()),
+        response_model=response.PaginatedOffenseListResponse,
+        builder=build_response,
     )
 
-    return {
-        "data": [await format_offense(offense=offense) for offense in offenses],
-        "meta": get_pagination_metadata(
-            tno_items=tnoi,
-            count=len(offenses),
-            page=pagination.page,
-            size=pagination.size,
-        ),
-    }
-
 
 @router.get(
     "/{offense_id}/",
@@ -151,6 +182,9 @@ async def route_poi_offense_delete(
 
     # Delete offense
     db.delete(offense)
-    db.commit()
+    db.flush()
+
+    # Invalidate cached offenses
+    await services.bump_cache_generation(namespace="offense", db=db)
 
     return {}
@@ -0,0 +1,66 @@
+"""
+Read only rows of the list endpoints
+
+The selectors of the list endpoints read only the columns the formatters
+use, into these rows instead of models: no identity map, no change tracking,
+no lazy loading. They keep the models' attribute names, so the formatters
+take either.
+"""
+
+from datetime import date, datetime
+
+
+class OffenseSummaryRow:
+    """
+    The columns of formatters.format_offense_summary
+    """
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id: int, name: str):  # pylint: disable=redefined-builtin
+        self.id = id
+        self.name = name
+
+
+class POIOffenseRow:
+    """
+    The columns of formatters.format_poi_offense
+    """
+
+    __slots__ = ("id", "offense", "case_id", "date_convicted", "notes")
+
+    def __init__(
+        self,
+        id: int,  # pylint: disable=redefined-builtin
+        offense: OffenseSummaryRow,
+        case_id: str | None,
+        date_convicted: date | None,
+        notes: str | None,
+    ):
+        self.id = id
+        self.offense = offense
+        self.case_id = case_id
+        self.date_convicted = date_convicted
+        self.notes = notes
+
+
+class POISummaryRow:
+    """
+    The columns of formatters.format_poi_summary
+    """
+
+    __slots__ = ("id", "full_name", "offenses", "is_pinned", "created_at")
+
+    def __init__(
+        self,
+        id: int,  # pylint: disable=redefined-builtin
+        full_name: str,
+        offenses: list[POIOffenseRow],
+        is_pinned: bool,
+        created_at: datetime,
+    ):
+        self.id = id
+        self.full_name = full_name
+        self.offenses = offenses
+        self.is_pinned = is_pinned
+        self.created_at = created_at
@@ -143,6 +143,45 @@ class POIOtherInformation(BaseModel):
     )
 
 
+class POIDossier(BaseModel):
+    """
+    Base schema for the poi's full dossier
+
+    NOTE: Sections left out of the request's projection are null
+    """
+
+    base: POIBaseInformation | None = Field(
+        default=None, description="The poi's base information"
+    )
+    id_documents: list["IDDocument"] | None = Field(
+        default=None, description="The poi's id documents"
+    )
+    gsm_numbers: list["GSMNumber"] | None = Field(
+        default=None, description="The poi's gsm numbers"
+    )
+    residential_addresses: list["ResidentialAddress"] | None = Field(
+        default=None, description="The poi's residential addresses"
+    )
+    known_associates: list["KnownAssociate"] | None = Field(
+        default=None, description="The poi's known associates"
+    )
+    employment_history: list["EmploymentHistory"] | None = Field(
+        default=None, description="The poi's employment history"
+    )
+    veteran_status: "VeteranStatus | None" = Field(
+        default=None, description="The poi's veteran status"
+    )
+    educational_background: list["EducationalBackground"] | None = Field(
+        default=None, description="The poi's educational background"
+    )
+    convictions: list["POIOffense"] | None = Field(
+        default=None, description="The poi's convictions"
+    )
+    frequented_spots: list["FrequentedSpot"] | None = Field(
+        default=None, description="The poi's frequented spots"
+    )
+
+
 class IDDocument(BaseModel):
     """
     Base schema for ID Documents
@@ -282,6 +321,17 @@ class Fingerprint(BaseModel):
     right_pointer: str = Field(description="Right pointer finger fingerprint data")
 
 
+class FingerprintMatch(BaseModel):
+    """
+    Base schema for fingerprint search matches
+    """
+
+    poi_id: int = Field(description="The matched poi's ID")
+    full_name: str = Field(description="The matched poi's full name")
+    finger: str = Field(description="The matched finger")
+    score: float = Field(description="The match score, from 0 to 1")
+
+
 class TopPOIOffense(BaseModel):
     """
     Base schema for top poi offenses
@@ -1,4 +1,5 @@
 from datetime import date, time
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -74,8 +75,10 @@ class POICreate(BaseModel):
         default=None, description="The poi's frequented spots"
     )
 
-    # # Fingerprint
-    # fingerprints: "CreateFingerprint" = Field(description="The poi's fingerprints")
+    # Fingerprint
+    fingerprints: "CreateFingerprint | None" = Field(
+        default=None, description="The poi's fingerprints"
+    )
 
 
 class CreatePOIBaseInformation(BaseModel):
@@ -233,7 +236,28 @@ class CreateFingerprint(BaseModel):
     Create schema for POI fingerprints
     """
 
-    left_thumb: str = Field(description="Left thumb fingerprint data")
-    right_thumb: str = Field(description="Right thumb fingerprint data")
-    left_pointer: str = Field(description="Left pointer finger fingerprint data")
-    right_pointer: str = Field(description="Right pointer finger fingerprint data")
+    left_thumb: str = Field(
+        description="Left thumb ISO/IEC 19794-2 minutiae record, base64 encoded"
+    )
+    right_thumb: str = Field(
+        description="Right thumb ISO/IEC 19794-2 minutiae record, base64 encoded"
+    )
+    left_pointer: str = Field(
+        description="Left pointer ISO/IEC 19794-2 minutiae record, base64 encoded"
+    )
+    right_pointer: str = Field(
+        description="Right pointer ISO/IEC 19794-2 minutiae record, base64 encoded"
+    )
+
+
+class FingerprintSearch(BaseModel):
+    """
+    Schema for 1:N fingerprint searches
+    """
+
+    data: str = Field(
+        description="The print's ISO/IEC 19794-2 minutiae record, base64 encoded"
+    )
+    finger: (
+        Literal["left_thumb", "right_thumb", "left_pointer", "right_pointer"] | None
+    ) = Field(default=None, description="The finger of the print, all if not set")
@@ -39,6 +39,16 @@ class POIBaseInformationEdit(BaseModel):
     notes: str | None = Field(default=None, description="additional notes on the poi")
 
 
+class POIBulkDelete(BaseModel):
+    """
+    Schema for bulk poi deletes
+    """
+
+    poi_ids: list[int] = Field(
+        min_length=1, max_length=1000, description="The IDs of the pois to delete"
+    )
+
+
 class POIOtherProfileEdit(BaseModel):
     """
     Edit schema for other profile poi information
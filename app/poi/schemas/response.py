@@ -4,12 +4,15 @@ from app.common.schemas import PaginatedResponseSchema, ResponseSchema
 from app.poi.schemas.base import (
     EducationalBackground,
     EmploymentHistory,
+    Fingerprint,
+    FingerprintMatch,
     FrequentedSpot,
     GSMNumber,
     IDDocument,
     KnownAssociate,
     Offense,
     POIBaseInformation,
+    POIDossier,
     POIOffense,
     POIOtherInformation,
     POISummary,
@@ -63,6 +66,26 @@ class POIDeleteRequestResponse(ResponseSchema):
     data: None = None
 
 
+class POIBulkDeleteResponse(ResponseSchema):
+    """
+    Response schema for bulk poi deletes
+    """
+
+    msg: str = Field(default="Succesfully Deleted POIs")
+    data: list[int] = Field(
+        description="The IDs of the deleted pois, without those not found"
+    )
+
+
+class POIRestoreResponse(ResponseSchema):
+    """
+    Response schema for poi restore
+    """
+
+    msg: str = Field(default="Succesfully Restored Poi")
+    data: None = None
+
+
 class POIBaseInformationResponse(ResponseSchema):
     """
     Response schema for poi's
@@ -72,6 +95,15 @@ class POIBaseInformationResponse(ResponseSchema):
     data: POIBaseInformation = Field(description="The details of the poi")
 
 
+class POIDossierResponse(ResponseSchema):
+    """
+    Response schema for the poi's dossier
+    """
+
+    msg: str = Field(default="POI dossier retreieved successfully")
+    data: POIDossier = Field(description="The poi's dossier")
+
+
 class POIOtherInformationResponse(ResponseSchema):
     """
     Response schema for poi other profile info
@@ -329,3 +361,21 @@ class FrequentedSpotDeleteResponse(ResponseSchema):
 
     msg: str = Field(default="Frequented spot deleted successfully")
     data: None = None
+
+
+class FingerprintResponse(ResponseSchema):
+    """
+    Response schema for poi fingerprints
+    """
+
+    msg: str = Field(default="Fingerprint retrieved successfully")
+    data: Fingerprint = Field(description="The details of the fingerprint")
+
+
+class FingerprintMatchListResponse(ResponseSchema):
+    """
+    Response schema for fingerprint searches
+    """
+
+    msg: str = Field(default="Fingerprint search completed successfully")
+    data: list[FingerprintMatch] = Field(description="The matches, best first")
@@ -2,20 +2,22 @@
 from datetime import datetime, tzinfo
 from typing import cast
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Query, Session
+from sqlalchemy import ColumnElement, Subquery, Text, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Query, Session, selectinload, with_loader_criteria
 
-from app.common.encryption import EncryptionManager
 from app.common.exceptions import InternalServerError
 from app.common.paginators import paginate
 from app.common.types import PaginationParamsType
 from app.common.utils import get_last_day_of_month
 from app.core.settings import get_settings
-from app.poi import models, utils
+from app.poi import models, rows, utils
+from app.poi.fingerprint import Minutia, score_in_pool, triplet_keys
 from app.poi.crud import (
     POICRUD,
     EducationalBackgroundCRUD,
     EmploymentHistoryCRUD,
+    FingerprintCRUD,
     FrequentedSpotCRUD,
     GSMNumberCRUD,
     IDDocumentCRUD,
@@ -28,6 +30,7 @@ from app.poi.crud import (
 from app.poi.exceptions import (
     EducationalBackgroundNotFound,
     EmploymentHistoryNotFound,
+    FingerprintNotFound,
     FrequentedSpotNotFound,
     GSMNumberNotFound,
     IDDocumentNotFound,
@@ -40,7 +43,77 @@ from app.poi.exceptions import (
 
 # Globals
 settings = get_settings()
-encryption_manager = EncryptionManager(key=settings.ENCRYPTION_KEY)
+
+# Dossier section -> loader options of its relationship
+DOSSIER_SECTIONS = {
+    "base": [selectinload(models.POI.id_documents)],
+    "id-doc": [selectinload(models.POI.id_documents)],
+    "gsm": [selectinload(models.POI.gsm_numbers)],
+    "address": [selectinload(models.POI.residential_addresses)],
+    "associate": [selectinload(models.POI.known_associates)],
+    "employment": [selectinload(models.POI.employment_history)],
+    "vetstatus": [selectinload(models.POI.veteran_status)],
+    "education": [selectinload(models.POI.educational_background)],
+    "conviction": [
+        selectinload(models.POI.offenses).joinedload(models.POIOffense.offense)
+    ],
+    "spot": [selectinload(models.POI.frequented_spots)],
+}
+# Columns of the list formatters, read as rows (see app.poi.rows)
+POI_SUMMARY_COLUMNS = ["id", "full_name", "is_pinned", "created_at"]
+POI_OFFENSE_COLUMNS = ["id", "case_id", "date_convicted", "notes"]
+ID_DOCUMENT_COLUMNS = ["id", "type", "id_number"]
+GSM_COLUMNS = ["id", "service_provider", "number", "last_call_date", "last_call_time"]
+RESIDENTIAL_ADDRESS_COLUMNS = ["id", "country", "state", "city", "address"]
+KNOWN_ASSOCIATE_COLUMNS = [
+    "id",
+    "full_name",
+    "known_gsm_numbers",
+    "relationship",
+    "occupation",
+    "residential_address",
+    "last_seen_date",
+    "last_seen_time",
+]
+EMPLOYMENT_HISTORY_COLUMNS = [
+    "id",
+    "company",
+    "employment_type",
+    "from_date",
+    "to_date",
+    "current_job",
+    "description",
+]
+EDUCATIONAL_BACKGROUND_COLUMNS = [
+    "id",
+    "type",
+    "institute_name",
+    "country",
+    "state",
+    "from_date",
+    "to_date",
+    "current_institute",
+]
+FREQUENTED_SPOT_COLUMNS = [
+    "id",
+    "country",
+    "state",
+    "lga",
+    "address",
+    "from_date",
+    "to_date",
+    "notes",
+]
+DOSSIER_SOFT_DELETE_MODELS = [
+    models.IDDocument,
+    models.GSMNumber,
+    models.ResidentialAddress,
+    models.KnownAssociate,
+    models.EmploymentHistory,
+    models.EducationalBackground,
+    models.POIOffense,
+    models.FrequentedSpot,
+]
 
 
 async def get_offense_by_id(id: int, db: Session, raise_exc: bool = True):
@@ -69,16 +142,16 @@ async def get_offense_by_id(id: int, db: Session, raise_exc: bool = True):
     return obj
 
 
-async def get_paginated_offense_list(pagination: PaginationParamsType, db: Session):
+async def get_offense_list_qs(pagination: PaginationParamsType, db: Session):
     """
-    Get paginated offense list
+    Get the filtered and ordered (unpaginated) offense list qs
 
     Args:
         pagination (PaginationParamsType): The pagination details
         db (Session): The database session
 
     Returns:
-        list[models.Offense]
+        Query[models.Offense]
     """
     # Init crud
     offense_crud = OffenseCRUD(db=db)
@@ -96,6 +169,22 @@ async def get_paginated_offense_list(pagination: PaginationParamsType, db: Sessi
     if pagination.q:
         qs = qs.filter(models.Offense.name.ilike(f"%{pagination.q}%"))
 
+    return qs
+
+
+async def get_paginated_offense_list(pagination: PaginationParamsType, db: Session):
+    """
+    Get paginated offense list
+
+    Args:
+        pagination (PaginationParamsType): The pagination details
+        db (Session): The database session
+
+    Returns:
+        (list[models.Offense], int): The list of offenses and the total length
+    """
+    qs = await get_offense_list_qs(pagination=pagination, db=db)
+
     results: list[models.Offense] = paginate(
         qs=qs, page=pagination.page, size=pagination.size
     )
@@ -103,14 +192,54 @@ async def get_paginated_offense_list(pagination: PaginationParamsType, db: Sessi
     return results, qs.count()
 
 
-async def get_paginated_poi_list(
+async def get_paginated_offense_list_json(
+    pagination: PaginationParamsType, db: Session
+):
+    """
+    Get paginated offense list serialized by the database
+
+    NOTE: Postgres only, the items match formatters.format_offense
+
+    Args:
+        pagination (PaginationParamsType): The pagination details
+        db (Session): The database session
+
+    Returns:
+        (bytes, int, int): The json array of offenses, its length and the total length
+    """
+    qs = await get_offense_list_qs(pagination=pagination, db=db)
+
+    # Page of offenses
+    page = (
+        qs.limit(pagination.size)
+        .offset(pagination.size * (pagination.page - 1))
+        .subquery()
+    )
+
+    obj = func.json_build_object(
+        "id",
+        page.c.id,
+        "name",
+        page.c.name,
+        "description",
+        page.c.description,
+        "created_at",
+        page.c.created_at,
+    )
+
+    return await get_json_page(
+        page=page, obj=obj, order_by=page.c.id, pagination=pagination, qs=qs, db=db
+    )
+
+
+async def get_poi_list_qs(
     gsm: str | None,
     is_pinned: bool | None,
     pagination: PaginationParamsType,
     db: Session,
 ):
     """
-    Get paginated poi list
+    Get the filtered and ordered (unpaginated) poi list qs
 
     Args:
         gsm (str | None): Search by gsm number
@@ -119,7 +248,7 @@ async def get_paginated_poi_list(
         db (Session): The database session
 
     Returns:
-        (list[models.POI], int): The list of pois and the total length
+        Query[models.POI]
     """
     # Init crud
     poi_crud = POICRUD(db=db)
@@ -147,8 +276,12 @@ async def get_paginated_poi_list(
             models.GSMNumber.is_deleted.is_(False),
         )
 
-        # Check matching pois status
-        qs = qs.filter(models.POI.id.in_([gsm.poi_id for gsm in gsm_qs.all()]))
+        # Check matching pois status, in the same query
+        qs = qs.filter(
+            models.POI.id.in_(
+                gsm_qs.with_entities(models.GSMNumber.poi_id).scalar_subquery()
+            )
+        )
 
     # Search
     if pagination.q:
@@ -164,14 +297,204 @@ async def get_paginated_poi_list(
     if is_pinned:
         qs = qs.filter_by(is_pinned=is_pinned)
 
-    # Paginate
-    results: list[models.POI] = paginate(
-        qs=qs, page=pagination.page, size=pagination.size
+    return qs
+
+
+async def get_paginated_poi_list(
+    gsm: str | None,
+    is_pinned: bool | None,
+    pagination: PaginationParamsType,
+    db: Session,
+):
+    """
+    Get paginated poi list
+
+    Args:
+        gsm (str | None): Search by gsm number
+        is_pinned: bool | None: Return pinned or unpinned poi's or all if none
+        pagination (PaginationParamsType): The pagination details
+        db (Session): The database session
+
+    Returns:
+        (list[rows.POISummaryRow], int): The list of pois and the total length
+    """
+    qs = await get_poi_list_qs(
+        gsm=gsm, is_pinned=is_pinned, pagination=pagination, db=db
     )
 
+    # Paginate
+    results = await get_poi_summaries(qs=qs, pagination=pagination, db=db)
+
     return results, qs.count()
 
 
+async def get_poi_summaries(
+    qs: Query[models.POI], db: Session, pagination: PaginationParamsType | None = None
+):
+    """
+    Get the pois of the qs as summary rows, i.e only the columns of
+    formatters.format_poi_summary
+
+    Args:
+        qs (Query[models.POI]): The filtered and ordered poi qs
+        db (Session): The database session
+        pagination (PaginationParamsType | None): The page to return, None returns
+            all the pois
+
+    Returns:
+        list[rows.POISummaryRow]
+    """
+    qs = qs.with_entities(
+        *[getattr(models.POI, column) for column in POI_SUMMARY_COLUMNS]
+    )
+
+    # Paginate
+    if pagination:
+        page = paginate(qs=qs, page=pagination.page, size=pagination.size)
+    else:
+        page = qs.all()
+
+    # Convictions of the pois, in one query
+    convictions = await get_poi_offense_rows(
+        models.POIOffense.poi_id.in_([row.id for row in page]),
+        ~models.POIOffense.is_deleted,
+        db=db,
+    )
+
+    return [
+        rows.POISummaryRow(
+            id=row.id,
+            full_name=row.full_name,
+            offenses=convictions.get(row.id, []),
+            is_pinned=row.is_pinned,
+            created_at=row.created_at,
+        )
+        for row in page
+    ]
+
+
+async def get_paginated_poi_list_json(
+    gsm: str | None,
+    is_pinned: bool | None,
+    pagination: PaginationParamsType,
+    db: Session,
+):
+    """
+    Get paginated poi list serialized by the database
+
+    NOTE: Postgres only, the items match formatters.format_poi_summary
+
+    Args:
+        gsm (str | None): Search by gsm number
+        is_pinned: bool | None: Return pinned or unpinned poi's or all if none
+        pagination (PaginationParamsType): The pagination details
+        db (Session): The database session
+
+    Returns:
+        (bytes, int, int): The json array of pois, its length and the total length
+    """
+    qs = await get_poi_list_qs(
+        gsm=gsm, is_pinned=is_pinned, pagination=pagination, db=db
+    )
+
+    # Page of pois
+    page = (
+        qs.with_entities(
+            models.POI.id,
+            models.POI.full_name,
+            models.POI.is_pinned,
+            models.POI.created_at,
+        )
+        .limit(pagination.size)
+        .offset(pagination.size * (pagination.page - 1))
+    ).subquery()
+
+    # Convictions of each poi, the deleted ones skipped
+    conv = func.json_build_object(
+        "id",
+        models.POIOffense.id,
+        "offense",
+        func.json_build_object(
+            "id", models.Offense.id, "name", models.Offense.name
+        ),
+        "case_id",
+        models.POIOffense.case_id,
+        "date_convicted",
+        models.POIOffense.date_convicted,
+        "notes",
+        models.POIOffense.notes,
+    )
+    convictions = (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(conv, models.POIOffense.id)),
+                literal_column("'[]'::json"),
+            )
+        )
+        .join(models.Offense, models.Offense.id == models.POIOffense.offense_id)
+        .where(models.POIOffense.poi_id == page.c.id, ~models.POIOffense.is_deleted)
+        .scalar_subquery()
+    )
+
+    obj = func.json_build_object(
+        "id",
+        page.c.id,
+        "full_name",
+        page.c.full_name,
+        "convictions",
+        convictions,
+        "is_pinned",
+        page.c.is_pinned,
+        "created_at",
+        page.c.created_at,
+    )
+
+    return await get_json_page(
+        page=page, obj=obj, order_by=page.c.id, pagination=pagination, qs=qs, db=db
+    )
+
+
+async def get_json_page(
+    page: Subquery,
+    obj: ColumnElement,
+    order_by: ColumnElement,
+    pagination: PaginationParamsType,
+    qs: Query,
+    db: Session,
+):
+    """
+    Aggregate a page of rows into one json array
+
+    Args:
+        page (Subquery): The paginated rows
+        obj (ColumnElement): The json_build_object of a row
+        order_by (ColumnElement): The column the page is ordered by
+        pagination (PaginationParamsType): The pagination details
+        qs (Query): The unpaginated qs, used for the total length
+        db (Session): The database session
+
+    Returns:
+        (bytes, int, int): The json array, its length and the total length
+    """
+    if pagination.order_by == "asc":
+        order_by = order_by.asc()
+    else:
+        order_by = order_by.desc()
+
+    # Cast to text so the driver doesn't parse the json
+    stmt = select(
+        func.coalesce(
+            func.json_agg(aggregate_order_by(obj, order_by)),
+            literal_column("'[]'::json"),
+        ).cast(Text),
+        func.count(),
+    ).select_from(page)
+
+    data, count = db.execute(stmt).one()
+
+    return data.encode(), count, qs.count()
+
+
 async def get_poi_statistics(db: Session):
     """
     Get POI Statistics
@@ -280,7 +603,7 @@ async def get_pinned_pois(db: Session):
         db (Session): The database session
 
     Returns:
-        list[models.POI]
+        list[rows.POISummaryRow]
     """
     # Init crud
     poi_crud = POICRUD(db=db)
@@ -291,18 +614,19 @@ async def get_pinned_pois(db: Session):
     # filter for pinned
     qs = qs.filter_by(is_pinned=True)
 
-    return qs.all()
+    return await get_poi_summaries(qs=qs, db=db)
 
 
-async def get_recently_added_pois(db: Session):
+async def get_recently_added_pois(pagination: PaginationParamsType, db: Session):
     """
-    Get recently added pois
+    Get a page of the recently added pois
 
     Args:
+        pagination (PaginationParamsType): The pagination details
         db (Session): The database session
 
     Returns:
-        list[models.POI]
+        list[rows.POISummaryRow]
     """
     # Init crud
     poi_crud = POICRUD(db=db)
@@ -310,11 +634,11 @@ async def get_recently_added_pois(db: Session):
     # init qs
     qs = cast(Query[models.POI], await poi_crud.get_all(return_qs=True))
 
-    return [
-        obj
-        for obj in qs.order_by(models.POI.id.desc()).all()
-        if not bool(obj.is_deleted)
-    ]
+    # Filter for deleted
+    qs = qs.filter_by(is_deleted=False).order_by(models.POI.id.desc())
+
+    # Paginate in the db, only the page's offenses are loaded
+    return await get_poi_summaries(qs=qs, pagination=pagination, db=db)
 
 
 async def get_poi_by_id(id: int, db: Session, raise_exc: bool = True):
@@ -347,6 +671,92 @@ async def get_poi_by_id(id: int, db: Session, raise_exc: bool = True):
     return obj
 
 
+async def get_poi_dossier(id: int, sections: list[str], db: Session):
+    """
+    Get poi obj with the relationships of the dossier sections loaded
+
+    NOTE: Each section costs one selectin query, deleted child rows are
+    filtered out in SQL
+
+    Args:
+        id (int): The ID of the poi
+        sections (list[str]): The dossier sections to load (see DOSSIER_SECTIONS)
+        db (Session): The database session
+
+    Raises:
+        POINotFound
+
+    Returns:
+        models.POI
+    """
+    # Init loader options, NOT is_deleted matches the partial poi_id indexes
+    # (IS false doesn't)
+    options = [
+        with_loader_criteria(model, ~model.is_deleted)
+        for model in DOSSIER_SOFT_DELETE_MODELS
+    ]
+    for section in sections:
+        options.extend(DOSSIER_SECTIONS[section])
+
+    # Get poi
+    obj = (
+        db.query(models.POI)
+        .options(*options)
+        .filter(models.POI.id == id, models.POI.is_deleted.is_(False))
+        .first()
+    )
+    if not obj:
+        raise POINotFound()
+
+    return obj
+
+
+async def get_poi_version(id: int, db: Session):
+    """
+    Get the poi's version without loading the poi
+
+    Args:
+        id (int): The ID of the poi
+        db (Session): The database session
+
+    Raises:
+        POINotFound
+
+    Returns:
+        int
+    """
+    # Get version
+    row = (
+        db.query(models.POI.version, models.POI.is_deleted)
+        .filter(models.POI.id == id)
+        .first()
+    )
+
+    # Check: poi exists and was not deleted
+    if not row or bool(row.is_deleted):
+        raise POINotFound()
+
+    return int(row.version)
+
+
+async def get_cache_generation(namespace: str, db: Session):
+    """
+    Get the cache generation of a namespace, e.g 'offense'
+
+    Args:
+        namespace (str): The namespace
+        db (Session): The database session
+
+    Returns:
+        int
+    """
+    generation = db.scalar(
+        select(models.CacheGeneration.generation).filter_by(namespace=namespace)
+    )
+
+    return int(generation or 0)
+
+
 async def get_poi_offense_by_id(id: int, db: Session, raise_exc: bool = True):
     """
     Get poi offense by id
@@ -377,23 +787,63 @@ async def get_poi_offense_by_id(id: int, db: Session, raise_exc: bool = True):
     return obj
 
 
-async def get_poi_offenses(poi: models.POI, db: Session):
+async def get_poi_offenses(poi_id: int, db: Session):
     """
     Get POI Offenses
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.POIOffense]
+        list[rows.POIOffenseRow]
     """
-    # Init crud
-    poi_offense_crud = POIOffenseCRUD(db=db)
+    convictions = await get_poi_offense_rows(
+        models.POIOffense.poi_id == poi_id, ~models.POIOffense.is_deleted, db=db
+    )
+
+    return convictions.get(poi_id, [])
 
-    qs = cast(Query[models.POIOffense], await poi_offense_crud.get_all(return_qs=True))
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
+async def get_poi_offense_rows(*criteria: ColumnElement[bool], db: Session):
+    """
+    Get the matching poi offenses, with their offense's name, as rows
+
+    Args:
+        *criteria (ColumnElement[bool]): The filters of the poi offenses, NOT
+            is_deleted (not IS false) matches the partial poi_id index
+        db (Session): The database session
+
+    Returns:
+        dict[int, list[rows.POIOffenseRow]]: The poi offenses of each poi, by id
+    """
+    stmt = (
+        select(
+            models.POIOffense.poi_id,
+            *[getattr(models.POIOffense, column) for column in POI_OFFENSE_COLUMNS],
+            models.Offense.id.label("offense_id"),
+            models.Offense.name.label("offense_name"),
+        )
+        .join(models.Offense, models.Offense.id == models.POIOffense.offense_id)
+        .where(*criteria)
+        .order_by(models.POIOffense.id)
+    )
+
+    convictions: dict[int, list[rows.POIOffenseRow]] = {}
+    for row in db.execute(stmt):
+        convictions.setdefault(row.poi_id, []).append(
+            rows.POIOffenseRow(
+                id=row.id,
+                offense=rows.OffenseSummaryRow(
+                    id=row.offense_id, name=row.offense_name
+                ),
+                case_id=row.case_id,
+                date_convicted=row.date_convicted,
+                notes=row.notes,
+            )
+        )
+
+    return convictions
 
 
 async def get_id_doc_by_id(id: int, db: Session, raise_exc: bool = True):
@@ -423,23 +873,23 @@ async def get_id_doc_by_id(id: int, db: Session, raise_exc: bool = True):
     return obj
 
 
-async def get_id_documents(poi: models.POI, db: Session):
+async def get_id_documents(poi_id: int, db: Session):
     """
     Get POI ID Documents
 
     Args:
-        poi (mdoels.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.IDDocument]
+        list[Row]: The columns of formatters.format_id_document
     """
     # Init crud
     doc_crud = IDDocumentCRUD(db=db)
 
-    qs = cast(Query[models.IDDocument], await doc_crud.get_all(return_qs=True))
-
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
+    return await doc_crud.get_rows(
+        columns=ID_DOCUMENT_COLUMNS, poi_id=poi_id, is_deleted=False
+    )
 
 
 async def get_gsm_by_id(id: int, db: Session, raise_exc: bool = True):
@@ -472,23 +922,23 @@ async def get_gsm_by_id(id: int, db: Session, raise_exc: bool = True):
     return obj
 
 
-async def get_gsm_numbers(poi: models.POI, db: Session):
+async def get_gsm_numbers(poi_id: int, db: Session):
     """
     Get gsm numbers
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.GSMNumber]
+        list[Row]: The columns of formatters.format_gsm
     """
     # Init crud
     gsm_crud = GSMNumberCRUD(db=db)
 
-    qs = cast(Query[models.GSMNumber], await gsm_crud.get_all(return_qs=True))
-
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
+    return await gsm_crud.get_rows(
+        columns=GSM_COLUMNS, poi_id=poi_id, is_deleted=False
+    )
 
 
 async def get_residential_address_by_id(id: int, db: Session, raise_exc: bool = True):
@@ -521,26 +971,24 @@ async def get_residential_address_by_id(id: int, db: Session, raise_exc: bool =
     return obj
 
 
-async def get_residential_addresses(poi: models.POI, db: Session):
+async def get_residential_addresses(poi_id: int, db: Session):
     """
     Get poi residential addresses
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.ResidentialAddress]
+        list[Row]: The columns of formatters.format_residential_address
     """
     # Init crud
     address_crud = ResidentialAddressCRUD(db=db)
 
-    qs = cast(
-        Query[models.ResidentialAddress], await address_crud.get_all(return_qs=True)
+    return await address_crud.get_rows(
+        columns=RESIDENTIAL_ADDRESS_COLUMNS, poi_id=poi_id, is_deleted=False
     )
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
-
 
 async def get_known_associate_by_id(id: int, db: Session, raise_exc: bool = True):
     """
@@ -572,26 +1020,24 @@ async def get_known_associate_by_id(id: int, db: Session, raise_exc: bool = True
     return obj
 
 
-async def get_known_associates(poi: models.POI, db: Session):
+async def get_known_associates(poi_id: int, db: Session):
     """
     Get poi known associates
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.KnownAssociate]
+        list[Row]: The columns of formatters.format_known_associate
     """
     # Init crud
     associate_crud = KnownAssociateCRUD(db=db)
 
-    qs = cast(
-        Query[models.KnownAssociate], await associate_crud.get_all(return_qs=True)
+    return await associate_crud.get_rows(
+        columns=KNOWN_ASSOCIATE_COLUMNS, poi_id=poi_id, is_deleted=False
     )
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
-
 
 async def get_employment_history_by_id(id: int, db: Session, raise_exc: bool = True):
     """
@@ -623,26 +1069,24 @@ async def get_employment_history_by_id(id: int, db: Session, raise_exc: bool = T
     return obj
 
 
-async def get_employment_history(poi: models.POI, db: Session):
+async def get_employment_history(poi_id: int, db: Session):
     """
     Get poi employment history
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.EmploymentHistory]
+        list[Row]: The columns of formatters.format_employment_history
     """
     # Init crud
     history_crud = EmploymentHistoryCRUD(db=db)
 
-    qs = cast(
-        Query[models.EmploymentHistory], await history_crud.get_all(return_qs=True)
+    return await history_crud.get_rows(
+        columns=EMPLOYMENT_HISTORY_COLUMNS, poi_id=poi_id, is_deleted=False
     )
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
-
 
 async def get_veteran_status_by_poi(
     poi: models.POI, db: Session, raise_exc: bool = True
@@ -707,27 +1151,24 @@ async def get_educational_background_by_id(
     return obj
 
 
-async def get_educational_background(poi: models.POI, db: Session):
+async def get_educational_background(poi_id: int, db: Session):
     """
     Get educational background
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.EducationalBackground]
+        list[Row]: The columns of formatters.format_educational_background
     """
     # Init crud
     education_crud = EducationalBackgroundCRUD(db=db)
 
-    qs = cast(
-        Query[models.EducationalBackground],
-        await education_crud.get_all(return_qs=True),
+    return await education_crud.get_rows(
+        columns=EDUCATIONAL_BACKGROUND_COLUMNS, poi_id=poi_id, is_deleted=False
     )
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
-
 
 async def get_frequented_spot_by_id(id: int, db: Session, raise_exc: bool = True):
     """
@@ -759,20 +1200,125 @@ async def get_frequented_spot_by_id(id: int, db: Session, raise_exc: bool = True
     return obj
 
 
-async def get_frequented_spots(poi: models.POI, db: Session):
+async def get_frequented_spots(poi_id: int, db: Session):
     """
     Get poi frequented spots
 
     Args:
-        poi (models.POI): The poi obj
+        poi_id (int): The ID of the poi
         db (Session): The database session
 
     Returns:
-        list[models.FrequentedSpot]
+        list[Row]: The columns of formatters.format_frequented_spot
     """
     # Init crud
     spot_crud = FrequentedSpotCRUD(db=db)
 
-    qs = cast(Query[models.FrequentedSpot], await spot_crud.get_all(return_qs=True))
+    return await spot_crud.get_rows(
+        columns=FREQUENTED_SPOT_COLUMNS, poi_id=poi_id, is_deleted=False
+    )
+
+
+async def get_fingerprint_by_poi(poi: models.POI, db: Session, raise_exc: bool = True):
+    """
+    Get the active fingerprint of a poi
+
+    Args:
+        poi (models.POI): The poi obj
+        db (Session): The database session
+        raise_exc (bool = True): raise a 404 if not found
+
+    Raises:
+        FingerprintNotFound
+
+    Returns:
+        models.Fingerprint | None
+    """
+    # Init crud
+    fingerprint_crud = FingerprintCRUD(db=db)
+
+    # Get obj
+    obj = await fingerprint_crud.get(poi_id=poi.id, is_deleted=False)
+    if not obj and raise_exc:
+        raise FingerprintNotFound()
+
+    return obj
+
+
+async def search_fingerprints(probe: list[Minutia], finger: int | None, db: Session):
+    """
+    Search the enrolled fingerprints for a print (1:N)
+
+    The prints sharing the most minutiae triplet keys with the probe are the
+    candidates, only those are scored, across the matcher's process pool.
+
+    Args:
+        probe (list[Minutia]): The minutiae of the print
+        finger (int | None): The iso finger position, None to search all
+        db (Session): The database session
+
+    Returns:
+        list[dict]: The matches, best first, with the poi, finger and score
+    """
+    # Candidates
+    filters = [models.FingerprintKey.key.in_(triplet_keys(probe, probe=True))]
+    if finger is not None:
+        filters.append(models.FingerprintKey.finger == finger)
+
+    hits = func.count().label("hits")
+    candidates = db.execute(
+        select(
+            models.FingerprintKey.fingerprint_id, models.FingerprintKey.finger, hits
+        )
+        .where(*filters)
+        .group_by(models.FingerprintKey.fingerprint_id, models.FingerprintKey.finger)
+        .having(func.count() >= 2)
+        .order_by(hits.desc())
+        .limit(settings.FINGERPRINT_MAX_CANDIDATES)
+    ).all()
+    if not candidates:
+        return []
+
+    # Templates of the active prints of active pois
+    rows = db.execute(
+        select(
+            models.Fingerprint.id,
+            models.Fingerprint.template,
+            models.POI.id,
+            models.POI.full_name,
+        )
+        .join(models.POI, models.POI.id == models.Fingerprint.poi_id)
+        .where(
+            models.Fingerprint.id.in_({row.fingerprint_id for row in candidates}),
+            models.Fingerprint.is_deleted.is_(False),
+            models.POI.is_deleted.is_(False),
+        )
+    ).all()
+    templates = {row[0]: row[1] for row in rows}
+    pois = {row[0]: (row[2], row[3]) for row in rows}
+
+    # Score
+    scores = await score_in_pool(
+        probe,
+        [
+            (row.fingerprint_id, row.finger, templates[row.fingerprint_id])
+            for row in candidates
+            if row.fingerprint_id in templates
+        ],
+    )
+
+    # Best finger of every poi above the threshold
+    matches: dict[int, dict] = {}
+    for fingerprint_id, candidate_finger, score in scores:
+        poi_id, full_name = pois[fingerprint_id]
+        if score < settings.FINGERPRINT_MATCH_THRESHOLD:
+            continue
+        if poi_id not in matches or matches[poi_id]["score"] < score:
+            matches[poi_id] = {
+                "poi_id": poi_id,
+                "full_name": full_name,
+                "finger": candidate_finger,
+                "score": score,
+            }
 
-    return qs.filter_by(poi_id=poi.id, is_deleted=False)
+    return sorted(matches.values(), key=lambda match: -match["score"])
@@ -2,12 +2,15 @@ import base64
 import binascii
 import os
 import random
+from datetime import datetime
+from typing import Any
 
 import aiofiles
+from sqlalchemy import Column, delete, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.common.exceptions import BadRequest, InternalServerError
-from app.common.utils import dict_to_string
+from app.common.utils import audit_change, created_changes
 from app.core.settings import get_settings
 from app.poi import models, selectors
 from app.poi.crud import (
@@ -23,6 +26,25 @@ from app.poi.crud import (
     ResidentialAddressCRUD,
     VeteranStatusCRUD,
 )
+from app.poi.exceptions import (
+    EducationalBackgroundNotFound,
+    EmploymentHistoryNotFound,
+    FrequentedSpotNotFound,
+    GSMNumberNotFound,
+    IDDocumentNotFound,
+    KnownAssociateNotFound,
+    OffeseNotFound,
+    POINotFound,
+    POIOffenseNotFound,
+    ResidentialAddressNotFound,
+)
+from app.poi.fingerprint import (
+    FINGERS,
+    extract_minutiae,
+    pack_template,
+    triplet_keys,
+    unpack_template,
+)
 from app.poi.schemas import create, edit
 from app.user import models as user_models
 from app.user.services import create_log
@@ -30,6 +52,155 @@ from app.user.services import create_log
 # Global
 settings = get_settings()
 
+# Child tables soft deleted and restored with their poi
+POI_CHILD_MODELS = [
+    *selectors.DOSSIER_SOFT_DELETE_MODELS,
+    models.VeteranStatus,
+    models.Fingerprint,
+]
+
+POIS = models.POI.__table__
+
+# Sections of a new poi created, and logged, as rows of their own
+POI_CREATE_SECTIONS = {
+    "id_documents",
+    "gsm_numbers",
+    "residential_addresses",
+    "known_associates",
+    "employment_history",
+    "veteran_status",
+    "educational_background",
+    "convictions",
+    "frequented_spots",
+    "fingerprints",
+}
+
+
+async def bump_poi_version(poi_id: int | Column[int], db: Session):
+    """
+    Bump the poi's version, invalidating every cached response of the poi
+
+    NOTE: This does not commit, the request's commit saves the new version
+
+    Args:
+        poi_id (int | Column[int]): The ID of the poi
+        db (Session): The database session
+    """
+    db.query(models.POI).filter(models.POI.id == poi_id).update(
+        {models.POI.version: models.POI.version + 1}
+    )
+
+
+async def bump_cache_generation(namespace: str, db: Session):
+    """
+    Bump the cache generation of a namespace, e.g 'offense', invalidating
+    every cached response built with it
+
+    NOTE: This does not commit, the request's commit saves the new generation
+
+    Args:
+        namespace (str): The namespace
+        db (Session): The database session
+    """
+    result = db.execute(
+        update(models.CacheGeneration)
+        .filter_by(namespace=namespace)
+        .values(generation=models.CacheGeneration.generation + 1)
+    )
+
+    # Check: first bump of the namespace
+    if not result.rowcount:
+        db.add(models.CacheGeneration(namespace=namespace, generation=1))
+        db.flush()
+
+
+async def update_poi_row(model, where, values: dict[str, Any], db: Session):
+    """
+    Update a poi's row (not deleted) with one UPDATE ... RETURNING, bumping
+    the poi's version
+
+    On postgres the old values are read (FOR UPDATE) by a CTE and returned
+    along the new row, the version bump is a CTE of the same statement.
+    Other databases can't return the CTE's columns, the old values are read
+    first.
+
+    Args:
+        model: The model of the rows, e.g models.GSMNumber
+        where: The row's filter, e.g models.GSMNumber.id == 1
+        values (dict[str, Any]): The new values
+        db (Session): The database session
+
+    Returns:
+        tuple[Row | None, dict]: The updated row (None when not found) and
+            the changed fields, field -> [old, new]
+    """
+    table = model.__table__
+    old = (
+        select(table.c.id, table.c.poi_id, *(table.c[field] for field in values))
+        .where(where, table.c.is_deleted.is_(False))
+        .with_for_update()
+    )
+    # Nothing to set, the row is still returned
+    stmt = update(table).values(values or {"id": table.c.id})
+
+    if db.get_bind().dialect.name == "postgresql":
+        old = old.cte("old")
+        bump = (
+            update(POIS)
+            .where(POIS.c.id == select(old.c.poi_id).scalar_subquery())
+            .values(version=POIS.c.version + 1, edited_at=datetime.now())
+            .cte("bump")
+        )
+        row = db.execute(
+            stmt.where(table.c.id == old.c.id)
+            .returning(
+                *table.c, *(old.c[field].label(f"old_{field}") for field in values)
+            )
+            .add_cte(bump)
+        ).first()
+        if not row:
+            return None, {}
+
+        old_values = {field: getattr(row, f"old_{field}") for field in values}
+    else:
+        old_row = db.execute(old).first()
+        if not old_row:
+            return None, {}
+
+        row = db.execute(
+            stmt.where(table.c.id == old_row.id).returning(*table.c)
+        ).first()
+        await bump_poi_version(poi_id=row.poi_id, db=db)  # type: ignore
+        old_values = {field: getattr(old_row, field) for field in values}
+
+    changes = {
+        field: audit_change(value, getattr(row, field))
+        for field, value in old_values.items()
+        if value != getattr(row, field)
+    }
+    return row, changes
+
+
+async def delete_poi_row(model, id: int, db: Session):
+    """
+    Soft delete a poi's row, see update_poi_row
+
+    Args:
+        model: The model of the row, e.g models.GSMNumber
+        id (int): The ID of the row
+        db (Session): The database session
+
+    Returns:
+        Row | None: The deleted row, None when not found
+    """
+    row, _ = await update_poi_row(
+        model=model,
+        where=model.id == id,
+        values={"is_deleted": True, "deleted_at": datetime.now()},
+        db=db,
+    )
+    return row
+
 
 async def create_offense(
     user: user_models.User, data: create.CreateOffense, db: Session
@@ -54,17 +225,18 @@ async def create_offense(
     # Transformations
     data.name = data.name.capitalize()
 
-    # Check: unique offense
-    if await offense_crud.get(name=data.name):
+    # Create offense, unless the name is taken
+    created = await offense_crud.upsert(
+        data=[{"name": data.name, "description": data.description}],
+        index_elements=["name"],
+    )
+    if not created:
         raise BadRequest("Offense already exists")
 
-    # Create offense
-    obj = await offense_crud.create(
-        data={
-            "name": data.name,
-            "description": data.description,
-        }
-    )
+    obj = created[0]
+
+    # Invalidate cached offenses
+    await bump_cache_generation(namespace="offense", db=db)
 
     # Create log
     await create_log(
@@ -74,8 +246,6 @@ async def create_offense(
     return obj
 
 
-# NOTE
-# - Add a check to make sure new name is unique
 async def edit_offense(
     user: user_models.User, offense: models.Offense, data: edit.OffenseEdit, db: Session
 ):
@@ -88,32 +258,45 @@ async def edit_offense(
         data (edit.OffenseEdit): The edit data,
         db (Session): The database session
 
+    Raises:
+        BadRequest: Offense already exists
+
     Returns:
         models.Offense
     """
+    # Init CRUD
+    offense_crud = OffenseCRUD(db=db)
 
-    # Init changelog
-    changelog = ""
+    # Init changes
+    changes = {}
 
     # Check: name change
     if bool(offense.name != data.name):
-        changelog += f"- {offense.name} -> {data.name}\n"
+        # Check: the name is unique (ix_offenses_name)
+        existing = await offense_crud.get(name=data.name)
+        if existing and existing.id != offense.id:
+            raise BadRequest("Offense already exists")
+
+        changes["name"] = audit_change(offense.name, data.name)
         offense.name = data.name  # type: ignore
 
     # Check: description change
     if bool(offense.description != data.description):
-        changelog += f"- {offense.description} -> {data.description}"
+        changes["description"] = audit_change(offense.description, data.description)
         offense.description = data.description  # type: ignore
 
     # Save changes
-    db.commit()
+    db.flush()
+
+    # Invalidate cached offenses
+    await bump_cache_generation(namespace="offense", db=db)
 
     # Create logs
     await create_log(
         user=user,
         resource="offense",
         action=f"edit:{offense.id}",
-        notes=changelog if changelog != "" else None,
+        changes=changes,
         db=db,
     )
 
@@ -124,6 +307,9 @@ async def create_poi(user: user_models.User, data: create.POICreate, db: Session
     """
     Create poi
 
+    NOTE: A section that fails raises, the request's rollback drops the poi.
+    The sections skip the poi version bump, nothing of a new poi is cached
+
     Args:
         user (user_models.User): The user obj
         data (create.POIBaseInformationCreate): The poi data
@@ -138,126 +324,117 @@ async def create_poi(user: user_models.User, data: create.POICreate, db: Session
     # Init crud
     poi_crud = POICRUD(db=db)
 
-    # list for del
-    created_objs = []
-
-    try:
-        # Create poi
-        poi = await poi_crud.create(
-            data=create.CreatePOIBaseInformation(**data.model_dump()).model_dump(
-                exclude=["pfp", "id_documents"]  # type: ignore
-            )
+    # Create poi
+    poi = await poi_crud.create(
+        data=create.CreatePOIBaseInformation(**data.model_dump()).model_dump(
+            exclude=["pfp", "id_documents"]  # type: ignore
         )
-        created_objs.append(poi)
+    )
 
-        # Create veteran status
-        created_objs.append(
-            await create_veteran_status(
-                user=user, poi=poi, data=data.veteran_status, db=db
-            )
-        )
+    # Create veteran status
+    await create_veteran_status(
+        user=user, poi=poi, data=data.veteran_status, db=db, bump_version=False
+    )
 
-        # Create file for pfp
-        if data.pfp:
-            # Decode string
-            try:
-                base64_str = data.pfp.split(",", 1)[1]
-                img_data = base64.b64decode(base64_str)
-            except (binascii.Error, Exception):
-                raise BadRequest("Invalid pfp format", loc=["body", "pfp"])
-
-            # Save data to file
-            loc = f"{settings.UPLOAD_DIR}/poi/{poi.id}/pfp/pfp_{random.randint(1, 50)}.jpeg"
-            os.makedirs(os.path.dirname(loc), exist_ok=True)
-
-            async with aiofiles.open(loc, "wb") as file:
-                await file.write(img_data)
-
-            # Set url
-            poi.pfp_url = file.name  # type: ignore
-            db.commit()
-
-        # Create ID documents
-        if data.id_documents:
-            for doc in data.id_documents:
-                created_objs.append(
-                    await create_id_doc(user=user, poi=poi, data=doc, db=db)
-                )
+    # Create file for pfp
+    if data.pfp:
+        # Decode string
+        try:
+            base64_str = data.pfp.split(",", 1)[1]
+            img_data = base64.b64decode(base64_str)
+        except (binascii.Error, Exception):
+            raise BadRequest("Invalid pfp format", loc=["body", "pfp"])
 
-        # Create GSM
-        if data.gsm_numbers:
-            for gsm in data.gsm_numbers:
-                created_objs.append(
-                    await create_gsm_number(user=user, poi=poi, data=gsm, db=db)
-                )
+        # Save data to file
+        loc = f"{settings.UPLOAD_DIR}/poi/{poi.id}/pfp/pfp_{random.randint(1, 50)}.jpeg"
+        os.makedirs(os.path.dirname(loc), exist_ok=True)
 
-        # Create Residential addresses
-        if data.residential_addresses:
-            for address in data.residential_addresses:
-                created_objs.append(
-                    await create_residential_address(
-                        user=user, poi=poi, data=address, db=db
-                    )
-                )
+        async with aiofiles.open(loc, "wb") as file:
+            await file.write(img_data)
 
-        # Create known associates
-        if data.known_associates:
-            for associate in data.known_associates:
-                created_objs.append(
-                    await create_known_associate(
-                        user=user, poi=poi, data=associate, db=db
-                    )
-                )
+        # Set url
+        poi.pfp_url = file.name  # type: ignore
 
-        # Create employment history
-        if data.employment_history:
-            for history in data.employment_history:
-                created_objs.append(
-                    await create_employment_history(
-                        user=user, poi=poi, data=history, db=db
-                    )
-                )
+    # Create ID documents
+    if data.id_documents:
+        for doc in data.id_documents:
+            await create_id_doc(user=user, poi=poi, data=doc, db=db, bump_version=False)
 
-        # Create educational background
-        if data.educational_background:
-            for background in data.educational_background:
-                created_objs.append(
-                    created_objs.append(
-                        await create_educational_background(
-                            user=user, poi=poi, data=background, db=db
-                        )
-                    )
-                )
+    # Create GSM
+    if data.gsm_numbers:
+        for gsm in data.gsm_numbers:
+            await create_gsm_number(
+                user=user, poi=poi, data=gsm, db=db, bump_version=False
+            )
 
-        # Create convictions
-        if data.convictions:
-            for conv in data.convictions:
-                offense = await selectors.get_offense_by_id(id=conv.offense_id, db=db)
-                created_objs.append(
-                    await create_poi_offense(
-                        user=user, poi=poi, offense=offense, data=conv, db=db
-                    )
-                )
+    # Create Residential addresses
+    if data.residential_addresses:
+        for address in data.residential_addresses:
+            await create_residential_address(
+                user=user, poi=poi, data=address, db=db, bump_version=False
+            )
 
-        # Create frequented spots
-        if data.frequented_spots:
-            for spot in data.frequented_spots:
-                created_objs.append(
-                    await create_frequented_spot(user=user, poi=poi, data=spot, db=db)
-                )
-    except Exception as e:
-        for obj in created_objs[::-1]:
-            db.delete(obj)
-        db.commit()
+    # Create known associates
+    if data.known_associates:
+        for associate in data.known_associates:
+            await create_known_associate(
+                user=user, poi=poi, data=associate, db=db, bump_version=False
+            )
 
-        raise e
+    # Create employment history
+    if data.employment_history:
+        for history in data.employment_history:
+            await create_employment_history(
+                user=user, poi=poi, data=history, db=db, bump_version=False
+            )
 
-    # Create logs
+    # Create educational background
+    if data.educational_background:
+        for background in data.educational_background:
+            await create_educational_background(
+                user=user, poi=poi, data=background, db=db, bump_version=False
+            )
+
+    # Create convictions
+    if data.convictions:
+        # The offenses in one query
+        offenses = await OffenseCRUD(db=db).get_many(
+            ids=[conv.offense_id for conv in data.convictions]
+        )
+        offenses = {offense.id: offense for offense in offenses}
+
+        for conv in data.convictions:
+            offense = offenses.get(conv.offense_id)
+            if not offense:
+                raise OffeseNotFound(loc=["body", "convictions"])
+            await create_poi_offense(
+                user=user,
+                poi=poi,
+                offense=offense,
+                data=conv,
+                db=db,
+                bump_version=False,
+            )
+
+    # Create frequented spots
+    if data.frequented_spots:
+        for spot in data.frequented_spots:
+            await create_frequented_spot(
+                user=user, poi=poi, data=spot, db=db, bump_version=False
+            )
+
+    # Create fingerprint
+    if data.fingerprints:
+        await create_fingerprint(
+            user=user, poi=poi, data=data.fingerprints, db=db, bump_version=False
+        )
+
+    # Create logs, the sections are logged as rows of their own
     await create_log(
         user=user,
         resource="poi",
         action=f"create:{poi.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump(exclude=POI_CREATE_SECTIONS)),
         db=db,
     )
 
@@ -287,8 +464,8 @@ async def edit_poi(
     data.full_name = data.full_name.capitalize()
     data.alias = data.alias.capitalize()
 
-    # init changelog
-    changelog = ""
+    # Init changes
+    changes = {}
 
     # edit info
     if data.pfp and not data.pfp.startswith("data:image"):
@@ -297,12 +474,12 @@ async def edit_poi(
     poi_dict = poi.__dict__
     for field, value in data.model_dump(exclude=["pfp"], exclude_none=True).items():  # type: ignore
         if poi_dict[field] and poi_dict[field] != value:
-            changelog += f"- {poi_dict[field]} -> {value}\n"
+            changes[field] = audit_change(poi_dict[field], value)
 
             setattr(poi, field, value)
 
         elif not poi_dict[field] and value:
-            changelog += f"- {poi_dict[field]} -> {value}\n"
+            changes[field] = audit_change(poi_dict[field], value)
 
             setattr(poi, field, value)
 
@@ -323,27 +500,166 @@ async def edit_poi(
 
         # Set url
         poi.pfp_url = file.name  # type: ignore
+        changes["pfp"] = audit_change(None, data.pfp)
+
+    # Bump poi version
+    await bump_poi_version(poi_id=poi.id, db=db)
 
     # Save changes
-    db.commit()
+    db.flush()
 
     # Create logs
     await create_log(
         user=user,
         resource="poi",
-        action=f"create:{poi.id}",
-        notes=await dict_to_string(data.model_dump()),
+        action=f"edit:{poi.id}",
+        changes=changes,
         db=db,
     )
 
     return poi
 
 
+async def delete_pois(user: user_models.User, poi_ids: list[int], db: Session):
+    """
+    Soft delete pois and their child rows
+
+    One set based UPDATE per table in a single transaction. The children
+    get the poi's deleted_at, which tells them apart from the rows deleted
+    on their own when the pois are restored. The deleted rows leave the
+    partial (NOT is_deleted) indexes and the fingerprint search index.
+
+    Args:
+        user (user_models.User): The user obj
+        poi_ids (list[int]): The IDs of the pois
+        db (Session): The database session
+
+    Returns:
+        list[int]: The IDs of the deleted pois, i.e without the pois not
+        found or already deleted
+    """
+    now = datetime.now()
+
+    # Delete the pois, bumping their version
+    deleted_ids = db.scalars(
+        update(models.POI)
+        .where(models.POI.id.in_(poi_ids), models.POI.is_deleted.is_(False))
+        .values(is_deleted=True, deleted_at=now, version=models.POI.version + 1)
+        .returning(models.POI.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not deleted_ids:
+        return []
+
+    # Delete the children
+    for model in POI_CHILD_MODELS:
+        db.execute(
+            update(model)
+            .where(model.poi_id.in_(deleted_ids), model.is_deleted.is_(False))
+            .values(is_deleted=True, deleted_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Drop the prints from the search index
+    db.execute(
+        delete(models.FingerprintKey).where(
+            models.FingerprintKey.fingerprint_id.in_(
+                select(models.Fingerprint.id).where(
+                    models.Fingerprint.poi_id.in_(deleted_ids)
+                )
+            )
+        )
+    )
+
+    # Create logs, in the same transaction
+    db.add_all(
+        [
+            user_models.AuditLog(
+                user_id=user.id, resource="poi", action=f"delete:{poi_id}"
+            )
+            for poi_id in deleted_ids
+        ]
+    )
+    db.flush()
+
+    return list(deleted_ids)
+
+
+async def restore_pois(user: user_models.User, poi_ids: list[int], db: Session):
+    """
+    Restore soft deleted pois and the child rows deleted with them
+
+    Args:
+        user (user_models.User): The user obj
+        poi_ids (list[int]): The IDs of the pois
+        db (Session): The database session
+
+    Returns:
+        list[int]: The IDs of the restored pois
+    """
+    # Restore the children deleted with their poi, before the poi's
+    # deleted_at is cleared
+    for model in POI_CHILD_MODELS:
+        db.execute(
+            update(model)
+            .where(
+                model.poi_id.in_(poi_ids),
+                model.is_deleted.is_(True),
+                model.deleted_at
+                == select(models.POI.deleted_at)
+                .where(models.POI.id == model.poi_id, models.POI.is_deleted.is_(True))
+                .scalar_subquery(),
+            )
+            .values(is_deleted=False, deleted_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Restore the pois, bumping their version
+    restored_ids = db.scalars(
+        update(models.POI)
+        .where(models.POI.id.in_(poi_ids), models.POI.is_deleted.is_(True))
+        .values(is_deleted=False, deleted_at=None, version=models.POI.version + 1)
+        .returning(models.POI.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not restored_ids:
+        return []
+
+    # Put the prints back in the search index
+    await index_fingerprints(
+        fingerprints=db.execute(
+            select(models.Fingerprint.id, models.Fingerprint.template).where(
+                models.Fingerprint.poi_id.in_(restored_ids),
+                models.Fingerprint.is_deleted.is_(False),
+                models.Fingerprint.template.is_not(None),
+            )
+        ).all(),
+        db=db,
+    )
+
+    # Create logs, in the same transaction
+    db.add_all(
+        [
+            user_models.AuditLog(
+                user_id=user.id, resource="poi", action=f"restore:{poi_id}"
+            )
+            for poi_id in restored_ids
+        ]
+    )
+    db.flush()
+
+    return list(restored_ids)
+
+
 ########################################################################
 # ID Document
 ########################################################################
 async def create_id_doc(
-    user: user_models.User, poi: models.POI, data: create.CreateIDDocument, db: Session
+    user: user_models.User,
+    poi: models.POI,
+    data: create.CreateIDDocument,
+    db: Session,
+    bump_version: bool = True,
 ):
     """
     Create ID Doc
@@ -353,6 +669,7 @@ async def create_id_doc(
         poi (models.POI): The poi obj
         data (create.CreateIDDocument): The doc's data
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.IDDocument
@@ -360,6 +677,10 @@ async def create_id_doc(
     # Init crud
     doc_crud = IDDocumentCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     doc = await doc_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
     # Create logs
@@ -367,7 +688,7 @@ async def create_id_doc(
         user=user,
         resource="id-doc",
         action=f"create:{doc.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -375,41 +696,39 @@ async def create_id_doc(
 
 
 async def edit_id_doc(
-    user: user_models.User,
-    doc: models.IDDocument,
-    data: edit.IDDocumentEdit,
-    db: Session,
+    user: user_models.User, doc_id: int, data: edit.IDDocumentEdit, db: Session
 ):
     """
     Edit ID Document
 
     Args:
         user (user_models.User): The user obj
-        doc (models.IDDocument): The id doc obj
-        data (edit.IDDocumentEdit): The doc edit data
+        doc_id (int): The ID of the id doc
+        data (edit.IDDocumentEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        IDDocumentNotFound
+
     Returns:
-        models.IDDocument
+        Row: The id doc's row
     """
-    changelog = ""
-
-    doc_dict = doc.__dict__
-    for field, value in data.model_dump().items():
-        if doc_dict[field] != value:
-            changelog += f"- {doc_dict[field]} -> {value}\n"
-
-            setattr(doc, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit id doc, one UPDATE ... RETURNING
+    doc, changes = await update_poi_row(
+        model=models.IDDocument,
+        where=models.IDDocument.id == doc_id,
+        values=data.model_dump(),
+        db=db,
+    )
+    if not doc:
+        raise IDDocumentNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="iddoc",
         action=f"edit:{doc.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -420,7 +739,11 @@ async def edit_id_doc(
 # GSM NUMBERS
 #################################################
 async def create_gsm_number(
-    user: user_models.User, poi: models.POI, data: create.CreateGSMNumber, db: Session
+    user: user_models.User,
+    poi: models.POI,
+    data: create.CreateGSMNumber,
+    db: Session,
+    bump_version: bool = True,
 ):
     """
     Create gsm number
@@ -430,6 +753,7 @@ async def create_gsm_number(
         poi (models.POI): The poi obj
         data (create.CreateGSMNumber): The details of the gsm number
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.GSMNumber
@@ -437,6 +761,10 @@ async def create_gsm_number(
     # Init crud
     gsm_crud = GSMNumberCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # Create gsm number
     obj = await gsm_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -445,7 +773,7 @@ async def create_gsm_number(
         user=user,
         resource="gsm-number",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -453,43 +781,39 @@ async def create_gsm_number(
 
 
 async def edit_gsm(
-    user: user_models.User, gsm: models.GSMNumber, data: edit.GSMNumberEdit, db: Session
+    user: user_models.User, gsm_id: int, data: edit.GSMNumberEdit, db: Session
 ):
     """
     Edit gsm number
 
     Args:
         user (user_models.User): The user obj
-        gsm (models.GSMNumber): The gsm number obj
-        data (edit.GSMNumberEdit): The details of the gsm number
+        gsm_id (int): The ID of the gsm number
+        data (edit.GSMNumberEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        GSMNumberNotFound
+
     Returns:
-        models.GSMNumber
+        Row: The gsm number's row
     """
-    changelog = ""
-
-    gsm_dict = gsm.__dict__
-    for field, value in data.model_dump(exclude=["pfp"], exclude_none=True).items():  # type: ignore
-        if gsm_dict[field] and gsm_dict[field] != value:
-            changelog += f"- {gsm_dict[field]} -> {value}\n"
-
-            setattr(gsm, field, value)
-
-        elif not gsm_dict[field] and value:
-            changelog += f"- {gsm_dict[field]} -> {value}\n"
-
-            setattr(gsm, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit gsm number, one UPDATE ... RETURNING
+    gsm, changes = await update_poi_row(
+        model=models.GSMNumber,
+        where=models.GSMNumber.id == gsm_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not gsm:
+        raise GSMNumberNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="gsm-number",
         action=f"edit:{gsm.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -504,6 +828,7 @@ async def create_residential_address(
     poi: models.POI,
     data: create.CreateResidentialAddress,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create residential address
@@ -513,6 +838,7 @@ async def create_residential_address(
         poi (models.POI): The poi obj
         data (create.CreateResidentialAddress): The details of the address
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.ResidentialAddress
@@ -520,6 +846,10 @@ async def create_residential_address(
     # Init crud
     address_crud = ResidentialAddressCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # Create address
     obj = await address_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -528,7 +858,7 @@ async def create_residential_address(
         user=user,
         resource="address",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -537,7 +867,7 @@ async def create_residential_address(
 
 async def edit_residential_address(
     user: user_models.User,
-    address: models.ResidentialAddress,
+    address_id: int,
     data: edit.ResidentialAddressEdit,
     db: Session,
 ):
@@ -546,36 +876,32 @@ async def edit_residential_address(
 
     Args:
         user (user_models.User): The user obj
-        address (models.ResidentialAddress): The address obj
-        data (edit.ResidentialAddressEdit): The details of the residential address
+        address_id (int): The ID of the residential address
+        data (edit.ResidentialAddressEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        ResidentialAddressNotFound
+
     Returns:
-        models.ResidentialAddress
+        Row: The residential address's row
     """
-    changelog = ""
-
-    address_dict = address.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if address_dict[field] and address_dict[field] != value:
-            changelog += f"- {address_dict[field]} -> {value}\n"
-
-            setattr(address, field, value)
-
-        elif not address_dict[field] and value:
-            changelog += f"- {address_dict[field]} -> {value}\n"
-
-            setattr(address, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit residential address, one UPDATE ... RETURNING
+    address, changes = await update_poi_row(
+        model=models.ResidentialAddress,
+        where=models.ResidentialAddress.id == address_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not address:
+        raise ResidentialAddressNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="residential-address",
         action=f"edit:{address.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -590,6 +916,7 @@ async def create_known_associate(
     poi: models.POI,
     data: create.CreateKnownAssociate,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create known associate
@@ -599,6 +926,7 @@ async def create_known_associate(
         poi (models.POI): The poi obj
         data (create.CreateKnownAssociate): The associate's details
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.KnownAssociate
@@ -606,6 +934,10 @@ async def create_known_associate(
     # Init crud
     associate_crud = KnownAssociateCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # Create known associates
     obj = await associate_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -614,7 +946,7 @@ async def create_known_associate(
         user=user,
         resource="known-associates",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -623,7 +955,7 @@ async def create_known_associate(
 
 async def edit_known_associate(
     user: user_models.User,
-    associate: models.KnownAssociate,
+    associate_id: int,
     data: edit.KnownAssociateEdit,
     db: Session,
 ):
@@ -632,35 +964,32 @@ async def edit_known_associate(
 
     Args:
         user (user_models.User): The user obj
-        associate (models.KnownAssociate): The associate obj
-        data (edit.KnownAssociateEdit): The details of the known associate
+        associate_id (int): The ID of the known associate
+        data (edit.KnownAssociateEdit): The edit data
         db (Session): The database session
 
-    Return:
-        models.KnownAssociate
-    """
-    changelog = ""
-
-    address_dict = associate.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if address_dict[field] and address_dict[field] != value:
-            changelog += f"- {address_dict[field]} -> {value}\n"
-
-            setattr(associate, field, value)
-        elif not address_dict[field] and value:
-            changelog += f"- {address_dict[field]} -> {value}\n"
-
-            setattr(associate, field, value)
+    Raises:
+        KnownAssociateNotFound
 
-    # Save changes
-    db.commit()
+    Returns:
+        Row: The known associate's row
+    """
+    # Edit known associate, one UPDATE ... RETURNING
+    associate, changes = await update_poi_row(
+        model=models.KnownAssociate,
+        where=models.KnownAssociate.id == associate_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not associate:
+        raise KnownAssociateNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="known-associate",
         action=f"edit:{associate.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -677,6 +1006,7 @@ async def create_employment_history(
     poi: models.POI,
     data: create.CreateEmploymentHistory,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create employment history
@@ -686,6 +1016,7 @@ async def create_employment_history(
         poi (models.POI): The poi obj
         data (create.CreateEmploymentHistory): The poi's employment history
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.EmploymentHistory
@@ -693,6 +1024,10 @@ async def create_employment_history(
     # Init crud
     employment_crud = EmploymentHistoryCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # create obj
     obj = await employment_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -701,7 +1036,7 @@ async def create_employment_history(
         user=user,
         resource="employment-history",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -710,7 +1045,7 @@ async def create_employment_history(
 
 async def edit_employment_history(
     user: user_models.User,
-    history: models.EmploymentHistory,
+    history_id: int,
     data: edit.EmploymentHistoryEdit,
     db: Session,
 ):
@@ -719,36 +1054,32 @@ async def edit_employment_history(
 
     Args:
         user (user_models.User): The user obj
-        history (models.EmploymentHistory): The history obj
-        data (edit.EmploymentHistoryEdit): The details of the employment history
+        history_id (int): The ID of the employment history
+        data (edit.EmploymentHistoryEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        EmploymentHistoryNotFound
+
     Returns:
-        models.EmploymentHistory
+        Row: The employment history's row
     """
-    changelog = ""
-
-    history_dict = history.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if history_dict[field] and history_dict[field] != value:
-            changelog += f"- {history_dict[field]} -> {value}\n"
-
-            setattr(history, field, value)
-
-        elif not history_dict[field] and value:
-            changelog += f"- {history_dict[field]} -> {value}\n"
-
-            setattr(history, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit employment history, one UPDATE ... RETURNING
+    history, changes = await update_poi_row(
+        model=models.EmploymentHistory,
+        where=models.EmploymentHistory.id == history_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not history:
+        raise EmploymentHistoryNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="employment-history",
         action=f"edit:{history.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -765,6 +1096,7 @@ async def create_veteran_status(
     poi: models.POI,
     data: create.CreateVeteranStatus,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create veteran status
@@ -774,6 +1106,7 @@ async def create_veteran_status(
         poi (models.POI): The poi obj
         data (create.CreateVeteranStatus): The veteran status details
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.VeteranStatus
@@ -788,6 +1121,10 @@ async def create_veteran_status(
             loc="app.poi.services.create_veteran_status",
         )
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # Create obj
     obj = await veteran_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -796,7 +1133,7 @@ async def create_veteran_status(
         user=user,
         resource="veteran-status",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -804,46 +1141,42 @@ async def create_veteran_status(
 
 
 async def edit_veteran_status(
-    user: user_models.User,
-    status: models.VeteranStatus,
-    data: edit.VeteranStatusEdit,
-    db: Session,
+    user: user_models.User, poi_id: int, data: edit.VeteranStatusEdit, db: Session
 ):
     """
     Edit veteran status
 
     Args:
         user (user_models.User): The user obj
-        status (models.VeteranStatus): The poi obj
+        poi_id (int): The ID of the poi
         data (edit.VeteranStatusEdit): The details of the veteran status
         db (Session): The database session
 
+    Raises:
+        POINotFound
+
     Returns:
-        models.VeteranStatus
+        Row: The veteran status' row
     """
-    changelog = ""
-
-    status_dict = status.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if status_dict[field] and status_dict[field] != value:
-            changelog += f"- {status_dict[field]} -> {value}\n"
-
-            setattr(status, field, value)
-
-        elif not status_dict[field] and value:
-            changelog += f"- {status_dict[field]} -> {value}\n"
-
-            setattr(status, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit veteran status, one UPDATE ... RETURNING
+    status, changes = await update_poi_row(
+        model=models.VeteranStatus,
+        where=(models.VeteranStatus.poi_id == poi_id)
+        & select(models.POI.id)
+        .where(models.POI.id == poi_id, models.POI.is_deleted.is_(False))
+        .exists(),
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not status:
+        raise POINotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="veteran-status",
         action=f"edit:{status.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -858,6 +1191,7 @@ async def create_educational_background(
     poi: models.POI,
     data: create.CreateEducationalBackground,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create educational background
@@ -867,6 +1201,7 @@ async def create_educational_background(
         poi (models.POI): The poi obj
         data (create.CreateEducationalBackground): The details of the educational background
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.EducationalBackground
@@ -874,6 +1209,10 @@ async def create_educational_background(
     # Init crud
     background_crud = EducationalBackgroundCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # create educatonal background
     obj = await background_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -882,7 +1221,7 @@ async def create_educational_background(
         user=user,
         resource="veteran-status",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
     return obj
@@ -890,7 +1229,7 @@ async def create_educational_background(
 
 async def edit_educational_background(
     user: user_models.User,
-    education: models.EducationalBackground,
+    education_id: int,
     data: edit.EducationalBackgroundEdit,
     db: Session,
 ):
@@ -899,36 +1238,32 @@ async def edit_educational_background(
 
     Args:
         user (user_models.User): The user obj
-        education (models.EducationalBackground): The educational background obj
-        data (edit.EducationalBackgroundEdit): The details of the educational background
+        education_id (int): The ID of the educational background
+        data (edit.EducationalBackgroundEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        EducationalBackgroundNotFound
+
     Returns:
-        models.EducationalBackground
+        Row: The educational background's row
     """
-    changelog = ""
-
-    education_dict = education.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if education_dict[field] and education_dict[field] != value:
-            changelog += f"- {education_dict[field]} -> {value}\n"
-
-            setattr(education, field, value)
-
-        elif not education_dict[field] and value:
-            changelog += f"- {education_dict[field]} -> {value}\n"
-
-            setattr(education, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit educational background, one UPDATE ... RETURNING
+    education, changes = await update_poi_row(
+        model=models.EducationalBackground,
+        where=models.EducationalBackground.id == education_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not education:
+        raise EducationalBackgroundNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="educational-background",
         action=f"edit:{education.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -944,6 +1279,7 @@ async def create_poi_offense(
     offense: models.Offense,
     data: create.POIOffenseCreate,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create poi offense
@@ -954,6 +1290,7 @@ async def create_poi_offense(
         offense (models.Offense): The offense obj
         data (create.POIOffenseCreate): The details of the conviction
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.POIOffense
@@ -961,6 +1298,10 @@ async def create_poi_offense(
     # Init crud
     poi_offense_crud = POIOffenseCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # create conviction
     obj = await poi_offense_crud.create(
         data={"poi_id": poi.id, "offense_id": offense.id, **data.model_dump()}
@@ -971,7 +1312,7 @@ async def create_poi_offense(
         user=user,
         resource="poi-offense",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -979,46 +1320,39 @@ async def create_poi_offense(
 
 
 async def edit_poi_offense(
-    user: user_models.User,
-    poi_offense: models.POIOffense,
-    data: edit.POIOffenseEdit,
-    db: Session,
+    user: user_models.User, poi_offense_id: int, data: edit.POIOffenseEdit, db: Session
 ):
     """
     Edit poi offense
 
     Args:
         user (user_models.User): The user obj
-        poi_offense (models.POIOffense): The poi offense obj
-        data (edit.POIOffenseEdit): The details of the poi
+        poi_offense_id (int): The ID of the poi offense
+        data (edit.POIOffenseEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        POIOffenseNotFound
+
     Returns:
-        models.POIOffense
+        Row: The poi offense's row
     """
-    changelog = ""
-
-    poi_offense_dict = poi_offense.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if poi_offense_dict[field] and poi_offense_dict[field] != value:
-            changelog += f"- {poi_offense_dict[field]} -> {value}\n"
-
-            setattr(poi_offense, field, value)
-
-        elif not poi_offense_dict[field] and value:
-            changelog += f"- {poi_offense_dict[field]} -> {value}\n"
-
-            setattr(poi_offense, field, value)
-
-    # Save changes
-    db.commit()
+    # Edit poi offense, one UPDATE ... RETURNING
+    poi_offense, changes = await update_poi_row(
+        model=models.POIOffense,
+        where=models.POIOffense.id == poi_offense_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not poi_offense:
+        raise POIOffenseNotFound()
 
     # Create logs
     await create_log(
         user=user,
         resource="poi-offense",
         action=f"edit:{poi_offense.id}",
-        notes=changelog,
+        changes=changes,
         db=db,
     )
 
@@ -1033,6 +1367,7 @@ async def create_frequented_spot(
     poi: models.POI,
     data: create.CreateFrequentedSpot,
     db: Session,
+    bump_version: bool = True,
 ):
     """
     Create frequented spot
@@ -1042,6 +1377,7 @@ async def create_frequented_spot(
         poi (models.POI): The poi obj
         data (create.CreatedFrequentedSpot): The spot details
         db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
     Returns:
         models.FrequentedSpot
@@ -1049,6 +1385,10 @@ async def create_frequented_spot(
     # Init crud
     spot_crud = FrequentedSpotCRUD(db=db)
 
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
     # create spot
     obj = await spot_crud.create(data={"poi_id": poi.id, **data.model_dump()})
 
@@ -1057,7 +1397,7 @@ async def create_frequented_spot(
         user=user,
         resource="frequented-spot",
         action=f"create:{obj.id}",
-        notes=await dict_to_string(data.model_dump()),
+        changes=created_changes(data.model_dump()),
         db=db,
     )
 
@@ -1065,46 +1405,132 @@ async def create_frequented_spot(
 
 
 async def edit_frequented_spot(
-    user: user_models.User,
-    spot: models.FrequentedSpot,
-    data: edit.FrequentedSpotEdit,
-    db: Session,
+    user: user_models.User, spot_id: int, data: edit.FrequentedSpotEdit, db: Session
 ):
     """
     Edit frequented spot
 
     Args:
         user (user_models.User): The user obj
-        spot (models.FrequentedSpot): The frequented spot obj
-        data (edit.FrequentedSpotEdit): The details of the frequented spot
+        spot_id (int): The ID of the frequented spot
+        data (edit.FrequentedSpotEdit): The edit data
         db (Session): The database session
 
+    Raises:
+        FrequentedSpotNotFound
+
     Returns:
-        models.FrequentedSpot
+        Row: The frequented spot's row
+    """
+    # Edit frequented spot, one UPDATE ... RETURNING
+    spot, changes = await update_poi_row(
+        model=models.FrequentedSpot,
+        where=models.FrequentedSpot.id == spot_id,
+        values=data.model_dump(exclude_none=True),
+        db=db,
+    )
+    if not spot:
+        raise FrequentedSpotNotFound()
+
+    # Create logs
+    await create_log(
+        user=user,
+        resource="frequented-spot",
+        action=f"edit:{spot.id}",
+        changes=changes,
+        db=db,
+    )
+
+    return spot
+
+
+async def create_fingerprint(
+    user: user_models.User,
+    poi: models.POI,
+    data: create.CreateFingerprint,
+    db: Session,
+    bump_version: bool = True,
+):
     """
-    changelog = ""
+    Create (enroll) the poi's fingerprint, replacing the current one
 
-    spot_dict = spot.__dict__
-    for field, value in data.model_dump(exclude_none=True).items():  # type: ignore
-        if spot_dict[field] and spot_dict[field] != value:
-            changelog += f"- {spot_dict[field]} -> {value}\n"
+    Args:
+        user (user_models.User): The user obj
+        poi (models.POI): The poi obj
+        data (create.CreateFingerprint): The minutiae records of the fingers
+        db (Session): The database session
+        bump_version (bool = True): Bump the poi version
 
-            setattr(spot, field, value)
-        elif not spot_dict[field] and value:
-            changelog += f"- {spot_dict[field]} -> {value}\n"
+    Raises:
+        BadRequest: Invalid minutiae record
 
-            setattr(spot, field, value)
+    Returns:
+        models.Fingerprint
+    """
+    # Extract the minutiae
+    views = []
+    for name, finger in FINGERS.items():
+        try:
+            views.append((finger, extract_minutiae(getattr(data, name))))
+        except ValueError as e:
+            raise BadRequest(str(e), loc=["body", name])
+
+    # Replace the current fingerprint, dropping it from the index
+    current = await selectors.get_fingerprint_by_poi(poi=poi, db=db, raise_exc=False)
+    if current:
+        current.is_deleted = True  # type: ignore
+        current.deleted_at = datetime.now()  # type: ignore
+        db.execute(
+            delete(models.FingerprintKey).where(
+                models.FingerprintKey.fingerprint_id == current.id
+            )
+        )
 
-    # Save changes
-    db.commit()
+    # Bump poi version
+    if bump_version:
+        await bump_poi_version(poi_id=poi.id, db=db)
+
+    # Create fingerprint
+    obj = models.Fingerprint(
+        poi_id=poi.id, template=pack_template(views), **data.model_dump()
+    )
+    db.add(obj)
+    db.flush()
+
+    # Index the minutiae triplets
+    await index_fingerprints(fingerprints=[(obj.id, obj.template)], db=db)
 
     # Create logs
     await create_log(
         user=user,
-        resource="frequented-spot",
-        action=f"edit:{spot.id}",
-        notes=changelog,
+        resource="fingerprint",
+        action=f"create:{obj.id}",
+        notes=", ".join(
+            f"{name}: {len(minutiae)} minutiae"
+            for name, (_, minutiae) in zip(FINGERS, views)
+        ),
         db=db,
     )
 
-    return spot
+    return obj
+
+
+async def index_fingerprints(fingerprints: list, db: Session):
+    """
+    Add the minutiae triplets of fingerprints to the search index
+
+    NOTE: This does not commit
+
+    Args:
+        fingerprints (list[tuple[int, bytes]]): The ID and template of every
+            fingerprint
+        db (Session): The database session
+    """
+    rows = [
+        {"key": key, "fingerprint_id": fingerprint_id, "finger": finger}
+        for fingerprint_id, template in fingerprints
+        for finger, minutiae in unpack_template(template).items()
+        for key in triplet_keys(minutiae)
+    ]
+    if rows:
+        db.execute(insert(models.FingerprintKey), rows)
@@ -5,3 +5,4 @@ from fastapi import Depends
 from app.user import models, security
 
 CurrentUser = Annotated[models.User, Depends(security.get_current_user)]
+CurrentSupervisor = Annotated[models.User, Depends(security.get_current_supervisor)]
@@ -1,9 +1,7 @@
 from fastapi import APIRouter, status
 
 from app.common.annotations import DatabaseSession, PaginationParams
-from app.common.auth import TokenGenerator
-from app.common.utils import paginate_list
-from app.core.settings import get_settings
+from app.common.auth import get_token_generator
 from app.poi import selectors as poi_selectors
 from app.poi.formatters import format_poi_summary
 from app.user import services
@@ -13,13 +11,6 @@ from app.user.schemas import base, response
 router = APIRouter()
 
 
-# Globals
-settings = get_settings()
-token_generator = TokenGenerator(
-    secret_key=settings.SECRET_KEY, expire_in=settings.ACCESS_TOKEN_EXPIRE_MIN
-)
-
-
 @router.post(
     "/login",
     summary="Login User",
@@ -38,7 +29,7 @@ async def route_user_login(
     user = await services.login_user(credential=credentials_in, db=db)
 
     # Generate access token
-    token = await token_generator.generate(sub=f"USER-{user.badge_num}")
+    token = await get_token_generator().generate(sub=f"USER-{user.badge_num}")
 
     return {"data": {"token": token}}
 
@@ -66,10 +57,8 @@ async def route_user_dashboard(
             ],
             "recently_added_pois": [
                 await format_poi_summary(poi=poi)
-                for poi in paginate_list(
-                    items=await poi_selectors.get_recently_added_pois(db=db),
-                    page=pagination.page,
-                    size=pagination.size,
+                for poi in await poi_selectors.get_recently_added_pois(
+                    pagination=pagination, db=db
                 )
             ],
         }
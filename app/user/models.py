@@ -1,6 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.core.database import DBBase
 
@@ -15,6 +26,8 @@ class User(DBBase):
     id = Column(Integer, primary_key=True, autoincrement=True)
     badge_num = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
+    # Supervisors review the audit logs
+    is_supervisor = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), default=datetime.now(), nullable=False)
 
 
@@ -24,21 +37,32 @@ class LoginAttempt(DBBase):
     """
 
     __tablename__ = "login_attempts"
+    __table_args__ = (
+        Index("ix_login_attempts_badge_num_attempted_at", "badge_num", "attempted_at"),
+        Index("ix_login_attempts_attempted_at", "attempted_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     badge_num = Column(String, nullable=False)
     is_success = Column(Boolean, default=False, nullable=False)
-    attempted_at = Column(
-        DateTime(timezone=True), default=datetime.now(), nullable=False
-    )
+    attempted_at = Column(DateTime(timezone=True), default=datetime.now, nullable=False)
 
 
 class AuditLog(DBBase):
     """
     Database model for audit logs
+
+    Monthly range partitions on created_at in postgres (primary key
+    (id, created_at)), created and dropped by app.core.retention
     """
 
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_audit_logs_created_at", "created_at", postgresql_using="brin"),
+        # Keyset pagination of the audit log list
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(
@@ -47,4 +71,11 @@ class AuditLog(DBBase):
     resource = Column(String, nullable=False)
     action = Column(String, nullable=False)
     notes = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.now(), nullable=False)
+    # Field -> [old, new], compressed into changes_zlib when large, see
+    # app.common.utils.pack_changes
+    changes = Column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"),
+        nullable=True,
+    )
+    changes_zlib = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.now, nullable=False)
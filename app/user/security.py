@@ -1,17 +1,10 @@
 from fastapi import Depends, Header
 from sqlalchemy.orm import Session
 
-from app.common.auth import TokenGenerator
+from app.common.auth import get_token_generator
 from app.common.dependencies import get_session
-from app.common.exceptions import Unauthorized
-from app.core.settings import get_settings
-from app.user import selectors
-
-# Globals
-settings = get_settings()
-token_generator = TokenGenerator(
-    secret_key=settings.SECRET_KEY, expire_in=settings.ACCESS_TOKEN_EXPIRE_MIN
-)
+from app.common.exceptions import Forbidden, Unauthorized
+from app.user import models, selectors
 
 
 async def get_current_user(
@@ -36,9 +29,29 @@ async def get_current_user(
     if token_type != "Bearer":
         raise Unauthorized("Invalid Token")
 
-    badge_num = await token_generator.verify(sub_head="USER", token=token)
+    badge_num = await get_token_generator().verify(sub_head="USER", token=token)
 
     if user := await selectors.get_user(badge_num=badge_num, db=db, raise_exc=False):
         return user
 
     raise Unauthorized("Invalid Token")
+
+
+async def get_current_supervisor(user: models.User = Depends(get_current_user)):
+    """
+    This function returns the current logged in user if they're a supervisor
+    (granted with python -m app.user.supervisor)
+
+    Args:
+        user (models.User): The current user
+
+    Raises:
+        Forbidden
+
+    Returns:
+        models.User: The current supervisor
+    """
+    if not user.is_supervisor:
+        raise Forbidden("Only supervisors can access this resource")
+
+    return user
@@ -2,6 +2,7 @@ from sqlalchemy import Column
 from sqlalchemy.orm import Session
 
 from app.common.exceptions import Unauthorized
+from app.common.utils import audit_change, pack_changes
 from app.common.security import verify_password
 from app.core.settings import get_settings
 from app.user import models
@@ -18,6 +19,7 @@ async def create_log(
     action: str,
     db: Session,
     notes: str | Column[str] | None = None,
+    changes: dict | None = None,
 ):
     """
     Create audit log
@@ -27,6 +29,7 @@ async def create_log(
         resource (str): The resource
         action (str): The action
         notes (str | Column[str] | None): The notes
+        changes (dict | None): The changed fields, field -> [old, new]
         db (Session): The database session
 
     Returns:
@@ -35,6 +38,9 @@ async def create_log(
     # Init crud
     audit_crud = AuditLogCRUD(db=db)
 
+    # Large changes are compressed
+    changes, changes_zlib = pack_changes(changes, settings.AUDIT_COMPRESS_MIN_BYTES)
+
     # Create log
     log = await audit_crud.create(
         data={
@@ -42,6 +48,8 @@ async def create_log(
             "resource": resource,
             "action": action,
             "notes": notes if bool(notes) else None,
+            "changes": changes,
+            "changes_zlib": changes_zlib,
         }
     )
 
@@ -68,17 +76,48 @@ async def login_user(credential: base.UserLoginCredential, db: Session):
     # Create Login Attempt
     login_attempt = await attempt_crud.create(data={"badge_num": credential.badge_num})
 
-    # Get user obj
+    # Get user obj, verify password
     obj = await user_crud.get(badge_num=credential.badge_num)
-    if not obj:
-        raise Unauthorized("Invalid Login Credentials")
-
-    # Verify password
-    if not await verify_password(raw=credential.password, hashed=obj.password):
+    if not obj or not await verify_password(
+        raw=credential.password, hashed=obj.password
+    ):
+        # Keep the failed attempt, the error rolls the request back
+        db.commit()
         raise Unauthorized("Invalid Login Credentials")
 
     # Update login attempt
     login_attempt.is_success = True  # type: ignore
-    db.commit()
 
     return obj
+
+
+async def set_supervisor(user: models.User, is_supervisor: bool, db: Session):
+    """
+    Grant or revoke the user's supervisor role (the audit log API)
+
+    Args:
+        user (models.User): The user obj
+        is_supervisor (bool): Grant if True, revoke if False
+        db (Session): The database session
+
+    Returns:
+        models.User
+    """
+    # Check: no change
+    if bool(user.is_supervisor) == is_supervisor:
+        return user
+
+    changes = {"is_supervisor": audit_change(bool(user.is_supervisor), is_supervisor)}
+    user.is_supervisor = is_supervisor  # type: ignore
+    db.flush()
+
+    # Create log
+    await create_log(
+        user=user,
+        resource="user",
+        action=f"{'grant' if is_supervisor else 'revoke'}-supervisor:{user.id}",
+        changes=changes,
+        db=db,
+    )
+
+    return user
@@ -0,0 +1,63 @@
+"""
+Grant or revoke the supervisor role, i.e the access to the audit log API
+(/audit). There is no route for it: supervisors can read every user's
+activity, the role is given by an operator with access to the database.
+
+The change is written to the audit log, under the changed user.
+
+Usage:
+    python -m app.user.supervisor BADGE_NUM [BADGE_NUM ...]
+    python -m app.user.supervisor BADGE_NUM --revoke
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.database import SessionLocal
+from app.user import selectors, services
+
+
+async def set_supervisors(badge_nums: list[str], is_supervisor: bool):
+    """
+    Set the role of the users, in one transaction
+
+    Returns:
+        list[str]: The badge nums without a user, nothing is changed if any
+    """
+    with SessionLocal() as db:
+        users = [
+            await selectors.get_user(badge_num=badge_num, db=db, raise_exc=False)
+            for badge_num in badge_nums
+        ]
+
+        # Check: every user exists
+        missing = [num for num, user in zip(badge_nums, users) if not user]
+        if missing:
+            return missing
+
+        for user in users:
+            await services.set_supervisor(user=user, is_supervisor=is_supervisor, db=db)
+        db.commit()
+
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("badge_nums", nargs="+")
+    parser.add_argument("--revoke", action="store_true")
+    args = parser.parse_args()
+
+    missing = asyncio.run(set_supervisors(args.badge_nums, not args.revoke))
+    if missing:
+        print(f"No user with the badge num: {', '.join(missing)}")
+        return 1
+
+    role = "revoked" if args.revoke else "granted"
+    print(f"Supervisor {role}: {', '.join(args.badge_nums)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""
+1:N fingerprint search at scale
+
+Enrolls --pois synthetic pois with four fingers each, then searches fresh
+impressions of enrolled fingers through selectors.search_fingerprints and
+reports the search latency (total and scoring), the candidates scored, the
+rank 1 identification rate, the false matches of prints that are not
+enrolled, and the cost of scoring every enrolled print instead (brute force,
+estimated from a sample).
+
+A synthetic finger has 30-50 minutiae at least 12 px apart on a 400x500 px
+(500 dpi) image. An impression of it is rotated by up to 20 degrees, shifted
+by up to 30 px, every minutia is jittered (2.5 px, 6 degrees), 15% are
+dropped and 5 spurious ones are added. Everything runs on the CPU.
+
+The pois are named fp-bench-<n> and a run only enrolls the missing ones, so
+the 100k enrollment is paid once per database.
+
+Usage:
+    python -m benchmarks.fingerprint --pois 100000 --probes 200
+    python -m benchmarks.fingerprint --pois 10000 --workers 4
+"""
+
+import argparse
+import asyncio
+import base64
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal
+from app.core.settings import get_settings
+from app.poi import models, selectors
+from app.poi.fingerprint import (
+    FINGERS,
+    Minutia,
+    encode_iso_record,
+    match_score,
+    pack_template,
+    triplet_keys,
+    unpack_template,
+)
+
+# Globals
+BATCH_SIZE = 500
+NAME_PREFIX = "fp-bench-"
+WIDTH, HEIGHT = 400, 500
+
+
+def synthetic_finger(rng: random.Random):
+    """
+    Get the minutiae of a synthetic finger, in exact coordinates
+    """
+    minutiae: list[tuple[float, float, float, int]] = []
+    count = rng.randint(30, 50)
+    while len(minutiae) < count:
+        x, y = rng.uniform(20, WIDTH - 20), rng.uniform(20, HEIGHT - 20)
+        if all((x - mx) ** 2 + (y - my) ** 2 >= 144 for mx, my, _, _ in minutiae):
+            minutiae.append((x, y, rng.uniform(0, 2 * math.pi), rng.choice((1, 2))))
+
+    return minutiae
+
+
+def impression(finger: list, rng: random.Random):
+    """
+    Get the minutiae of an impression of a synthetic finger
+
+    Returns:
+        list[Minutia]
+    """
+    rotation = math.radians(rng.uniform(-20, 20))
+    dx, dy = rng.uniform(-30, 30), rng.uniform(-30, 30)
+    cos, sin = math.cos(rotation), math.sin(rotation)
+
+    minutiae = []
+    for x, y, angle, kind in finger:
+        if rng.random() < 0.15:
+            continue
+
+        # Rotate around the image centre, shift and jitter
+        cx, cy = x - WIDTH / 2, y - HEIGHT / 2
+        x = cx * cos - cy * sin + WIDTH / 2 + dx + rng.gauss(0, 2.5)
+        y = cx * sin + cy * cos + HEIGHT / 2 + dy + rng.gauss(0, 2.5)
+        if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+            continue
+        angle = (angle + rotation + math.radians(rng.gauss(0, 6))) % (2 * math.pi)
+        minutiae.append(
+            Minutia(round(x), round(y), round(angle / (2 * math.pi) * 256) % 256, kind)
+        )
+
+    for _ in range(5):
+        minutiae.append(
+            Minutia(
+                rng.randrange(WIDTH),
+                rng.randrange(HEIGHT),
+                rng.randrange(256),
+                rng.choice((1, 2)),
+            )
+        )
+
+    return minutiae
+
+
+def synthetic_pois(seed: int, number: int):
+    """
+    Get the four synthetic fingers of the numbered poi, deterministically
+    """
+    rng = random.Random(f"{seed}-{number}")
+    return {finger: synthetic_finger(rng) for finger in FINGERS.values()}
+
+
+def enrollment_rows(task: tuple[int, int]):
+    """
+    Build the fingerprint row and index keys of the numbered poi
+    """
+    seed, number = task
+    rng = random.Random(f"{seed}-{number}-enroll")
+
+    views, records = [], {}
+    fingers = synthetic_pois(seed, number)
+    for name, (finger, minutiae) in zip(FINGERS, fingers.items()):
+        enrolled = impression(minutiae, rng)
+        views.append((finger, enrolled))
+        records[name] = base64.b64encode(encode_iso_record(enrolled, finger)).decode()
+
+    keys = [
+        (finger, key) for finger, enrolled in views for key in triplet_keys(enrolled)
+    ]
+
+    return number, records, pack_template(views), keys
+
+
+def enroll(args: argparse.Namespace):
+    """
+    Enroll the missing synthetic pois
+
+    Returns:
+        dict[int, int]: poi number -> poi id
+    """
+    with SessionLocal() as db:
+        pois = {
+            int(name.removeprefix(NAME_PREFIX)): poi_id
+            for poi_id, name in db.execute(
+                select(models.POI.id, models.POI.full_name).where(
+                    models.POI.full_name.startswith(NAME_PREFIX)
+                )
+            )
+        }
+    missing = [number for number in range(args.pois) if number not in pois]
+    if not missing:
+        return pois
+
+    print(f"Enrolling {len(missing)} pois...")
+    start = time.perf_counter()
+    with multiprocessing.Pool() as pool, SessionLocal() as db:
+        rows = pool.imap(
+            enrollment_rows, [(args.seed, number) for number in missing], chunksize=64
+        )
+        for done in range(0, len(missing), BATCH_SIZE):
+            batch = [next(rows) for _ in range(min(BATCH_SIZE, len(missing) - done))]
+
+            poi_ids = db.scalars(
+                insert(models.POI).returning(
+                    models.POI.id, sort_by_parameter_order=True
+                ),
+                [
+                    {"full_name": f"{NAME_PREFIX}{number}", "alias": "benchmark"}
+                    for number, *_ in batch
+                ],
+            ).all()
+            fingerprint_ids = db.scalars(
+                insert(models.Fingerprint).returning(
+                    models.Fingerprint.id, sort_by_parameter_order=True
+                ),
+                [
+                    {"poi_id": poi_id, "template": template, **records}
+                    for poi_id, (_, records, template, _) in zip(poi_ids, batch)
+                ],
+            ).all()
+            db.execute(
+                insert(models.FingerprintKey),
+                [
+                    {"key": key, "fingerprint_id": fingerprint_id, "finger": finger}
+                    for fingerprint_id, (*_, keys) in zip(fingerprint_ids, batch)
+                    for finger, key in keys
+                ],
+            )
+            db.commit()
+
+            for poi_id, (number, *_) in zip(poi_ids, batch):
+                pois[number] = poi_id
+
+            count = done + len(batch)
+            elapsed = time.perf_counter() - start
+            print(f"  {count} pois, {count / elapsed:.0f} pois/s", end="\r")
+
+    print()
+    return pois
+
+
+def percentile(values: list[float], p: float):
+    """
+    Nearest rank percentile of sorted values
+    """
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+async def search(args: argparse.Namespace, pois: dict[int, int]):
+    """
+    Search impressions of enrolled fingers and of fingers that aren't enrolled
+    """
+    rng = random.Random(f"{args.seed}-probes")
+    names = {finger: name for name, finger in FINGERS.items()}
+
+    # Time the scoring inside the search
+    score_in_pool = selectors.score_in_pool
+    scoring: list[tuple[float, int]] = []
+
+    async def timed_score_in_pool(probe, candidates):
+        start = time.perf_counter()
+        scores = await score_in_pool(probe, candidates)
+        scoring.append((time.perf_counter() - start, len(candidates)))
+        return scores
+
+    selectors.score_in_pool = timed_score_in_pool  # type: ignore
+
+    latencies, scored, hits, false_matches = [], [], 0, 0
+    with SessionLocal() as db:
+        # Warm up the pool and the connection
+        probe = impression(synthetic_pois(args.seed, 0)[1], rng)
+        await selectors.search_fingerprints(probe=probe, finger=None, db=db)
+
+        for n in range(args.probes + args.impostors):
+            genuine = n < args.probes
+            if genuine:
+                number = rng.randrange(args.pois)
+                finger = rng.choice(list(FINGERS.values()))
+                minutiae = synthetic_pois(args.seed, number)[finger]
+            else:
+                number, finger = -1, FINGERS["right_thumb"]
+                minutiae = synthetic_finger(rng)
+            probe = impression(minutiae, rng)
+            scoring.clear()
+
+            start = time.perf_counter()
+            matches = await selectors.search_fingerprints(
+                probe=probe, finger=None if args.any_finger else finger, db=db
+            )
+            elapsed = time.perf_counter() - start
+
+            if not genuine:
+                false_matches += bool(matches)
+                continue
+
+            latencies.append(elapsed)
+            scored.append(scoring.pop() if scoring else (0.0, 0))
+            if matches and matches[0]["poi_id"] == pois[number]:
+                hits += 1
+                if matches[0]["finger"] != finger:
+                    print(f"  poi {number} matched on {names[matches[0]['finger']]}")
+
+    selectors.score_in_pool = score_in_pool  # type: ignore
+    return sorted(latencies), scored, hits, false_matches
+
+
+def brute_force_estimate(args: argparse.Namespace):
+    """
+    Estimate the time to score a probe against every enrolled finger
+    """
+    rng = random.Random(f"{args.seed}-brute-force")
+    with SessionLocal() as db:
+        templates = db.scalars(
+            select(models.Fingerprint.template)
+            .where(models.Fingerprint.template.is_not(None))
+            .limit(50)
+        ).all()
+        enrolled = db.scalar(
+            select(func.count()).where(models.Fingerprint.template.is_not(None))
+        )
+
+    galleries = [g for t in templates for g in unpack_template(t).values()]
+    probe = impression(synthetic_finger(rng), rng)
+    start = time.perf_counter()
+    for gallery in galleries:
+        match_score(probe, gallery)
+
+    return (time.perf_counter() - start) / len(galleries) * enrolled * len(FINGERS)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pois", type=int, default=100_000)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--impostors", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--any-finger", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if args.workers is not None:
+        settings.FINGERPRINT_MATCH_WORKERS = args.workers
+
+    start = time.perf_counter()
+    pois = enroll(args)
+    print(f"{len(pois)} pois enrolled ({time.perf_counter() - start:.0f}s)")
+
+    with SessionLocal() as db:
+        keys = db.scalar(select(func.count()).select_from(models.FingerprintKey))
+        template_bytes = db.scalar(
+            select(func.avg(func.length(models.Fingerprint.template)))
+        )
+    print(
+        f"index: {keys} keys, {keys / max(len(pois), 1) / len(FINGERS):.0f} per"
+        f" finger; template: {template_bytes:.0f} bytes per poi"
+    )
+
+    latencies, scoring, hits, false_matches = asyncio.run(search(args, pois))
+    scoring_ms = sorted(elapsed * 1e3 for elapsed, _ in scoring)
+    candidates = sorted(count for _, count in scoring)
+
+    print(
+        f"\nsearch ({'any finger' if args.any_finger else 'known finger'},"
+        f" {settings.FINGERPRINT_MATCH_WORKERS} scoring processes):"
+    )
+    print(
+        f"  latency  p50 {percentile(latencies, 50) * 1e3:.0f}ms"
+        f"  p99 {percentile(latencies, 99) * 1e3:.0f}ms"
+    )
+    print(
+        f"  scoring  p50 {percentile(scoring_ms, 50):.0f}ms"
+        f"  p99 {percentile(scoring_ms, 99):.0f}ms"
+    )
+    print(
+        f"  candidates  p50 {percentile(candidates, 50)}"
+        f"  max {candidates[-1]} of {len(pois) * len(FINGERS)} fingers"
+    )
+    print(f"  rank 1  {hits}/{args.probes} ({hits / args.probes:.1%})")
+    print(f"  false matches  {false_matches}/{args.impostors}")
+    print(f"  brute force  ~{brute_force_estimate(args):.0f}s per search, 1 process")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
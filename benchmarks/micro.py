@@ -0,0 +1,265 @@
+"""
+Micro benchmarks of the hot helpers
+
+Every case runs on fixed fixtures, so the numbers are comparable between
+commits on the same machine. Save a baseline on the reference machine and
+compare later runs against it, a case slower than the baseline by more than
+the threshold is reported as a regression and fails the run.
+
+Usage:
+    python -m benchmarks.micro --save            # write the baseline
+    python -m benchmarks.micro --compare         # compare with the baseline
+    python -m benchmarks.micro -k formatters     # only matching cases
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from app.common.encryption import EncryptionManager
+from app.common.paginators import get_pagination_metadata
+from app.common.utils import created_changes, dict_to_string, pack_changes
+from app.poi import formatters, models
+from app.poi.utils import get_top_poi_age_ranges
+
+# Globals
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+MIN_REPEAT_SEC = 0.1
+BENCHMARKS: dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark case, sync or async, taking no arguments
+    """
+
+    def decorator(func: Callable):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+# Fixtures
+ENCRYPTION_KEY = "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg="
+encryption_manager = EncryptionManager(key=ENCRYPTION_KEY)
+ENCRYPTED_STR = encryption_manager.encrypt_str("Lagos State")
+ENCRYPTED_DATE = encryption_manager.encrypt_date(date(1990, 5, 17))
+
+rng = random.Random(1)
+DOB_LIST = [
+    date(1940, 1, 1) + timedelta(days=rng.randrange(25_000)) for _ in range(1000)
+]
+LOG_NOTES = {f"field_{i}": f"value {i}" for i in range(12)}
+OFFENSE = models.Offense(id=1, name="Theft", description="Theft", created_at=None)
+
+
+def make_poi(i: int):
+    poi = models.POI(
+        id=i,
+        pfp_url=f"media/{i}.png",
+        full_name=f"POI {i}",
+        alias=f"alias {i}",
+        dob=datetime(1990, 5, 17),
+        state_of_origin="Lagos",
+        is_pinned=False,
+        created_at=datetime(2024, 1, 1),
+    )
+    poi.id_documents = [
+        models.IDDocument(id=j, type="nin", id_number=str(j), is_deleted=False)
+        for j in range(3)
+    ]
+    poi.offenses = [
+        models.POIOffense(id=j, offense=OFFENSE, case_id=f"CASE-{j}") for j in range(2)
+    ]
+    return poi
+
+
+POI = make_poi(1)
+POI_PAGE = [make_poi(i) for i in range(50)]
+GSM = models.GSMNumber(id=1, service_provider="mtn", number="08030000000")
+
+
+# Cases
+@benchmark("formatters.format_poi_summary")
+async def bench_format_poi_summary():
+    await formatters.format_poi_summary(poi=POI)
+
+
+@benchmark("formatters.format_poi_summary[page=50]")
+async def bench_format_poi_summary_page():
+    [await formatters.format_poi_summary(poi=poi) for poi in POI_PAGE]
+
+
+@benchmark("formatters.format_poi_base")
+async def bench_format_poi_base():
+    await formatters.format_poi_base(poi=POI)
+
+
+@benchmark("formatters.format_gsm")
+async def bench_format_gsm():
+    await formatters.format_gsm(gsm=GSM)
+
+
+@benchmark("encryption.encrypt_str")
+def bench_encrypt_str():
+    encryption_manager.encrypt_str("Lagos State")
+
+
+@benchmark("encryption.decrypt_str")
+def bench_decrypt_str():
+    encryption_manager.decrypt_str(ENCRYPTED_STR)
+
+
+@benchmark("encryption.decrypt_date")
+def bench_decrypt_date():
+    encryption_manager.decrypt_date(ENCRYPTED_DATE)
+
+
+@benchmark("paginators.get_pagination_metadata")
+def bench_get_pagination_metadata():
+    get_pagination_metadata(tno_items=10_000, count=10, page=3, size=10)
+
+
+@benchmark("utils.dict_to_string")
+async def bench_dict_to_string():
+    await dict_to_string(LOG_NOTES)
+
+
+@benchmark("utils.created_changes+pack_changes")
+def bench_audit_changes():
+    pack_changes(created_changes(LOG_NOTES), compress_min_bytes=2048)
+
+
+@benchmark("poi.utils.get_top_poi_age_ranges[n=1000]")
+async def bench_get_top_poi_age_ranges():
+    await get_top_poi_age_ranges(DOB_LIST)
+
+
+# Runner
+def time_case(func: Callable, number: int):
+    """
+    Time number calls of a case, in seconds
+    """
+    if inspect.iscoroutinefunction(func):
+
+        async def loop():
+            start = time.perf_counter()
+            for _ in range(number):
+                await func()
+            return time.perf_counter() - start
+
+        return asyncio.run(loop())
+
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def run_case(func: Callable, repeat: int):
+    """
+    Run a case and return its per call timings in microseconds
+    """
+    # Calibrate the number of calls per repeat
+    number = 1
+    while (elapsed := time_case(func, number)) < MIN_REPEAT_SEC:
+        number *= 2 if elapsed == 0 else max(2, int(MIN_REPEAT_SEC / elapsed) + 1)
+
+    timings = [time_case(func, number) / number * 1e6 for _ in range(repeat)]
+    return {
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "stdev_us": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """
+    Print the comparison report and return the regressed cases
+    """
+    regressions = []
+
+    print(f"{'case':<44} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<44} {'-':>10} {result['min_us']:>8.2f}us {'new':>8}")
+            continue
+
+        # Compare the minimums, the least disturbed by other processes
+        change = result["min_us"] / base["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+
+        print(
+            f"{name:<44} {base['min_us']:>8.2f}us {result['min_us']:>8.2f}us"
+            f" {change:>+7.1%}{flag}"
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", dest="filter", default="")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+
+        results[name] = run_case(func, repeat=args.repeat)
+        if not args.compare:
+            r = results[name]
+            print(
+                f"{name:<44} {r['median_us']:>10.2f}us"
+                f" (min {r['min_us']:.2f}us, stdev {r['stdev_us']:.2f}us)"
+            )
+
+    if args.save:
+        args.baseline.parent.mkdir(exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "machine": platform.machine(),
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline=baseline, threshold=args.threshold)
+
+        print(f"\n{len(regressions)} regressions over {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
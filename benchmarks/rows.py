@@ -0,0 +1,272 @@
+"""
+Row read path of the list endpoints against ORM hydration
+
+Runs the poi list and every section list the old way (full models through
+the identity map, the convictions selectinloaded) and through the selectors
+(only the formatters' columns, as rows), both formatted to the response
+schemas, and reports the median latency and the peak memory allocated by
+one run (tracemalloc, which slows the run down so it is measured apart).
+
+The lists hold --size rows: a poi list page of --size pois and a poi named
+rows-bench with --size rows in every section, created on the first run. Run
+it on a seeded database (python -m scripts.seed_dataset) with more pois
+than --size.
+
+Usage:
+    python -m benchmarks.rows [--size 100] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from datetime import date
+from typing import Any, Callable
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.common.paginators import paginate
+from app.common.types import PaginationParamsType
+from app.core.database import SessionLocal
+from app.poi import formatters, models, selectors
+
+# Globals
+POI_NAME = "rows-bench"
+
+# Section -> (model, selector, formatter, the rows' data)
+SECTIONS: dict[str, tuple[Any, Callable, Callable, Callable[[int], dict]]] = {
+    "id-doc": (
+        models.IDDocument,
+        selectors.get_id_documents,
+        lambda row: formatters.format_id_document(doc=row),
+        lambda i: {"type": "nin", "id_number": f"{i:011}"},
+    ),
+    "gsm": (
+        models.GSMNumber,
+        selectors.get_gsm_numbers,
+        lambda row: formatters.format_gsm(gsm=row),
+        lambda i: {"service_provider": "mtn", "number": f"0803{i:07}"},
+    ),
+    "address": (
+        models.ResidentialAddress,
+        selectors.get_residential_addresses,
+        lambda row: formatters.format_residential_address(address=row),
+        lambda i: {"country": "Nigeria", "state": "Lagos", "city": f"City {i}"},
+    ),
+    "associate": (
+        models.KnownAssociate,
+        selectors.get_known_associates,
+        lambda row: formatters.format_known_associate(associate=row),
+        lambda i: {"full_name": f"Associate {i}", "relationship": "friend"},
+    ),
+    "employment": (
+        models.EmploymentHistory,
+        selectors.get_employment_history,
+        lambda row: formatters.format_employment_history(history=row),
+        lambda i: {
+            "company": f"Company {i}",
+            "employment_type": "contract",
+            "current_job": False,
+        },
+    ),
+    "education": (
+        models.EducationalBackground,
+        selectors.get_educational_background,
+        lambda row: formatters.format_educational_background(education=row),
+        lambda i: {
+            "type": "secondary",
+            "institute_name": f"School {i}",
+            "country": "Nigeria",
+            "state": "Lagos",
+            "current_institute": False,
+        },
+    ),
+    "conviction": (
+        models.POIOffense,
+        selectors.get_poi_offenses,
+        lambda row: formatters.format_poi_offense(conv=row),
+        lambda i: {"case_id": f"CASE-{i}", "date_convicted": date(2020, 1, 1)},
+    ),
+    "spot": (
+        models.FrequentedSpot,
+        selectors.get_frequented_spots,
+        lambda row: formatters.format_frequented_spot(spot=row),
+        lambda i: {
+            "country": "Nigeria",
+            "state": "Lagos",
+            "lga": f"LGA {i}",
+            "address": f"{i} Street",
+        },
+    ),
+}
+
+
+def get_bench_poi(size: int, db: Session):
+    """
+    Get the id of the rows-bench poi, adding the missing section rows
+    """
+    poi_id = db.scalar(select(models.POI.id).filter_by(full_name=POI_NAME).limit(1))
+    if not poi_id:
+        poi_id = db.scalar(
+            insert(models.POI)
+            .values(full_name=POI_NAME, alias=POI_NAME)
+            .returning(models.POI.id)
+        )
+
+    offense_id = db.scalar(select(models.Offense.id).limit(1))
+    if not offense_id:
+        offense_id = db.scalar(
+            insert(models.Offense)
+            .values(name=POI_NAME, description=POI_NAME)
+            .returning(models.Offense.id)
+        )
+
+    for model, _, _, make in SECTIONS.values():
+        count = db.scalar(
+            select(func.count())
+            .select_from(model)
+            .filter_by(poi_id=poi_id, is_deleted=False)
+        )
+        extra = {"offense_id": offense_id} if model is models.POIOffense else {}
+        if count < size:
+            db.execute(
+                insert(model),
+                [
+                    {**make(i), **extra, "poi_id": poi_id}
+                    for i in range(count, size)
+                ],
+            )
+
+    db.commit()
+    return poi_id
+
+
+async def hydrated_poi_list(pagination: PaginationParamsType, db: Session):
+    """
+    The poi list page as models, the convictions selectinloaded
+    """
+    qs = await selectors.get_poi_list_qs(
+        gsm=None, is_pinned=None, pagination=pagination, db=db
+    )
+    pois = paginate(
+        qs=qs.options(
+            selectinload(models.POI.offenses).joinedload(models.POIOffense.offense)
+        ),
+        page=pagination.page,
+        size=pagination.size,
+    )
+
+    return [await formatters.format_poi_summary(poi=poi) for poi in pois]
+
+
+async def rows_poi_list(pagination: PaginationParamsType, db: Session):
+    """
+    The poi list page as rows (selectors.get_paginated_poi_list)
+    """
+    pois, _ = await selectors.get_paginated_poi_list(
+        gsm=None, is_pinned=None, pagination=pagination, db=db
+    )
+
+    return [await formatters.format_poi_summary(poi=poi) for poi in pois]
+
+
+def make_cases(poi_id: int, size: int, db: Session):
+    """
+    Get the (name, hydrated, rows) cases, each returning the formatted list
+    """
+    pagination = PaginationParamsType(q=None, page=1, size=size, order_by="desc")
+
+    cases = [
+        (
+            f"GET /poi [size={size}]",
+            lambda: hydrated_poi_list(pagination=pagination, db=db),
+            lambda: rows_poi_list(pagination=pagination, db=db),
+        )
+    ]
+
+    for name, (model, selector, formatter, _) in SECTIONS.items():
+
+        async def hydrated(model=model, formatter=formatter):
+            stmt = select(model).filter_by(poi_id=poi_id, is_deleted=False)
+            if model is models.POIOffense:
+                stmt = stmt.options(selectinload(models.POIOffense.offense))
+
+            return [await formatter(obj) for obj in db.scalars(stmt)]
+
+        async def rows(selector=selector, formatter=formatter):
+            return [
+                await formatter(row) for row in await selector(poi_id=poi_id, db=db)
+            ]
+
+        cases.append((f"GET /poi/{{id}}/{name} [rows={size}]", hydrated, rows))
+
+    return cases
+
+
+async def run(func: Callable, db: Session):
+    """
+    Run a case like a request does, from an empty identity map
+    """
+    db.expunge_all()
+    return await func()
+
+
+async def latency(func: Callable, repeat: int, db: Session):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run(func, db=db)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+async def peak_memory(func: Callable, db: Session):
+    """
+    Get the peak of the memory allocated by one run, in bytes
+    """
+    tracemalloc.start()
+    try:
+        await run(func, db=db)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+async def dump(func: Callable, db: Session):
+    """
+    Get the formatted list as dicts, ordered by id
+    """
+    items = [item.model_dump() for item in await run(func, db=db)]
+    return sorted(items, key=lambda item: item["id"])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        poi_id = get_bench_poi(size=args.size, db=db)
+
+        print(f"{'case':<36} {'path':<9} {'latency':>10} {'peak memory':>12}")
+        for name, hydrated, rows in make_cases(poi_id, size=args.size, db=db):
+            # Check: both paths produce the same list
+            assert await dump(hydrated, db=db) == await dump(rows, db=db), name
+
+            for path, fn in [("hydrated", hydrated), ("rows", rows)]:
+                seconds = await latency(fn, repeat=args.repeat, db=db)
+                peak = await peak_memory(fn, db=db)
+                print(
+                    f"{name:<36} {path:<9} {seconds * 1e3:7.2f} ms"
+                    f" {peak / 1024:8.1f} KiB"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
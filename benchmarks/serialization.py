@@ -0,0 +1,112 @@
+"""
+Per item serialization cost of the poi list response
+
+Compares the old path (formatter dict -> response_model validation -> json)
+with the trusted path (formatter model_construct -> instance check -> json),
+i.e what FastAPI does with the route's response_model for each of them.
+
+Usage:
+    python -m benchmarks.serialization [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from app.poi import models
+from app.poi.formatters import format_poi_summary
+from app.poi.schemas import response
+
+# Globals
+META = {
+    "total_no_items": 0,
+    "total_no_pages": 0,
+    "page": 1,
+    "size": 0,
+    "count": 0,
+    "has_next_page": False,
+    "has_prev_page": False,
+}
+
+
+def make_pois(n: int):
+    """
+    Build n transient pois with two convictions each
+    """
+    offense = models.Offense(id=1, name="Theft", description="", created_at=None)
+
+    pois = []
+    for i in range(n):
+        poi = models.POI(
+            id=i,
+            full_name=f"POI {i}",
+            alias=f"alias {i}",
+            is_pinned=bool(i % 2),
+            created_at=datetime.now(),
+        )
+        poi.offenses = [
+            models.POIOffense(
+                id=i * 2 + j, offense=offense, case_id=f"CASE-{i}-{j}", notes="notes"
+            )
+            for j in range(2)
+        ]
+        pois.append(poi)
+
+    return pois
+
+
+async def format_as_dict(poi: models.POI):
+    """
+    The formatter output before the typed serialization layer
+    """
+    summary = await format_poi_summary(poi=poi)
+    return summary.model_dump()
+
+
+async def build(pois: list[models.POI], formatter):
+    return {"data": [await formatter(poi=poi) for poi in pois], "meta": META}
+
+
+def run(content: dict):
+    """
+    Validate and serialize like FastAPI's serialize_response + ORJSONResponse
+    """
+    model = response.PaginatedPOISummaryListResponse
+    return model.model_validate(content).model_dump_json()
+
+
+def timeit(content: dict, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(content)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pois = make_pois(args.items)
+    dicts = asyncio.run(build(pois, format_as_dict))
+    models_ = asyncio.run(build(pois, format_poi_summary))
+
+    # Check: both paths produce the same body
+    assert run(dicts) == run(models_)
+
+    for name, content in [("validated dicts", dicts), ("trusted models", models_)]:
+        seconds = timeit(content, repeat=args.repeat)
+        print(
+            f"{name:<16} {seconds * 1e3:8.2f} ms / {args.items} items"
+            f" = {seconds / args.items * 1e6:6.2f} us/item"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Throughput of the production server profile against today's default
+
+Starts the server with each profile on a free port, waits until /health
+answers, then loads --path with --connections concurrent keep-alive
+connections for --duration seconds and reports req/s and p50/p99 latency.
+
+Profiles:
+    default     fastapi run (the previous start.sh, a single worker)
+    production  python -m app.core.server (WEB_CONCURRENCY workers, uvloop,
+                httptools, keep-alive/backlog tuning)
+
+Usage:
+    python -m benchmarks.server --connections 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+PROFILES = {
+    "default": ["fastapi", "run", "app/main.py", "--port", "{port}"],
+    "production": [sys.executable, "-m", "app.core.server"],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], p: float):
+    """
+    Nearest rank percentile of sorted values
+    """
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+async def wait_ready(base_url: str, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+
+    raise RuntimeError(f"{base_url} didn't start in {timeout}s")
+
+
+async def load(base_url: str, path: str, connections: int, duration: float):
+    """
+    Send requests over the connections for the duration
+
+    Returns:
+        (list[float], int): The sorted latencies and the number of errors
+    """
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+
+        async def connection():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(path)
+                    if resp.status_code >= 400:
+                        errors += 1
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*[connection() for _ in range(connections)])
+
+    return sorted(latencies), errors
+
+
+def run_profile(name: str, args: argparse.Namespace):
+    port = free_port()
+    command = [part.format(port=port) for part in PROFILES[name]]
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1"}
+    server = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        latencies, errors = asyncio.run(
+            load(base_url, args.path, args.connections, args.duration)
+        )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        "rps": len(latencies) / args.duration,
+        "p50": percentile(latencies, 50) * 1e3,
+        "p99": percentile(latencies, 99) * 1e3,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--profile", choices=list(PROFILES), action="append")
+    args = parser.parse_args()
+
+    results = {name: run_profile(name, args) for name in args.profile or PROFILES}
+
+    print(f"{'profile':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in results.items():
+        print(
+            f"{name:<12} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p99']:>8.1f}"
+            f" {r['errors']:>7}"
+        )
+
+    if "default" in results and "production" in results:
+        change = results["production"]["rps"] / results["default"]["rps"] - 1
+        print(f"\nproduction vs default: {change:+.1%} req/s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Check the EXPLAIN plans of the selectors' queries
+
+Runs every poi selector against the configured postgres database, captures
+the SQL it sends and EXPLAINs each statement with sequential scans disabled.
+A Seq Scan left in a plan then means no index can serve the query, and the
+script exits non zero listing the offending statements.
+
+Usage:
+    python -m scripts.explain_selectors [--poi-id 1] [--verbose]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.common.types import PaginationParamsType
+from app.core.database import SessionLocal, get_engine
+from app.poi import models, selectors
+from app.poi.fingerprint import unpack_template
+from app.user import models as user_models
+from app.user import selectors as user_selectors
+
+# Globals
+PAGINATION = PaginationParamsType(q=None, page=1, size=10, order_by="desc")
+
+# Tables that must never be scanned sequentially
+INDEXED_TABLES = {
+    "id_documents",
+    "gsm_numbers",
+    "residential_addresses",
+    "known_associates",
+    "employment_histories",
+    "veteran_statuses",
+    "educational_backgrounds",
+    "poi_offenses",
+    "frequented_spots",
+    "fingerprints",
+    "fingerprint_keys",
+    "audit_logs",
+    "login_attempts",
+}
+
+
+class QueryCapture:
+    """
+    Collects the statements sent by the engine while active
+    """
+
+    def __init__(self):
+        self.name = ""
+        self.statements: list[tuple[str, str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.name != "setup" and statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((self.name, statement, parameters))
+
+
+def first_id(model, poi_id: int, db: Session):
+    """
+    Get the id of one of the poi's (not deleted) rows in a child table, the
+    by-id selectors raise on deleted rows
+    """
+    return (
+        db.scalar(
+            select(model.id).filter_by(poi_id=poi_id, is_deleted=False).limit(1)
+        )
+        or 0
+    )
+
+
+async def run_selectors(poi_id: int, capture: QueryCapture, db: Session):
+    """
+    Run every selector, tagging the captured statements with its name
+    """
+    capture.name = "get_poi_by_id"
+    poi = await selectors.get_poi_by_id(id=poi_id, db=db)
+
+    # Ids of the poi's child rows for the by-id selectors
+    capture.name = "setup"
+    ids = {
+        model: first_id(model, poi_id=poi_id, db=db)
+        for model in [
+            models.POIOffense,
+            models.IDDocument,
+            models.GSMNumber,
+            models.ResidentialAddress,
+            models.KnownAssociate,
+            models.EmploymentHistory,
+            models.EducationalBackground,
+            models.FrequentedSpot,
+        ]
+    }
+    offense_id = db.scalar(select(models.Offense.id).limit(1)) or 0
+    badge_num = db.scalar(select(user_models.User.badge_num).limit(1)) or ""
+    template = db.scalar(
+        select(models.Fingerprint.template)
+        .where(models.Fingerprint.template.is_not(None))
+        .limit(1)
+    )
+
+    checks = {
+        "get_poi_version": lambda: selectors.get_poi_version(id=poi_id, db=db),
+        "get_poi_dossier": lambda: selectors.get_poi_dossier(
+            id=poi_id, sections=list(selectors.DOSSIER_SECTIONS), db=db
+        ),
+        "get_id_documents": lambda: selectors.get_id_documents(poi_id=poi_id, db=db),
+        "get_gsm_numbers": lambda: selectors.get_gsm_numbers(poi_id=poi_id, db=db),
+        "get_residential_addresses": lambda: selectors.get_residential_addresses(
+            poi_id=poi_id, db=db
+        ),
+        "get_known_associates": lambda: selectors.get_known_associates(
+            poi_id=poi_id, db=db
+        ),
+        "get_employment_history": lambda: selectors.get_employment_history(
+            poi_id=poi_id, db=db
+        ),
+        "get_veteran_status_by_poi": lambda: selectors.get_veteran_status_by_poi(
+            poi=poi, db=db, raise_exc=False
+        ),
+        "get_educational_background": lambda: selectors.get_educational_background(
+            poi_id=poi_id, db=db
+        ),
+        "get_poi_offenses": lambda: selectors.get_poi_offenses(poi_id=poi_id, db=db),
+        "get_frequented_spots": lambda: selectors.get_frequented_spots(
+            poi_id=poi_id, db=db
+        ),
+        "get_paginated_poi_list": lambda: selectors.get_paginated_poi_list(
+            gsm=None, is_pinned=None, pagination=PAGINATION, db=db
+        ),
+        "get_paginated_offense_list": lambda: selectors.get_paginated_offense_list(
+            pagination=PAGINATION, db=db
+        ),
+        "get_pinned_pois": lambda: selectors.get_pinned_pois(db=db),
+        "get_recently_added_pois": lambda: selectors.get_recently_added_pois(
+            pagination=PAGINATION, db=db
+        ),
+        "get_offense_by_id": lambda: selectors.get_offense_by_id(
+            id=offense_id, db=db, raise_exc=False
+        ),
+        "get_poi_statistics": lambda: selectors.get_poi_statistics(db=db),
+        "get_poi_offense_by_id": lambda: selectors.get_poi_offense_by_id(
+            id=ids[models.POIOffense], db=db, raise_exc=False
+        ),
+        "get_id_doc_by_id": lambda: selectors.get_id_doc_by_id(
+            id=ids[models.IDDocument], db=db, raise_exc=False
+        ),
+        "get_gsm_by_id": lambda: selectors.get_gsm_by_id(
+            id=ids[models.GSMNumber], db=db, raise_exc=False
+        ),
+        "get_residential_address_by_id": lambda: (
+            selectors.get_residential_address_by_id(
+                id=ids[models.ResidentialAddress], db=db, raise_exc=False
+            )
+        ),
+        "get_known_associate_by_id": lambda: selectors.get_known_associate_by_id(
+            id=ids[models.KnownAssociate], db=db, raise_exc=False
+        ),
+        "get_employment_history_by_id": lambda: (
+            selectors.get_employment_history_by_id(
+                id=ids[models.EmploymentHistory], db=db, raise_exc=False
+            )
+        ),
+        "get_educational_background_by_id": lambda: (
+            selectors.get_educational_background_by_id(
+                id=ids[models.EducationalBackground], db=db, raise_exc=False
+            )
+        ),
+        "get_frequented_spot_by_id": lambda: selectors.get_frequented_spot_by_id(
+            id=ids[models.FrequentedSpot], db=db, raise_exc=False
+        ),
+        "get_paginated_poi_list_json": lambda: selectors.get_paginated_poi_list_json(
+            gsm=None, is_pinned=None, pagination=PAGINATION, db=db
+        ),
+        "get_paginated_offense_list_json": lambda: (
+            selectors.get_paginated_offense_list_json(pagination=PAGINATION, db=db)
+        ),
+        "get_fingerprint_by_poi": lambda: selectors.get_fingerprint_by_poi(
+            poi=poi, db=db, raise_exc=False
+        ),
+        "get_user": lambda: user_selectors.get_user(
+            badge_num=badge_num, db=db, raise_exc=False
+        ),
+    }
+
+    # Search with an enrolled finger, when there is one
+    if template:
+        finger, probe = next(iter(unpack_template(template).items()))
+        checks["search_fingerprints"] = lambda: selectors.search_fingerprints(
+            probe=probe, finger=finger, db=db
+        )
+
+    for name, check in checks.items():
+        capture.name = name
+
+        # Start every selector from an empty identity map
+        db.expunge_all()
+
+        # Load the qs/lists like the routes do
+        result = await check()
+        if hasattr(result, "all"):
+            result = result.all()
+
+    # Lookups without a selector yet
+    capture.name = "audit_logs by user"
+    db.execute(
+        select(user_models.AuditLog)
+        .filter_by(user_id=1)
+        .order_by(user_models.AuditLog.created_at.desc())
+        .limit(50)
+    ).all()
+
+    capture.name = "login_attempts by badge_num"
+    db.execute(
+        select(user_models.LoginAttempt)
+        .filter_by(badge_num="B1")
+        .order_by(user_models.LoginAttempt.attempted_at.desc())
+        .limit(5)
+    ).all()
+
+
+def find_seq_scans(plan: dict):
+    """
+    Walk a json plan and yield the relations read with a Seq Scan
+    """
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+
+    for child in plan.get("Plans", []):
+        yield from find_seq_scans(child)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--poi-id", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    capture = QueryCapture()
+
+    with SessionLocal() as db:
+        poi_id = args.poi_id or db.scalar(
+            select(models.POI.id).filter_by(is_deleted=False).limit(1)
+        )
+        if poi_id is None:
+            print("No poi found, seed the database first")
+            return 1
+
+        event.listen(get_engine(), "before_cursor_execute", capture)
+        try:
+            asyncio.run(run_selectors(poi_id=poi_id, capture=capture, db=db))
+        finally:
+            event.remove(get_engine(), "before_cursor_execute", capture)
+
+    failures = 0
+    with get_engine().connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+
+        for name, statement, parameters in capture.statements:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            ).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            scans = set(find_seq_scans(plan[0]["Plan"])) & INDEXED_TABLES
+            status = "SEQ SCAN " + ", ".join(sorted(scans)) if scans else "ok"
+            failures += bool(scans)
+
+            print(f"{name:<30} {status}")
+            if args.verbose or scans:
+                print("    " + " ".join(statement.split()))
+
+        conn.rollback()
+
+    print(f"\n{len(capture.statements)} statements, {failures} with seq scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Import time report
+
+Imports the module in fresh interpreters with `python -X importtime` and
+prints the median import time and the slowest modules (cumulative and, for
+the app's own modules, self time). The budgets are checked by
+tests/test_importtime.py, to catch an import that makes every worker,
+alembic run and test process start slower.
+
+Usage:
+    python -m scripts.importtime                        # app.main
+    python -m scripts.importtime --module app.poi.models
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_times(module: str):
+    """
+    Import the module in a fresh interpreter
+
+    Returns:
+        dict[str, tuple[int, int]]: module -> (self us, cumulative us)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [run[args.module][1] / 1e3 for run in runs]
+    median = statistics.median(totals)
+
+    # Report the run closest to the median
+    run = runs[totals.index(min(totals, key=lambda total: abs(total - median)))]
+
+    print(f"{'cumulative':>12} {'self':>9}  module (slowest)")
+    for name, (self_us, cumulative_us) in sorted(
+        run.items(), key=lambda item: -item[1][1]
+    )[: args.top]:
+        print(f"{cumulative_us / 1e3:>10.1f}ms {self_us / 1e3:>7.1f}ms  {name}")
+
+    print(f"\n{'self':>12}  app module (slowest)")
+    for name, (self_us, _) in sorted(run.items(), key=lambda item: -item[1][0]):
+        if name.startswith("app.") and self_us >= 1000:
+            print(f"{self_us / 1e3:>10.1f}ms  {name}")
+
+    print(
+        f"\nimport {args.module}: median {median:.0f}ms over {args.runs} runs"
+        f" (min {min(totals):.0f}ms, max {max(totals):.0f}ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Scripted load test for the api
+
+Virtual users log in once and then loop over a weighted mix of the main
+flows (dashboard, list/search, dossier and section reads, creates) for the
+given duration. The report has the throughput and p50/p95/p99 latencies per
+endpoint and, when the app runs in-process, the db queries per request.
+
+By default the app runs in-process through httpx's ASGI transport against
+the configured database, pass --base-url to load a running server instead
+(e.g uvicorn app.main:app --workers 4). Seed the database first:
+
+    python -m scripts.seed_dataset --pois 50000
+    python -m scripts.load_test --users 20 --duration 60
+"""
+
+import argparse
+import asyncio
+import contextvars
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+import httpx
+from sqlalchemy import event, select
+
+from app.core.database import SessionLocal, get_engine
+from app.poi import models
+from scripts.seed_dataset import LOAD_TEST_BADGE_NUM, LOAD_TEST_PASSWORD
+
+# Globals
+query_counter: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "query_counter", default=None
+)
+
+# Scenario -> weight
+SCENARIOS = {
+    "dashboard": 10,
+    "list": 25,
+    "search": 15,
+    "dossier": 25,
+    "section": 15,
+    "create_poi": 5,
+    "create_gsm": 5,
+}
+
+
+@dataclass
+class EndpointStats:
+    """
+    The samples of one endpoint
+    """
+
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+
+
+class LoadTest:
+    """
+    Runs the virtual users and collects the samples per endpoint
+    """
+
+    def __init__(self, client: httpx.AsyncClient, poi_ids: list[int], seed: int):
+        self.client = client
+        self.poi_ids = poi_ids
+        self.rng = random.Random(seed)
+        self.stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    async def request(self, label: str, method: str, url: str, **kwargs):
+        """
+        Send a request and record its latency, status and query count
+        """
+        counter = [0]
+        token = query_counter.set(counter)
+
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats[label].errors += 1
+            return None
+        finally:
+            query_counter.reset(token)
+
+        stats = self.stats[label]
+        stats.latencies.append(time.perf_counter() - start)
+        stats.queries.append(counter[0])
+        if resp.status_code >= 400:
+            stats.errors += 1
+
+        return resp
+
+    async def login(self):
+        resp = await self.request(
+            "POST /user/login",
+            "POST",
+            "/user/login",
+            json={"badge_num": LOAD_TEST_BADGE_NUM, "password": LOAD_TEST_PASSWORD},
+        )
+        if resp is None or resp.status_code != 200:
+            raise RuntimeError(
+                "Login failed, seed the load test user with scripts.seed_dataset"
+            )
+
+        return {"Authorization": f"Bearer {resp.json()['data']['token']}"}
+
+    async def run_scenario(self, name: str, headers: dict):
+        poi_id = self.rng.choice(self.poi_ids)
+
+        if name == "dashboard":
+            await self.request(
+                "GET /user/dashboard", "GET", "/user/dashboard", headers=headers
+            )
+        elif name == "list":
+            page = self.rng.randint(1, 20)
+            await self.request(
+                "GET /poi", "GET", "/poi", params={"page": page}, headers=headers
+            )
+        elif name == "search":
+            q = self.rng.choice("abcdefghijklmnopqrstuvwxyz") * 2
+            await self.request(
+                "GET /poi?q=", "GET", "/poi", params={"q": q}, headers=headers
+            )
+        elif name == "dossier":
+            await self.request(
+                "GET /poi/{poi_id}/dossier",
+                "GET",
+                f"/poi/{poi_id}/dossier",
+                headers=headers,
+            )
+        elif name == "section":
+            section = self.rng.choice(["base", "gsm", "address", "conviction"])
+            await self.request(
+                f"GET /poi/{{poi_id}}/{section}",
+                "GET",
+                f"/poi/{poi_id}/{section}",
+                headers=headers,
+            )
+        elif name == "create_poi":
+            resp = await self.request(
+                "POST /poi",
+                "POST",
+                "/poi",
+                json={
+                    "full_name": f"Load Test {self.rng.randrange(10**6)}",
+                    "alias": "load",
+                    "dob": date(1990, 1, 1).isoformat(),
+                    "gsm_numbers": [
+                        {"service_provider": "mtn", "number": "08030000000"}
+                    ],
+                    "veteran_status": {"is_veteran": False},
+                },
+                headers=headers,
+            )
+            if resp is not None and resp.status_code == 201:
+                self.poi_ids.append(resp.json()["data"]["id"])
+        elif name == "create_gsm":
+            await self.request(
+                "POST /poi/{poi_id}/gsm",
+                "POST",
+                f"/poi/{poi_id}/gsm",
+                json={"service_provider": "glo", "number": "08050000000"},
+                headers=headers,
+            )
+
+    async def virtual_user(self, deadline: float):
+        headers = await self.login()
+
+        names, weights = list(SCENARIOS), list(SCENARIOS.values())
+        while time.perf_counter() < deadline:
+            await self.run_scenario(self.rng.choices(names, weights)[0], headers)
+
+    async def run(self, users: int, duration: float):
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[self.virtual_user(deadline) for _ in range(users)])
+
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """
+    Count the statements of the current request
+    """
+    if (counter := query_counter.get()) is not None:
+        counter[0] += 1
+
+
+def percentile(values: list[float], p: float):
+    """
+    Nearest rank percentile of sorted values
+    """
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def report(stats: dict[str, EndpointStats], elapsed: float, in_process: bool):
+    total = sum(len(s.latencies) for s in stats.values())
+
+    print(
+        f"{'endpoint':<28} {'reqs':>7} {'err':>5} {'req/s':>8}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+    )
+    for label in sorted(stats):
+        s = stats[label]
+        if not s.latencies:
+            continue
+
+        latencies = sorted(s.latencies)
+        queries = f"{sum(s.queries) / len(s.queries):.1f}" if in_process else "n/a"
+        print(
+            f"{label:<28} {len(latencies):>7} {s.errors:>5}"
+            f" {len(latencies) / elapsed:>8.1f}"
+            f" {percentile(latencies, 50) * 1e3:>8.1f}"
+            f" {percentile(latencies, 95) * 1e3:>8.1f}"
+            f" {percentile(latencies, 99) * 1e3:>8.1f}"
+            f" {queries:>8}"
+        )
+
+    print(f"\n{total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Pois to read
+    with SessionLocal() as db:
+        poi_ids = list(
+            db.scalars(
+                select(models.POI.id).filter_by(is_deleted=False).limit(10_000)
+            )
+        )
+    if not poi_ids:
+        raise RuntimeError("No poi found, seed the database first")
+
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        from app.main import app
+
+        event.listen(get_engine(), "before_cursor_execute", count_query)
+        transport = httpx.ASGITransport(app=app)  # type: ignore
+        base_url = "http://loadtest"
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=60
+    ) as client:
+        load_test = LoadTest(client=client, poi_ids=poi_ids, seed=args.seed)
+
+        start = time.perf_counter()
+        await load_test.run(users=args.users, duration=args.duration)
+        elapsed = time.perf_counter() - start
+
+    report(load_test.stats, elapsed=elapsed, in_process=transport is not None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,279 @@
+"""
+Query plan regression check for every selector
+
+Seeds the configured (local) postgres database with the synthetic dataset
+when it has fewer pois than --pois, runs every selector of app.poi.selectors
+and app.user.selectors (see explain_selectors.run_selectors) and EXPLAINs
+each captured statement. A selector fails when:
+
+    - a plan reads a large table (> --large-table-rows) with a Seq Scan
+    - a statement's estimated cost or rows exceed the budget
+    - the plan's shape (node types, relations and indexes) differs from its
+      golden file in scripts/plans/, or it has no golden file
+
+Usage:
+    python -m scripts.plan_check [--pois 50000] [--update]
+
+tests/test_plans.py runs the check with the default dataset.
+
+Run with --update to (re)write the golden files after an intended change.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy import event, func, select, text
+
+from app.core.database import SessionLocal, get_engine
+from app.poi import models
+from scripts.explain_selectors import QueryCapture, find_seq_scans, run_selectors
+from scripts.seed_dataset import seed
+
+# Globals
+PLANS_DIR = Path(__file__).parent / "plans"
+
+# Dataset size and the row count of a large table (no Seq Scan)
+POIS = 50_000
+LARGE_TABLE_ROWS = 10_000
+
+# Per statement budgets, relative to the golden plan's estimates
+COST_TOLERANCE = 2.0
+ROWS_TOLERANCE = 2.0
+
+# Selectors that read every row of a table by design
+KNOWN_SEQ_SCANS = {
+    "get_poi_statistics": {"pois", "poi_offenses", "offenses"},
+    "get_pinned_pois": {"pois"},
+}
+
+
+def plan_shape(plan: dict):
+    """
+    Strip a json plan down to what should be stable between runs
+    """
+    shape = {
+        key: plan[key]
+        for key in ["Node Type", "Relation Name", "Index Name", "Join Type"]
+        if key in plan
+    }
+    if plan.get("Plans"):
+        shape["Plans"] = [plan_shape(child) for child in plan["Plans"]]
+
+    return shape
+
+
+def get_large_tables(conn, min_rows: int):
+    """
+    Get the tables the planner estimates to have more than min_rows rows
+    """
+    rows = conn.execute(
+        text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples > :min_rows"
+        ),
+        {"min_rows": min_rows},
+    )
+    return {row[0] for row in rows}
+
+
+def explain_selectors(poi_id: int):
+    """
+    Run the selectors and EXPLAIN their statements
+
+    Returns:
+        dict[str, list[dict]]: The plans of each selector's statements
+    """
+    capture = QueryCapture()
+
+    with SessionLocal() as db:
+        event.listen(get_engine(), "before_cursor_execute", capture)
+        try:
+            asyncio.run(run_selectors(poi_id=poi_id, capture=capture, db=db))
+        finally:
+            event.remove(get_engine(), "before_cursor_execute", capture)
+
+    plans: dict[str, list[dict]] = {}
+    with get_engine().connect() as conn:
+        for name, statement, parameters in capture.statements:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            ).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            plans.setdefault(name, []).append(
+                {"statement": " ".join(statement.split()), "plan": plan[0]["Plan"]}
+            )
+
+    return plans
+
+
+def match_golden(plans: list[dict], golden: list[dict]):
+    """
+    Pair each statement with its golden entry, by statement text first
+
+    The ORM emits some statements in no fixed order (e.g the dossier's
+    selectin loads), pairing by position alone fails on a reorder
+
+    Returns:
+        list[dict]: The golden entry of each statement
+    """
+    by_statement: dict[str, list[dict]] = {}
+    for entry in golden:
+        by_statement.setdefault(entry["statement"], []).append(entry)
+
+    return [
+        (by_statement.get(item["statement"]) or [golden[i]]).pop(0)
+        for i, item in enumerate(plans)
+    ]
+
+
+def check_selector(name: str, plans: list[dict], large_tables: set[str]):
+    """
+    Check a selector's plans against the rules and its golden file
+
+    Returns:
+        list[str]: The failures
+    """
+    failures = []
+    golden_path = PLANS_DIR / f"{name}.json"
+
+    # Check: golden file exists, a new selector's plans are reviewed once
+    golden = None
+    if golden_path.exists():
+        golden = json.loads(golden_path.read_text())
+    else:
+        failures.append(f"no golden file {golden_path.name}, run with --update")
+
+    if golden is not None and len(golden) != len(plans):
+        failures.append(f"{len(plans)} statements, golden has {len(golden)}")
+        golden = None
+
+    if golden is not None:
+        golden = match_golden(plans, golden)
+
+    for i, item in enumerate(plans):
+        plan = item["plan"]
+
+        # Check: seq scan on a large table
+        scans = set(find_seq_scans(plan)) & large_tables
+        scans -= KNOWN_SEQ_SCANS.get(name, set())
+        if scans:
+            failures.append(f"#{i} seq scan on {', '.join(sorted(scans))}")
+
+        if golden is None:
+            continue
+
+        # Check: plan shape
+        if plan_shape(plan) != golden[i]["shape"]:
+            failures.append(
+                f"#{i} plan changed\n"
+                f"      golden: {json.dumps(golden[i]['shape'])}\n"
+                f"      actual: {json.dumps(plan_shape(plan))}"
+            )
+
+        # Check: cost/row budget
+        max_cost = max(golden[i]["total_cost"] * COST_TOLERANCE, 10)
+        if plan["Total Cost"] > max_cost:
+            failures.append(
+                f"#{i} cost {plan['Total Cost']:.0f} over budget {max_cost:.0f}"
+            )
+        max_rows = max(golden[i]["plan_rows"] * ROWS_TOLERANCE, 10)
+        if plan["Plan Rows"] > max_rows:
+            failures.append(
+                f"#{i} rows {plan['Plan Rows']} over budget {max_rows:.0f}"
+            )
+
+    if failures:
+        failures.append("statements:")
+        failures.extend(f"  #{i} {item['statement']}" for i, item in enumerate(plans))
+
+    return failures
+
+
+def write_golden(name: str, plans: list[dict]):
+    PLANS_DIR.mkdir(exist_ok=True)
+    golden = [
+        {
+            "statement": item["statement"],
+            "shape": plan_shape(item["plan"]),
+            "total_cost": item["plan"]["Total Cost"],
+            "plan_rows": item["plan"]["Plan Rows"],
+        }
+        for item in plans
+    ]
+    (PLANS_DIR / f"{name}.json").write_text(json.dumps(golden, indent=2) + "\n")
+
+
+def prepare_dataset(pois: int, verbose: bool = False):
+    """
+    Seed the synthetic dataset, topping the database up to pois pois
+
+    Returns:
+        int: The ID of the poi the selectors run for
+    """
+    with SessionLocal() as db:
+        count = db.scalar(select(func.count()).select_from(models.POI))
+        if count < pois:
+            seed(db, pois=pois - count, verbose=verbose)
+
+        return db.scalar(
+            select(models.POI.id)
+            .filter_by(is_deleted=False)
+            .order_by(models.POI.id.desc())
+            .limit(1)
+        )
+
+
+def check_plans(poi_id: int, large_table_rows: int):
+    """
+    Check every selector's plans
+
+    Returns:
+        dict[str, list[str]]: The failures of each selector
+    """
+    plans = explain_selectors(poi_id=poi_id)
+    with get_engine().connect() as conn:
+        large_tables = get_large_tables(conn, min_rows=large_table_rows)
+
+    return {
+        name: check_selector(name, selector_plans, large_tables)
+        for name, selector_plans in plans.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pois", type=int, default=POIS)
+    parser.add_argument("--large-table-rows", type=int, default=LARGE_TABLE_ROWS)
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+
+    if get_engine().dialect.name != "postgresql":
+        print("The plan check needs postgres")
+        return 1
+
+    # Seed a realistic dataset
+    poi_id = prepare_dataset(pois=args.pois, verbose=True)
+
+    if args.update:
+        for name, selector_plans in explain_selectors(poi_id=poi_id).items():
+            write_golden(name, selector_plans)
+            print(f"updated  {name}")
+        return 0
+
+    results = check_plans(poi_id=poi_id, large_table_rows=args.large_table_rows)
+    for name, failures in results.items():
+        print(f"{'FAIL' if failures else 'ok':<8} {name}")
+        for failure in failures:
+            print(f"    {failure}")
+
+    failed = sum(bool(failures) for failures in results.values())
+    print(f"\n{len(results)} selectors, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Connection pool stress test
+
+Simulates --workers uvicorn worker processes, each with its own engine built
+from the settings (the pool sized from DB_MAX_CONNECTIONS / WEB_CONCURRENCY)
+and --threads threads per worker, more than its pool holds, checking out a
+connection, holding it for --hold-ms and returning it for --duration seconds.
+
+A run passes when the connections opened by all the workers never exceed
+the DB_MAX_CONNECTIONS budget and no checkout fails with a database error
+(e.g postgres' "too many clients"), see tests/test_pool.py. Checkouts that
+wait longer than DB_POOL_TIMEOUT_SEC are reported as timeouts, i.e
+backpressure, not failures.
+
+Usage:
+    python -m scripts.pool_stress --workers 4 --threads 64 --duration 20
+    DB_POOL_MODE=null python -m scripts.pool_stress   # behind PgBouncer
+"""
+
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.database import create_db_engine
+from app.core.settings import Settings
+
+
+def percentile(values: list[float], p: float):
+    """
+    Nearest rank percentile of sorted values
+    """
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def run_worker(index: int, args: argparse.Namespace, results):
+    """
+    Run the threads of a simulated worker process and report its samples
+    """
+    settings = Settings(WEB_CONCURRENCY=args.workers)  # type: ignore
+    engine = create_db_engine(
+        settings.POSTGRES_DATABASE_URL, f"worker-{index}", settings
+    )
+    is_postgres = engine.dialect.name == "postgresql"
+
+    waits: list[float] = []
+    counts = {"ok": 0, "timeouts": 0, "errors": 0, "peak": 0}
+    in_use = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    wait = time.perf_counter() - start
+                    with lock:
+                        in_use[0] += 1
+                        counts["peak"] = max(counts["peak"], in_use[0])
+
+                    # Hold the connection like a request would
+                    try:
+                        if is_postgres:
+                            conn.execute(
+                                text("SELECT pg_sleep(:sec)"),
+                                {"sec": args.hold_ms / 1e3},
+                            )
+                        else:
+                            conn.execute(text("SELECT 1"))
+                            time.sleep(args.hold_ms / 1e3)
+                    finally:
+                        with lock:
+                            in_use[0] -= 1
+            except PoolTimeoutError:
+                with lock:
+                    counts["timeouts"] += 1
+                continue
+            except DBAPIError as e:
+                with lock:
+                    counts["errors"] += 1
+                print(f"worker-{index}: {e.orig}", file=sys.stderr)
+                continue
+
+            with lock:
+                counts["ok"] += 1
+                waits.append(wait)
+
+    threads = [threading.Thread(target=client) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    engine.dispose()
+    results.put((index, counts, sorted(waits)))
+
+
+def count_server_connections(args: argparse.Namespace, peak: list[int]):
+    """
+    Track the peak number of connections postgres sees on the database
+    """
+    settings = Settings(DB_POOL_MODE="queue", DB_POOL_SIZE=1)  # type: ignore
+    engine = create_db_engine(settings.POSTGRES_DATABASE_URL, "monitor", settings)
+    if engine.dialect.name != "postgresql":
+        return
+
+    deadline = time.perf_counter() + args.duration
+    with engine.connect() as conn:
+        while time.perf_counter() < deadline:
+            count = conn.execute(
+                text(
+                    "SELECT count(*) FROM pg_stat_activity"
+                    " WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                )
+            ).scalar_one()
+            peak[0] = max(peak[0], count)
+            time.sleep(0.05)
+
+    engine.dispose()
+
+
+def run_stress(args: argparse.Namespace):
+    """
+    Run the simulated workers and track the connections postgres sees
+
+    Returns:
+        tuple[list, dict[str, int]]: Each worker's (index, counts, waits)
+            samples and the totals, their peak the peak of connections
+    """
+    # Workers
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(i, args, results))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    server_peak = [0]
+    count_server_connections(args, server_peak)
+
+    samples = sorted((results.get() for _ in processes), key=lambda sample: sample[0])
+    for process in processes:
+        process.join()
+
+    totals = {"ok": 0, "timeouts": 0, "errors": 0, "peak": 0}
+    for _, counts, _ in samples:
+        for key in totals:
+            totals[key] += counts[key]
+
+    # The server's count when available, the pools' own otherwise
+    totals["peak"] = server_peak[0] or totals["peak"]
+
+    return samples, totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--hold-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    settings = Settings(WEB_CONCURRENCY=args.workers)  # type: ignore
+    samples, totals = run_stress(args)
+
+    # Report
+    print(
+        f"{'worker':<10} {'ok':>8} {'timeouts':>9} {'errors':>7} {'peak':>5}"
+        f" {'wait p50':>9} {'wait p99':>9}"
+    )
+    for index, counts, waits in samples:
+        print(
+            f"worker-{index:<3} {counts['ok']:>8} {counts['timeouts']:>9}"
+            f" {counts['errors']:>7} {counts['peak']:>5}"
+            f" {percentile(waits, 50) * 1e3:>7.1f}ms"
+            f" {percentile(waits, 99) * 1e3:>7.1f}ms"
+        )
+
+    print(
+        f"\n{totals['ok']} checkouts, {totals['timeouts']} timeouts,"
+        f" {totals['errors']} errors, peak {totals['peak']} connections"
+        f" (budget {settings.DB_MAX_CONNECTIONS}, {settings.DB_POOL_MODE} pool)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Check the read replica routing of the sessions
+
+Uses the configured DB_REPLICA_URLS or, when none is set, simulates two
+replicas with extra engines on the primary's url. Every statement is tagged
+with the engine that ran it, and the script checks that:
+
+    - read only sessions read from a replica, round robin between sessions
+    - writes go to the primary, and a write other than the append only logs
+      sends the following reads of the session to the primary
+    - locking reads and sessions that are not read only use the primary
+    - lagging replicas are skipped, the primary serves when all lag
+
+Usage:
+    python -m scripts.replica_check
+    DB_REPLICA_URLS='["postgresql://...:5433/behemoth"]' python -m scripts.replica_check
+"""
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import ReplicaSet, RoutingSession, create_db_engine, get_engine
+from app.core.settings import get_settings
+from app.poi import models, selectors
+from app.user import models as user_models
+
+# Globals
+settings = get_settings()
+
+
+class StatementLog:
+    """
+    Records the engine of every statement
+    """
+
+    def __init__(self, engines):
+        self.entries: list[tuple[str, str]] = []
+        for item in engines:
+            event.listen(item, "before_cursor_execute", self.listener(item))
+
+    def listener(self, item):
+        name = item.pool.logging_name
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            self.entries.append((name, statement.split(None, 1)[0].upper()))
+
+        return record
+
+    def take(self):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def check(name: str, ok: bool, entries):
+    print(f"{'ok' if ok else 'FAIL':<6} {name}")
+    if not ok:
+        print(f"       {entries}")
+    return ok
+
+
+async def main():
+    urls = settings.DB_REPLICA_URLS or [settings.POSTGRES_DATABASE_URL] * 2
+    replicas = ReplicaSet(
+        engines=[
+            create_db_engine(url, f"replica-{i}", settings)
+            for i, url in enumerate(urls)
+        ],
+        max_lag=settings.DB_REPLICA_MAX_LAG_SEC,
+        check_interval=settings.DB_REPLICA_LAG_CHECK_SEC,
+    )
+    engine = get_engine()
+    make_session = sessionmaker(
+        class_=RoutingSession, autoflush=False, bind=engine, replicas=replicas
+    )
+    log = StatementLog([engine, *replicas.engines])
+
+    def session(read_only: bool):
+        db = make_session()
+        db.info["read_only"] = read_only
+        return db
+
+    with session(read_only=False) as db:
+        poi_id = db.scalar(select(models.POI.id).filter_by(is_deleted=False).limit(1))
+        user_id = db.scalar(select(user_models.User.id).limit(1))
+    if poi_id is None or user_id is None:
+        print("Seed the database first (python -m scripts.seed_dataset)")
+        return 1
+    log.take()
+
+    results = []
+
+    # Reads of read only sessions, round robin
+    used = []
+    for _ in range(len(replicas.engines)):
+        with session(read_only=True) as db:
+            await selectors.get_poi_by_id(id=poi_id, db=db)
+        entries = log.take()
+        used.append(entries[0][0])
+        results.append(
+            check(
+                "read only session reads from a replica",
+                entries[0][0] != "primary",
+                entries,
+            )
+        )
+    results.append(
+        check("round robin between replicas", len(set(used)) == len(used), used)
+    )
+
+    # Append only writes keep the replica, other writes stick to the primary
+    with session(read_only=True) as db:
+        poi = await selectors.get_poi_by_id(id=poi_id, db=db)
+        db.add(user_models.AuditLog(user_id=user_id, resource="poi", action="check"))
+        db.flush()
+        await selectors.get_gsm_numbers(poi_id=poi.id, db=db)
+        entries = log.take()
+        results.append(
+            check(
+                "audit log write goes to the primary, reads stay on the replica",
+                [e[0] == "primary" for e in entries if e[1] != "SELECT"] == [True]
+                and all(e[0] != "primary" for e in entries if e[1] == "SELECT"),
+                entries,
+            )
+        )
+
+        poi.is_pinned = not poi.is_pinned
+        db.flush()
+        await selectors.get_id_documents(poi_id=poi.id, db=db)
+        entries = log.take()
+        results.append(
+            check(
+                "reads after a write go to the primary",
+                all(e[0] == "primary" for e in entries),
+                entries,
+            )
+        )
+        db.rollback()
+    log.take()
+
+    # Locking reads and sessions that are not read only
+    with session(read_only=True) as db:
+        db.scalars(select(models.POI).filter_by(id=poi_id).with_for_update()).first()
+        db.rollback()
+    entries = log.take()
+    results.append(
+        check(
+            "locking read goes to the primary",
+            all(e[0] == "primary" for e in entries if e[1] == "SELECT"),
+            entries,
+        )
+    )
+
+    with session(read_only=False) as db:
+        await selectors.get_poi_by_id(id=poi_id, db=db)
+    entries = log.take()
+    results.append(
+        check(
+            "session that is not read only uses the primary",
+            all(e[0] == "primary" for e in entries),
+            entries,
+        )
+    )
+
+    # Lag, simulated by the cached lag of the replicas
+    now = time.monotonic()
+    lagging = replicas.engines[0]
+    replicas.lags[lagging] = (settings.DB_REPLICA_MAX_LAG_SEC + 1, now)
+    for item in replicas.engines[1:]:
+        replicas.lags[item] = (0.0, now)
+    for _ in range(len(replicas.engines)):
+        with session(read_only=True) as db:
+            await selectors.get_poi_by_id(id=poi_id, db=db)
+    entries = log.take()
+    results.append(
+        check(
+            "lagging replica is skipped",
+            all(e[0] not in ("primary", lagging.pool.logging_name) for e in entries)
+            or len(replicas.engines) == 1,
+            entries,
+        )
+    )
+
+    for item in replicas.engines:
+        replicas.lags[item] = (settings.DB_REPLICA_MAX_LAG_SEC + 1, now)
+    with session(read_only=True) as db:
+        await selectors.get_poi_by_id(id=poi_id, db=db)
+    entries = log.take()
+    results.append(
+        check(
+            "primary serves when all replicas lag",
+            all(e[0] == "primary" for e in entries),
+            entries,
+        )
+    )
+
+    print(f"\n{results.count(False)} of {len(results)} checks failed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
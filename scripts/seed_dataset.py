@@ -0,0 +1,358 @@
+"""
+Generate a synthetic dataset of pois for plan checks and load tests
+
+The child row counts follow skewed distributions (most pois have few rows,
+a long tail has many), offenses follow a zipf like popularity and a small
+share of every table is soft deleted, so the planner sees realistic
+statistics. The generator is deterministic for a given --seed.
+
+Usage:
+    python -m scripts.seed_dataset --pois 50000 [--users 20] [--seed 1]
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.common.security import hash_password
+from app.core.database import SessionLocal
+from app.poi import models
+from app.user import models as user_models
+
+# Globals
+BATCH_SIZE = 1000
+LOAD_TEST_BADGE_NUM = "LOADTEST"
+LOAD_TEST_PASSWORD = "loadtest-password"
+
+STATES = ["Lagos", "Abuja", "Kano", "Rivers", "Oyo", "Kaduna", "Enugu", "Ogun"]
+PROVIDERS = ["mtn", "glo", "airtel", "9mobile"]
+ID_TYPES = ["nin", "passport", "drivers-license", "voters-card"]
+RELATIONSHIPS = ["brother", "sister", "friend", "spouse", "colleague", "cousin"]
+EDUCATION_TYPES = ["primary", "secondary", "tertiary"]
+EMPLOYMENT_TYPES = ["full-time", "part-time", "contract", "self-employed"]
+OFFENSES = [
+    "Theft",
+    "Fraud",
+    "Robbery",
+    "Assault",
+    "Kidnapping",
+    "Cybercrime",
+    "Smuggling",
+    "Vandalism",
+    "Trespassing",
+    "Forgery",
+    "Arson",
+    "Extortion",
+    "Bribery",
+    "Money Laundering",
+    "Drug Trafficking",
+    "Terrorism",
+]
+
+# POI relationship -> (model, weights of 0, 1, 2, ... rows per poi)
+CHILD_DISTRIBUTIONS = {
+    "id_documents": (models.IDDocument, [5, 60, 25, 10]),
+    "gsm_numbers": (models.GSMNumber, [5, 50, 25, 12, 5, 3]),
+    "residential_addresses": (models.ResidentialAddress, [10, 60, 20, 10]),
+    "known_associates": (models.KnownAssociate, [20, 25, 20, 15, 10, 5, 3, 2]),
+    "employment_history": (models.EmploymentHistory, [30, 35, 20, 10, 5]),
+    "educational_background": (models.EducationalBackground, [15, 35, 35, 15]),
+    "offenses": (models.POIOffense, [35, 35, 15, 8, 4, 3]),
+    "frequented_spots": (models.FrequentedSpot, [25, 30, 25, 12, 8]),
+    "fingerprint": (models.Fingerprint, [40, 60]),
+}
+
+
+def random_word(rng: random.Random, length: int = 8):
+    return "".join(rng.choices(string.ascii_lowercase, k=length)).capitalize()
+
+
+def random_date(rng: random.Random, start_year: int = 1960, end_year: int = 2024):
+    start = date(start_year, 1, 1)
+    return start + timedelta(days=rng.randrange((date(end_year, 12, 31) - start).days))
+
+
+def random_created_at(rng: random.Random, days: int = 730):
+    return datetime.now(timezone.utc) - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def random_deleted(rng: random.Random, rate: float = 0.05):
+    if rng.random() < rate:
+        return {"is_deleted": True, "deleted_at": datetime.now(timezone.utc)}
+    return {"is_deleted": False, "deleted_at": None}
+
+
+def make_poi(rng: random.Random):
+    first, last = random_word(rng, 6), random_word(rng, 8)
+    return {
+        "full_name": f"{first} {last}",
+        "alias": random_word(rng, 5),
+        "dob": datetime.combine(random_date(rng, 1950, 2005), datetime.min.time()),
+        "state_of_origin": rng.choice(STATES),
+        "lga_of_origin": random_word(rng),
+        "pob": rng.choice(STATES),
+        "nationality": "Nigerian",
+        "religion": rng.choice(["christianity", "islam", None]),
+        "last_seen_date": random_date(rng, 2020, 2024),
+        "notes": " ".join(random_word(rng) for _ in range(rng.randrange(0, 40))),
+        "is_pinned": rng.random() < 0.03,
+        "created_at": random_created_at(rng),
+        **random_deleted(rng, rate=0.02),
+    }
+
+
+def make_child(name: str, poi_id: int, offense_ids: list[int], rng: random.Random):
+    row = {"poi_id": poi_id, "created_at": random_created_at(rng)}
+
+    if name == "id_documents":
+        row |= {"type": rng.choice(ID_TYPES), "id_number": str(rng.randrange(10**10))}
+    elif name == "gsm_numbers":
+        row |= {
+            "service_provider": rng.choice(PROVIDERS),
+            "number": "0" + str(rng.randrange(7 * 10**9, 9 * 10**9)),
+            "last_call_date": random_date(rng, 2022, 2024),
+        }
+    elif name == "residential_addresses":
+        row |= {
+            "country": "Nigeria",
+            "state": rng.choice(STATES),
+            "city": random_word(rng),
+            "address": f"{rng.randrange(1, 200)} {random_word(rng)} street",
+        }
+    elif name == "known_associates":
+        row |= {
+            "full_name": f"{random_word(rng, 6)} {random_word(rng, 8)}",
+            "relationship": rng.choice(RELATIONSHIPS),
+            "occupation": random_word(rng),
+        }
+    elif name == "employment_history":
+        row |= {
+            "company": random_word(rng) + " Ltd",
+            "employment_type": rng.choice(EMPLOYMENT_TYPES),
+            "from_date": random_date(rng, 1990, 2015),
+            "current_job": rng.random() < 0.3,
+        }
+    elif name == "educational_background":
+        row |= {
+            "type": rng.choice(EDUCATION_TYPES),
+            "institute_name": random_word(rng) + " School",
+            "country": "Nigeria",
+            "state": rng.choice(STATES),
+            "from_date": random_date(rng, 1970, 2010),
+            "current_institute": False,
+        }
+    elif name == "offenses":
+        # Zipf like popularity, the first offenses are the most common
+        idx = min(int(rng.paretovariate(1.2)) - 1, len(offense_ids) - 1)
+        row |= {
+            "offense_id": offense_ids[idx],
+            "case_id": f"CASE-{rng.randrange(10**6):06d}",
+            "date_convicted": random_date(rng, 2000, 2024),
+        }
+    elif name == "frequented_spots":
+        row |= {
+            "country": "Nigeria",
+            "state": rng.choice(STATES),
+            "lga": random_word(rng),
+            "address": f"{rng.randrange(1, 200)} {random_word(rng)} road",
+        }
+    elif name == "fingerprint":
+        row |= {
+            finger: rng.randbytes(64).hex()
+            for finger in ["left_thumb", "right_thumb", "left_pointer", "right_pointer"]
+        }
+
+    return row | random_deleted(rng)
+
+
+def insert_rows(db: Session, model, rows: list[dict], returning: bool = False):
+    if not rows:
+        return []
+
+    stmt = insert(model)
+    if returning:
+        return list(db.scalars(stmt.returning(model.id), rows))
+
+    db.execute(stmt, rows)
+    return []
+
+
+def seed_offenses(db: Session):
+    existing = db.scalar(select(func.count()).select_from(models.Offense))
+    if not existing:
+        insert_rows(
+            db,
+            models.Offense,
+            [
+                {"name": name, "description": f"{name} offense"}
+                for name in OFFENSES
+            ],
+        )
+
+    return list(db.scalars(select(models.Offense.id).order_by(models.Offense.id)))
+
+
+def seed_users(db: Session, n: int, rng: random.Random):
+    # Login user for the load test
+    if not db.scalar(
+        select(user_models.User.id).filter_by(badge_num=LOAD_TEST_BADGE_NUM)
+    ):
+        password = asyncio.run(hash_password(raw=LOAD_TEST_PASSWORD))
+        insert_rows(
+            db,
+            user_models.User,
+            [{"badge_num": LOAD_TEST_BADGE_NUM, "password": password}],
+        )
+
+    start = db.scalar(select(func.count()).select_from(user_models.User))
+    insert_rows(
+        db,
+        user_models.User,
+        [
+            {"badge_num": f"SEED-{start + i}", "password": "!"}
+            for i in range(max(n - start, 0))
+        ],
+    )
+
+    return list(db.scalars(select(user_models.User.id)))
+
+
+def seed_pois(
+    db: Session, n: int, offense_ids: list[int], rng: random.Random, verbose: bool
+):
+    for offset in range(0, n, BATCH_SIZE):
+        poi_ids = insert_rows(
+            db,
+            models.POI,
+            [make_poi(rng) for _ in range(min(BATCH_SIZE, n - offset))],
+            returning=True,
+        )
+
+        for name, (model, weights) in CHILD_DISTRIBUTIONS.items():
+            rows = [
+                make_child(name, poi_id, offense_ids, rng)
+                for poi_id in poi_ids
+                for _ in range(rng.choices(range(len(weights)), weights)[0])
+            ]
+            insert_rows(db, model, rows)
+
+        # Every poi has exactly one veteran status
+        insert_rows(
+            db,
+            models.VeteranStatus,
+            [
+                {"poi_id": poi_id, "is_veteran": rng.random() < 0.05}
+                for poi_id in poi_ids
+            ],
+        )
+
+        db.commit()
+        if verbose:
+            print(f"pois {offset + len(poi_ids)}/{n}")
+
+
+def seed_logs(
+    db: Session, n: int, user_ids: list[int], rng: random.Random, verbose: bool
+):
+    actions = ["get", "get-paginated-list", "create", "edit", "delete"]
+    for offset in range(0, n, BATCH_SIZE * 10):
+        count = min(BATCH_SIZE * 10, n - offset)
+        insert_rows(
+            db,
+            user_models.AuditLog,
+            [
+                {
+                    "user_id": rng.choice(user_ids),
+                    "resource": "poi",
+                    "action": f"{rng.choice(actions)}:{rng.randrange(1, 10**5)}",
+                    "created_at": random_created_at(rng).replace(tzinfo=None),
+                }
+                for _ in range(count)
+            ],
+        )
+        insert_rows(
+            db,
+            user_models.LoginAttempt,
+            [
+                {
+                    "badge_num": f"SEED-{rng.randrange(len(user_ids))}",
+                    "is_success": rng.random() < 0.9,
+                    "attempted_at": random_created_at(rng),
+                }
+                for _ in range(count // 20)
+            ],
+        )
+
+        db.commit()
+        if verbose:
+            print(f"audit logs {offset + count}/{n}")
+
+
+def seed(
+    db: Session,
+    *,
+    pois: int,
+    users: int = 20,
+    logs_per_poi: int = 20,
+    seed_: int = 1,
+    verbose: bool = False,
+):
+    """
+    Seed the database with pois, their child rows, users and audit logs
+
+    Args:
+        db (Session): The database session
+        pois (int): The number of pois to generate
+        users (int = 20): The number of users
+        logs_per_poi (int = 20): The number of audit logs per poi
+        seed_ (int = 1): The random seed
+        verbose (bool = False): Print progress
+    """
+    rng = random.Random(seed_)
+
+    offense_ids = seed_offenses(db)
+    user_ids = seed_users(db, n=users, rng=rng)
+    db.commit()
+
+    seed_pois(db, n=pois, offense_ids=offense_ids, rng=rng, verbose=verbose)
+    seed_logs(db, n=pois * logs_per_poi, user_ids=user_ids, rng=rng, verbose=verbose)
+
+    # Refresh the planner statistics and the visibility map, without which
+    # the planner prices an Index Only Scan like an Index Scan. VACUUM can't
+    # run in a transaction.
+    if db.get_bind().dialect.name == "postgresql":
+        engine = db.get_bind().execution_options(isolation_level="AUTOCOMMIT")
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pois", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logs-per-poi", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        seed(
+            db,
+            pois=args.pois,
+            users=args.users,
+            logs_per_poi=args.logs_per_poi,
+            seed_=args.seed,
+            verbose=True,
+        )
+
+    print(f"Seeded {args.pois} pois in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,5 @@ set -e
 
 alembic upgrade head
 
-fastapi run --port $PORT
\ No newline at end of file
+# exec, the server gets the platform's SIGTERM and drains gracefully
+exec python -m app.core.server
@@ -0,0 +1,34 @@
+"""
+Shared fixtures
+
+The database tests run against the configured postgres database
+(POSTGRES_DATABASE_URL) and are skipped when it isn't reachable.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import get_engine
+
+
+@pytest.fixture(scope="session")
+def postgres():
+    """
+    Skip the test unless the configured database is a reachable postgres
+
+    Returns:
+        Engine: The primary engine
+    """
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        pytest.skip("needs postgres")
+
+    # Check: the server is reachable
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except DBAPIError as e:
+        pytest.skip(f"postgres is not reachable: {e.orig}")
+
+    return engine
@@ -0,0 +1,24 @@
+"""
+Import time budgets (see scripts.importtime)
+"""
+
+import statistics
+
+import pytest
+
+from scripts.importtime import import_times
+
+# Module -> budget (ms), with headroom over a cold import on CI
+BUDGETS = {
+    "app.main": 3000,
+    "app.poi.models": 900,
+    "app.core.database": 900,
+}
+RUNS = 3
+
+
+@pytest.mark.parametrize("module, budget_ms", BUDGETS.items())
+def test_import_time(module: str, budget_ms: float):
+    totals = [import_times(module)[module][1] / 1e3 for _ in range(RUNS)]
+
+    assert statistics.median(totals) <= budget_ms
@@ -0,0 +1,106 @@
+"""
+The database json fast path (DB_JSON_LISTS) against the formatter path
+
+Runs every list selector both ways against the configured postgres database
+and validates both outputs with the route's response model.
+"""
+
+import asyncio
+
+import pytest
+
+from app.common.paginators import build_paginated_json, get_pagination_metadata
+from app.common.types import PaginationParamsType
+from app.core.database import SessionLocal
+from app.poi import selectors
+from app.poi.formatters import format_offense, format_poi_summary
+from app.poi.schemas import response
+
+PAGINATIONS = [
+    PaginationParamsType(q=None, page=1, size=10, order_by="desc"),
+    PaginationParamsType(q=None, page=2, size=10, order_by="desc"),
+    PaginationParamsType(q=None, page=1, size=50, order_by="asc"),
+    PaginationParamsType(q="a", page=1, size=10, order_by="desc"),
+    PaginationParamsType(q=None, page=10_000, size=10, order_by="desc"),
+]
+
+
+def assert_same(response_model, expected: dict, data: bytes, meta: dict):
+    """
+    Validate both outputs with the response model and compare them
+    """
+    body = build_paginated_json(response_model=response_model, data=data, meta=meta)
+
+    expected_obj = response_model.model_validate(expected).model_dump(mode="json")
+    actual_obj = response_model.model_validate_json(body).model_dump(mode="json")
+
+    assert actual_obj == expected_obj
+
+
+async def compare_offense_list(pagination: PaginationParamsType):
+    with SessionLocal() as db:
+        offenses, tnoi = await selectors.get_paginated_offense_list(
+            pagination=pagination, db=db
+        )
+        expected = {
+            "data": [await format_offense(offense=offense) for offense in offenses],
+            "meta": get_pagination_metadata(
+                tno_items=tnoi,
+                count=len(offenses),
+                page=pagination.page,
+                size=pagination.size,
+            ),
+        }
+
+        data, count, tnoi = await selectors.get_paginated_offense_list_json(
+            pagination=pagination, db=db
+        )
+
+    assert_same(
+        response.PaginatedOffenseListResponse,
+        expected,
+        data,
+        get_pagination_metadata(
+            tno_items=tnoi, count=count, page=pagination.page, size=pagination.size
+        ),
+    )
+
+
+async def compare_poi_list(pagination: PaginationParamsType, is_pinned: bool):
+    with SessionLocal() as db:
+        pois, tnoi = await selectors.get_paginated_poi_list(
+            gsm=None, is_pinned=is_pinned, pagination=pagination, db=db
+        )
+        expected = {
+            "data": [await format_poi_summary(poi=poi) for poi in pois],
+            "meta": get_pagination_metadata(
+                tno_items=tnoi,
+                count=len(pois),
+                page=pagination.page,
+                size=pagination.size,
+            ),
+        }
+
+        data, count, tnoi = await selectors.get_paginated_poi_list_json(
+            gsm=None, is_pinned=is_pinned, pagination=pagination, db=db
+        )
+
+    assert_same(
+        response.PaginatedPOISummaryListResponse,
+        expected,
+        data,
+        get_pagination_metadata(
+            tno_items=tnoi, count=count, page=pagination.page, size=pagination.size
+        ),
+    )
+
+
+@pytest.mark.parametrize("pagination", PAGINATIONS)
+def test_offense_list(postgres, pagination: PaginationParamsType):
+    asyncio.run(compare_offense_list(pagination=pagination))
+
+
+@pytest.mark.parametrize("is_pinned", [False, True])
+@pytest.mark.parametrize("pagination", PAGINATIONS)
+def test_poi_list(postgres, pagination: PaginationParamsType, is_pinned: bool):
+    asyncio.run(compare_poi_list(pagination=pagination, is_pinned=is_pinned))
@@ -0,0 +1,22 @@
+"""
+Query plan regression check of every selector (see scripts.plan_check)
+
+Seeds the configured postgres database with the synthetic dataset on the
+first run, which takes a few minutes.
+"""
+
+from scripts import plan_check
+
+
+def test_plans(postgres):
+    poi_id = plan_check.prepare_dataset(pois=plan_check.POIS)
+
+    results = plan_check.check_plans(
+        poi_id=poi_id, large_table_rows=plan_check.LARGE_TABLE_ROWS
+    )
+    failed = {name: failures for name, failures in results.items() if failures}
+
+    assert not failed, "\n".join(
+        f"{name}:\n" + "\n".join(f"    {failure}" for failure in failures)
+        for name, failures in failed.items()
+    )
@@ -0,0 +1,25 @@
+"""
+Connection pool stress test (see scripts.pool_stress), a short run of
+more threads than the pools hold
+"""
+
+import argparse
+
+from app.core.settings import Settings
+from scripts.pool_stress import run_stress
+
+# Globals
+ARGS = argparse.Namespace(workers=4, threads=32, duration=3, hold_ms=20)
+
+
+def test_pool_stress(postgres):
+    settings = Settings(WEB_CONCURRENCY=ARGS.workers)  # type: ignore
+
+    _, totals = run_stress(ARGS)
+
+    # Check: no checkout failed with a database error (e.g too many clients)
+    assert totals["errors"] == 0
+
+    # Check: the workers stayed within the connection budget
+    if settings.DB_POOL_MODE == "queue":
+        assert totals["peak"] <= settings.DB_MAX_CONNECTIONS